@@ -0,0 +1,66 @@
+"""
+Flux aléatoires indépendants par sous-système.
+
+Chaque sous-système (dégâts, fuite, événements, coffres...) tire dans son
+propre random.Random, dérivé de façon déterministe d'une graine maître et
+d'un chemin (ex. numéro de processus ou de bloc de simulation). Deux runs
+avec la même graine maître donnent les mêmes tirages, quel que soit le
+nombre de processus, et ajouter des tirages dans un sous-système ne décale
+pas les autres.
+
+    from aleatoire import flux
+    flux.degats.randint(-2, 2)
+    flux.initialiser(1234)            # partie reproductible
+    flux.initialiser(1234, (7,))      # bloc n°7 d'un lot parallèle
+"""
+import hashlib
+import random
+
+
+def deriver_graine(*parties):
+    """Graine 64 bits stable dérivée d'une suite de valeurs (graine maître, chemin, nom)."""
+    empreinte = hashlib.blake2b(repr(parties).encode("utf-8"), digest_size=8)
+    return int.from_bytes(empreinte.digest(), "little")
+
+
+class FluxAleatoires:
+    """Un random.Random par sous-système, créé au premier accès (flux.nom)."""
+
+    def __init__(self, graine=None, chemin=()):
+        self._flux = {}
+        self.initialiser(graine, chemin)
+
+    def initialiser(self, graine=None, chemin=()):
+        """Change la graine maître ; les flux existants sont réensemencés sur place."""
+        if graine is None:
+            graine = random.SystemRandom().getrandbits(64)
+        self.graine = graine
+        self.chemin = tuple(chemin)
+        for nom, generateur in self._flux.items():
+            generateur.seed(deriver_graine(self.graine, self.chemin, nom))
+
+    def __getattr__(self, nom):
+        if nom.startswith("_"):
+            raise AttributeError(nom)
+        generateur = random.Random(deriver_graine(self.graine, self.chemin, nom))
+        self._flux[nom] = generateur
+        setattr(self, nom, generateur)  # les accès suivants ne passent plus par ici
+        return generateur
+
+    def deriver(self, *chemin):
+        """Nouveaux flux indépendants pour un sous-chemin (processus, bloc, session...)."""
+        return FluxAleatoires(self.graine, self.chemin + chemin)
+
+    def etat(self):
+        """Instantané de tous les flux (pour reprendre exactement au même point)."""
+        return {"graine": self.graine, "chemin": self.chemin,
+                "flux": {nom: generateur.getstate() for nom, generateur in self._flux.items()}}
+
+    def restaurer(self, etat):
+        self.initialiser(etat["graine"], etat["chemin"])
+        for nom, etat_flux in etat["flux"].items():
+            getattr(self, nom).setstate(etat_flux)
+
+
+# Flux partagés par le jeu
+flux = FluxAleatoires()
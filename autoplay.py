@@ -0,0 +1,215 @@
+"""
+Parties complètes jouées par des bots, pour les statistiques de quête.
+
+Chaque partie passe par GameFacade (même déroulé que jeu_principal) avec une
+politique de partie de strategy.py. Les parties sont réparties par blocs sur
+un pool de processus ; chaque bloc terminé est ajouté tel quel comme groupe
+de lignes à un fichier en colonnes (array + struct, rien hors stdlib).
+
+Colonnes par partie : graine, resultat (index dans RESULTATS), tours,
+combats, exploration_cle (-1 si la clé n'est jamais trouvée), boss_atteint,
+quete, or_final, et la courbe d'or (or après chaque tour) stockée à plat
+dans courbe_or avec sa longueur dans courbe_or_longueur.
+
+    python autoplay.py [gourmande|prudente|aleatoire] [nb_parties]
+"""
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import main
+import strategy
+from aleatoire import deriver_graine, flux
+from facade import GameFacade
+
+POLITIQUES = {
+    "gourmande": strategy.partie_gourmande,
+    "prudente": strategy.partie_prudente,
+    "aleatoire": strategy.partie_aleatoire,
+}
+RESULTATS = ("victoire", "mort", "abandon", "limite")
+TOURS_MAX = 500
+ACTIONS_PAR_TOUR_MAX = 200  # garde-fou contre un combat qui ne finit jamais
+
+# Nom -> type array ; l'ordre est celui du fichier
+COLONNES = {
+    "graine": "Q", "resultat": "B", "tours": "I", "combats": "I", "exploration_cle": "i",
+    "boss_atteint": "B", "quete": "B", "or_final": "i", "courbe_or_longueur": "I", "courbe_or": "i",
+}
+
+
+# =========================
+# Fichier en colonnes
+# =========================
+
+MAGIQUE = b"MRPC"
+_TAILLE_ENTETE = struct.Struct("<I")
+
+
+class EcrivainColonnes:
+    """Ajoute des groupes de lignes {colonne: array} ; chaque groupe est écrit dès réception."""
+
+    def __init__(self, chemin):
+        self.fichier = open(chemin, "wb")
+        self.fichier.write(MAGIQUE)
+        self.nb_lignes = 0
+
+    def ecrire_groupe(self, colonnes, nb_lignes):
+        entete = json.dumps({
+            "lignes": nb_lignes,
+            "ordre": sys.byteorder,
+            "colonnes": [[nom, valeurs.typecode, len(valeurs)] for nom, valeurs in colonnes.items()],
+        }).encode("utf-8")
+        self.fichier.write(_TAILLE_ENTETE.pack(len(entete)) + entete)
+        for valeurs in colonnes.values():
+            valeurs.tofile(self.fichier)
+        self.fichier.flush()
+        self.nb_lignes += nb_lignes
+
+    def fermer(self):
+        self.fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
+def lire_colonnes(chemin):
+    """Concatène tous les groupes du fichier ; renvoie {colonne: array}."""
+    colonnes = {}
+    with open(chemin, "rb") as fichier:
+        if fichier.read(len(MAGIQUE)) != MAGIQUE:
+            raise ValueError(f"{chemin} n'est pas un fichier de colonnes MiniRPG")
+        while taille := fichier.read(_TAILLE_ENTETE.size):
+            entete = json.loads(fichier.read(_TAILLE_ENTETE.unpack(taille)[0]))
+            for nom, typecode, longueur in entete["colonnes"]:
+                valeurs = array(typecode)
+                valeurs.fromfile(fichier, longueur)
+                if entete["ordre"] != sys.byteorder:
+                    valeurs.byteswap()
+                colonnes.setdefault(nom, array(typecode)).extend(valeurs)
+    return colonnes
+
+
+# =========================
+# Parties
+# =========================
+
+def jouer_partie(politique, classe, graine, colonnes, tours_max=TOURS_MAX):
+    """Joue une partie complète et ajoute sa ligne à colonnes."""
+    flux.initialiser(graine)  # tirages des politiques aléatoires
+    partie = GameFacade(classe, "Bot", graine=graine)
+    jeu = partie.jeu
+    combats, exploration_cle, boss_atteint = 0, -1, False
+    dernier_ennemi, tour = None, 0
+    courbe = colonnes["courbe_or"]
+    debut_courbe = len(courbe)
+    nb_actions, actions_max = 0, tours_max * ACTIONS_PAR_TOUR_MAX
+
+    while not partie.terminee and partie.tour < tours_max and nb_actions < actions_max:
+        ennemi = partie.ennemi
+        if ennemi is not None and ennemi is not dernier_ennemi:
+            combats += 1
+            boss_atteint = boss_atteint or isinstance(ennemi, main.GardienDonjon)
+            dernier_ennemi = ennemi
+        partie.avancer(politique(partie))
+        nb_actions += 1
+        if exploration_cle < 0 and jeu.quete.etat >= 1:
+            exploration_cle = partie.tour + 1  # le tour n commence par la (n+1)e exploration
+        if partie.tour != tour:
+            tour = partie.tour
+            courbe.append(jeu.or_)
+
+    resultat = partie.resultat if partie.terminee else "limite"
+    for nom, valeur in (("graine", graine), ("resultat", RESULTATS.index(resultat)), ("tours", partie.tour),
+                        ("combats", combats), ("exploration_cle", exploration_cle),
+                        ("boss_atteint", boss_atteint), ("quete", jeu.quete.etat),
+                        ("or_final", jeu.or_), ("courbe_or_longueur", len(courbe) - debut_courbe)):
+        colonnes[nom].append(valeur)
+
+
+def _jouer_bloc(nom_politique, classe, graine, debut, nb, tours_max):
+    """Exécuté dans un processus de travail : parties debut..debut+nb-1."""
+    politique = POLITIQUES[nom_politique]
+    colonnes = {nom: array(typecode) for nom, typecode in COLONNES.items()}
+    for index in range(debut, debut + nb):
+        jouer_partie(politique, classe, deriver_graine(graine, index), colonnes, tours_max)
+    return colonnes, nb
+
+
+def autoplay(nom_politique, nb_parties, chemin, classe="Guerrier", graine=None,
+             processus=None, taille_bloc=500, tours_max=TOURS_MAX):
+    """
+    Joue nb_parties parties et les écrit dans chemin au fil des blocs terminés.
+    Chaque partie a sa graine (dérivée de graine et de son numéro), enregistrée
+    dans le fichier : une partie se rejoue seule avec jouer_partie.
+    """
+    if graine is None:
+        graine = deriver_graine(flux.graine, "autoplay")
+    processus = processus or os.cpu_count() or 1
+    blocs = [(nom_politique, classe, graine, debut, min(taille_bloc, nb_parties - debut), tours_max)
+             for debut in range(0, nb_parties, taille_bloc)]
+
+    with EcrivainColonnes(chemin) as ecrivain:
+        if processus == 1 or len(blocs) == 1:
+            etat = flux.etat()
+            for bloc in blocs:
+                ecrivain.ecrire_groupe(*_jouer_bloc(*bloc))
+            flux.restaurer(etat)
+        else:
+            with ProcessPoolExecutor(max_workers=processus) as pool:
+                for futur in as_completed([pool.submit(_jouer_bloc, *bloc) for bloc in blocs]):
+                    ecrivain.ecrire_groupe(*futur.result())
+    return graine
+
+
+def resume(colonnes, tours_courbe=(10, 25, 50, 100, 200)):
+    """Statistiques de run : issues, explorations jusqu'à la clé, morts avant le Gardien, courbe d'or."""
+    nb = len(colonnes["graine"])
+    issues = {nom: 0 for nom in RESULTATS}
+    for code in colonnes["resultat"]:
+        issues[RESULTATS[code]] += 1
+    cles = sorted(valeur for valeur in colonnes["exploration_cle"] if valeur >= 0)
+    morts_avant_gardien = sum(1 for code, boss in zip(colonnes["resultat"], colonnes["boss_atteint"])
+                              if RESULTATS[code] == "mort" and not boss)
+
+    sommes, effectifs = [0] * len(tours_courbe), [0] * len(tours_courbe)
+    position = 0
+    for longueur in colonnes["courbe_or_longueur"]:
+        for i, tour in enumerate(tours_courbe):
+            if tour <= longueur:
+                sommes[i] += colonnes["courbe_or"][position + tour - 1]
+                effectifs[i] += 1
+        position += longueur
+
+    return {
+        "parties": nb,
+        **{f"taux_{nom}": issues[nom] / nb for nom in RESULTATS},
+        "explorations_cle_moyenne": sum(cles) / len(cles) if cles else None,
+        "explorations_cle_mediane": cles[len(cles) // 2] if cles else None,
+        "taux_mort_avant_gardien": morts_avant_gardien / nb,
+        "tours_moyen": sum(colonnes["tours"]) / nb,
+        "combats_moyen": sum(colonnes["combats"]) / nb,
+        "or_moyen_par_tour": {tour: round(somme / effectif, 1) if effectif else None
+                              for tour, somme, effectif in zip(tours_courbe, sommes, effectifs)},
+    }
+
+
+if __name__ == "__main__":
+    nom_politique = sys.argv[1] if len(sys.argv) > 1 else "prudente"
+    nb_parties = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    chemin = f"autoplay_{nom_politique}.mrpc"
+
+    debut = time.perf_counter()
+    graine = autoplay(nom_politique, nb_parties, chemin)
+    duree = time.perf_counter() - debut
+    print(f"{nb_parties} parties ({nom_politique}, graine {graine}) en {duree:.1f} s "
+          f"-> {nb_parties / duree:,.0f} parties/s ({os.cpu_count()} cœurs) | {os.path.getsize(chemin):,} octets")
+    for cle, valeur in resume(lire_colonnes(chemin)).items():
+        print(f"  {cle}: {valeur}")
@@ -0,0 +1,501 @@
+"""
+Simulation de combats sans interface (pas d'input(), pas d'affichage).
+
+Sert aux vérifications d'équilibrage : on rejoue le même tour de combat que
+combat_interactif, mais les choix viennent d'une politique (voir strategy.py)
+et des millions de combats sont répartis sur tous les cœurs.
+
+Les combats de groupe (combat_groupe) opposent un groupe de personnages à
+des vagues d'ennemis : chaque combattant joue le même tour que dans un duel,
+dans l'ordre d'un tas d'initiative, contre une cible choisie par l'index de
+son camp.
+
+    python combat.py            # benchmark Guerrier vs Loup sauvage
+    python combat.py lot        # calcul_degats_lot : vérification + benchmark (numpy)
+    python combat.py groupe     # combats de groupe : temps par tour selon la taille des camps
+"""
+import heapq
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+
+from main import (
+    Guerrier, LoupSauvage, Shield, Statuts,
+    calcul_degats, debut_tour_combat, action_joueur, tour_ennemi, fin_tour_combat,
+    traiter_statuts_debut_tour, traiter_statuts_fin_tour,
+)
+from aleatoire import flux
+from messages import bus, emettre, SortieNulle
+from strategy import politique_attaque
+
+try:
+    import numpy as np
+except ImportError:  # optionnel : seulement pour les calculs par lots
+    np = None
+
+
+# =========================
+# Combat unique
+# =========================
+
+@dataclass
+class ResultatCombat:
+    issue: str  # "victoire", "defaite", "fuite" ou "limite"
+    tours: int
+    pv_joueur: int
+    pv_ennemi: int
+
+
+def simuler_combat(personnage, ennemi, politique=politique_attaque, tours_max=500):
+    """Résout un combat complet sans interaction, même déroulé que combat_interactif."""
+    tour = 1
+    while personnage.pv > 0 and ennemi.pv > 0 and tour <= tours_max:
+        if not debut_tour_combat(personnage, ennemi):
+            break
+        action, competence = politique(personnage, ennemi, tour)
+        if action_joueur(personnage, ennemi, action, competence):
+            return ResultatCombat("fuite", tour, personnage.pv, ennemi.pv)
+        tour_ennemi(personnage, ennemi)
+        fin_tour_combat(personnage, ennemi)
+        tour += 1
+
+    if ennemi.pv <= 0 and personnage.pv > 0:
+        issue = "victoire"
+    elif personnage.pv <= 0:
+        issue = "defaite"
+    else:
+        issue = "limite"
+    return ResultatCombat(issue, tour, personnage.pv, ennemi.pv)
+
+
+# =========================
+# Combats de groupe
+# =========================
+
+GROUPE, ENNEMIS = 0, 1  # rang des camps : à initiative égale, le groupe joue d'abord
+
+
+class Camp:
+    """
+    Combattants encore engagés d'un camp, indexés pour le ciblage.
+
+    vivants est une liste dense (retrait par échange avec le dernier) pour
+    viser au hasard en O(1) ; _faibles est un tas (PV, numéro, membre) pour
+    viser le plus faible en O(log n), dont les entrées périmées (PV changés
+    depuis, membre retiré) sont écartées à la lecture. noter() doit suivre
+    tout changement de PV.
+    """
+
+    def __init__(self, membres=()):
+        self.vivants = []
+        self._position = {}  # id(membre) -> index dans vivants
+        self._faibles = []
+        self._numero = 0
+        for membre in membres:
+            self.ajouter(membre)
+
+    def __len__(self):
+        return len(self.vivants)
+
+    def __contains__(self, membre):
+        return id(membre) in self._position
+
+    def ajouter(self, membre):
+        self._position[id(membre)] = len(self.vivants)
+        self.vivants.append(membre)
+        self.noter(membre)
+
+    def retirer(self, membre):
+        position = self._position.pop(id(membre), None)
+        if position is None:
+            return
+        dernier = self.vivants.pop()
+        if dernier is not membre:
+            self.vivants[position] = dernier
+            self._position[id(dernier)] = position
+
+    def noter(self, membre):
+        self._numero += 1
+        heapq.heappush(self._faibles, (membre.pv, self._numero, membre))
+        if len(self._faibles) > 4 * len(self.vivants) + 64:
+            # Trop d'entrées périmées : on repart des membres engagés
+            self._faibles = [(m.pv, self._numero + i, m) for i, m in enumerate(self.vivants, 1)]
+            self._numero += len(self.vivants)
+            heapq.heapify(self._faibles)
+
+    def plus_faible(self):
+        tas = self._faibles
+        while tas:
+            pv, _, membre = tas[0]
+            if pv == membre.pv and id(membre) in self._position:
+                return membre
+            heapq.heappop(tas)
+        return None
+
+    def au_hasard(self, rng):
+        return self.vivants[int(rng.random() * len(self.vivants))] if self.vivants else None
+
+
+@dataclass
+class ResultatGroupe:
+    issue: str  # "victoire", "defaite", "fuite" ou "limite"
+    tours: int
+    vagues_vaincues: int
+    survivants: int  # membres du groupe encore debout (fuyards compris)
+    pv_groupe: int
+    ennemis_restants: int
+
+
+def ordre_initiative(groupe, ennemis, rng):
+    """
+    Tas d'initiative d'un tour : agilité décroissante ; à égalité le groupe
+    avant les ennemis, puis un tirage, puis l'ordre d'entrée dans le camp.
+    """
+    tas = [(-membre.agilite, rang, rng.random(), numero, membre)
+           for rang, camp in ((GROUPE, groupe), (ENNEMIS, ennemis))
+           for numero, membre in enumerate(camp.vivants)]
+    heapq.heapify(tas)
+    return tas
+
+
+def _constater(camp, membre):
+    """Retire membre de son camp s'il est tombé, sinon met à jour son rang de PV."""
+    if membre.pv <= 0:
+        if membre in camp:
+            camp.retirer(membre)
+            emettre("combat", "{nom} est vaincu !", nom=membre.nom)
+    else:
+        camp.noter(membre)
+
+
+def tour_groupe(groupe, ennemis, politique, tour, fuyards):
+    """Un tour de combat de groupe : statuts de début, actions par initiative, statuts de fin."""
+    emettre("combat", "\n--- Tour {tour} : {nb_groupe} contre {nb_ennemis} ---",
+            tour=tour, nb_groupe=len(groupe), nb_ennemis=len(ennemis))
+    for camp in (groupe, ennemis):
+        for membre in list(camp.vivants):
+            if camp is groupe:
+                membre.bonus_defense = 0
+            pv = membre.pv
+            traiter_statuts_debut_tour(membre)
+            if membre.pv != pv:
+                _constater(camp, membre)
+
+    initiative = ordre_initiative(groupe, ennemis, flux.initiative)
+    while initiative and groupe and ennemis:
+        _, rang, _, _, acteur = heapq.heappop(initiative)
+        if rang == GROUPE:
+            if acteur not in groupe:
+                continue
+            cible = ennemis.plus_faible()
+            action, competence = politique(acteur, cible, tour)
+            if action_joueur(acteur, cible, action, competence):
+                groupe.retirer(acteur)
+                fuyards.append(acteur)
+                continue
+            _constater(ennemis, cible)
+            _constater(groupe, acteur)
+        else:
+            if acteur not in ennemis:
+                continue
+            cible = groupe.au_hasard(flux.ciblage)
+            tour_ennemi(cible, acteur)
+            _constater(groupe, cible)
+
+    for camp in (groupe, ennemis):
+        for membre in list(camp.vivants):
+            pv = membre.pv
+            traiter_statuts_fin_tour(membre)
+            if membre.pv != pv:
+                _constater(camp, membre)
+
+
+def vagues_zone(zone, nb_vagues, taille, jeu=None, classe_joueur=None):
+    """
+    nb_vagues vagues de taille ennemis tirés dans Zone.ennemis_possibles, créées
+    à la demande (via jeu.ennemis et sa difficulté si jeu est fourni).
+    """
+    if not zone.ennemis_possibles:
+        raise ValueError(f"Aucun ennemi possible dans la zone {zone.nom}")
+    for numero_vague in range(1, nb_vagues + 1):
+        vague = []
+        for numero in range(1, taille + 1):
+            classe = zone.tirage_ennemis.tirer(flux.rencontres)
+            ennemi = jeu.ennemis.creer(classe, jeu.difficulte, classe_joueur) if jeu else classe()
+            ennemi.nom = f"{ennemi.nom} {numero_vague}.{numero}"
+            vague.append(ennemi)
+        yield vague
+
+
+def combat_groupe(membres, vagues, politique=politique_attaque, tours_max=500):
+    """
+    Le groupe (Personnage) affronte les vagues (listes d'Ennemi) l'une après
+    l'autre, sans soin entre deux vagues. Le groupe vise l'ennemi le plus
+    faible, les ennemis un membre au hasard.
+    """
+    groupe, fuyards = Camp(membres), []
+    tour = 1
+    vagues_vaincues, ennemis = 0, Camp()
+    for vague in vagues:
+        ennemis = Camp(vague)
+        while groupe and ennemis and tour <= tours_max:
+            tour_groupe(groupe, ennemis, politique, tour, fuyards)
+            tour += 1
+        if ennemis:
+            break
+        vagues_vaincues += 1
+
+    if not ennemis and groupe:
+        issue = "victoire"
+    elif groupe:
+        issue = "limite"
+    else:
+        issue = "fuite" if fuyards else "defaite"
+    debout = groupe.vivants + fuyards
+    return ResultatGroupe(issue, tour - 1, vagues_vaincues, len(debout),
+                          sum(membre.pv for membre in debout), len(ennemis))
+
+
+# =========================
+# Statistiques agrégées
+# =========================
+
+@dataclass
+class StatistiquesCombat:
+    combats: int = 0
+    victoires: int = 0
+    defaites: int = 0
+    fuites: int = 0
+    tours_victoire: Counter = field(default_factory=Counter)  # tours pour tuer -> nb de combats
+    pv_restants: Counter = field(default_factory=Counter)  # PV du joueur après victoire -> nb
+
+    def ajouter(self, resultat):
+        self.combats += 1
+        if resultat.issue == "victoire":
+            self.victoires += 1
+            self.tours_victoire[resultat.tours] += 1
+            self.pv_restants[resultat.pv_joueur] += 1
+        elif resultat.issue == "defaite":
+            self.defaites += 1
+        elif resultat.issue == "fuite":
+            self.fuites += 1
+
+    def fusionner(self, autre):
+        self.combats += autre.combats
+        self.victoires += autre.victoires
+        self.defaites += autre.defaites
+        self.fuites += autre.fuites
+        self.tours_victoire.update(autre.tours_victoire)
+        self.pv_restants.update(autre.pv_restants)
+        return self
+
+    @property
+    def taux_victoire(self):
+        return self.victoires / self.combats if self.combats else 0.0
+
+    def resume(self):
+        return {
+            "combats": self.combats,
+            "taux_victoire": self.taux_victoire,
+            "taux_defaite": self.defaites / self.combats if self.combats else 0.0,
+            "taux_fuite": self.fuites / self.combats if self.combats else 0.0,
+            "tours_moyens": _moyenne(self.tours_victoire),
+            "tours_p50": _quantile(self.tours_victoire, 0.5),
+            "tours_p90": _quantile(self.tours_victoire, 0.9),
+            "pv_moyens": _moyenne(self.pv_restants),
+            "pv_p10": _quantile(self.pv_restants, 0.1),
+            "pv_p50": _quantile(self.pv_restants, 0.5),
+        }
+
+
+def _moyenne(compteur):
+    total = sum(compteur.values())
+    return sum(v * n for v, n in compteur.items()) / total if total else 0.0
+
+
+def _quantile(compteur, q):
+    total = sum(compteur.values())
+    if not total:
+        return None
+    seuil = q * total
+    cumul = 0
+    for valeur in sorted(compteur):
+        cumul += compteur[valeur]
+        if cumul >= seuil:
+            return valeur
+    return valeur
+
+
+# =========================
+# Lots sur plusieurs processus
+# =========================
+
+def _simuler_bloc(fabrique_personnage, fabrique_ennemi, politique, nb, graine, index_bloc):
+    """Exécuté dans un processus de travail : nb combats, affichage coupé."""
+    # Flux dérivés du numéro de bloc, pas du processus : résultat indépendant du découpage
+    flux.initialiser(graine, (index_bloc,))
+    stats = StatistiquesCombat()
+    with bus.rediriger(SortieNulle()):
+        for _ in range(nb):
+            stats.ajouter(simuler_combat(fabrique_personnage(), fabrique_ennemi(), politique))
+    return stats
+
+
+def simuler_lot(fabrique_personnage, fabrique_ennemi, nb_combats, politique=politique_attaque,
+                processus=None, taille_bloc=20_000, graine=None):
+    """
+    Lance nb_combats combats indépendants et agrège les résultats.
+
+    Les fabriques et la politique doivent être picklables (classes, fonctions
+    de module ou functools.partial). processus=1 reste dans le processus courant.
+    Avec une graine, le résultat est identique au bit près quel que soit le
+    nombre de processus (à taille_bloc égale).
+    """
+    processus = processus or os.cpu_count() or 1
+    blocs = []
+    reste = nb_combats
+    while reste > 0:
+        nb = min(taille_bloc, reste)
+        blocs.append((fabrique_personnage, fabrique_ennemi, politique, nb, graine, len(blocs)))
+        reste -= nb
+
+    total = StatistiquesCombat()
+    if processus == 1 or len(blocs) == 1:
+        etat = flux.etat()
+        for bloc in blocs:
+            total.fusionner(_simuler_bloc(*bloc))
+        flux.restaurer(etat)
+        return total
+
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        for stats in pool.map(_simuler_bloc, *zip(*blocs)):
+            total.fusionner(stats)
+    return total
+
+
+# =========================
+# Dégâts vectorisés (numpy)
+# =========================
+
+def calcul_degats_lot(force1, defense, boucliers=None, variances=None, tirages_critique=None, rng=None):
+    """
+    Version vectorisée de calcul_degats pour N paires attaquant/cible.
+
+    Même distribution que le chemin scalaire : variance entière dans [-2, 2],
+    10% de critique x2, plancher à 1, puis absorption par les points de
+    bouclier. variances / tirages_critique permettent de fournir ses propres
+    tirages (sinon tirés avec rng). Renvoie (degats, boucliers_restants).
+    """
+    if np is None:
+        raise ImportError("calcul_degats_lot nécessite numpy (pip install numpy).")
+    rng = rng if rng is not None else np.random.default_rng()
+    force1 = np.asarray(force1, dtype=np.int64)
+    defense = np.asarray(defense, dtype=np.int64)
+    taille = np.broadcast_shapes(force1.shape, defense.shape)
+
+    if variances is None:
+        variances = rng.integers(-2, 3, size=taille)
+    if tirages_critique is None:
+        tirages_critique = rng.random(size=taille)
+
+    degats = force1 - defense + variances
+    degats = np.where(tirages_critique < 0.10, degats * 2, degats)
+    degats = np.maximum(degats, 1)
+
+    if boucliers is None:
+        return degats, np.zeros(taille, dtype=np.int64)
+    boucliers = np.broadcast_to(np.asarray(boucliers, dtype=np.int64), taille)
+    absorbe = np.minimum(degats, boucliers)
+    return degats - absorbe, boucliers - absorbe
+
+
+class _Cible:
+    """Cible minimale pour appeler calcul_degats hors combat."""
+    def __init__(self, defense, bouclier):
+        self.nom = "cible"
+        self.defense = defense
+        self.statuts = Statuts()
+        if bouclier:
+            self.statuts.ajouter(Shield(shield_points=bouclier))
+
+
+class _Attaquant:
+    def __init__(self, force1):
+        self.force1 = force1
+
+
+def comparer_calcul_degats(force1=50, defense=20, bouclier=0, nb=200_000, graine=7):
+    """
+    Compare les histogrammes du chemin scalaire et du chemin vectorisé.
+    Renvoie la distance en variation totale (proche de 0 si les lois coïncident).
+    """
+    flux.initialiser(graine)
+    scalaire = Counter()
+    with bus.rediriger(SortieNulle()):
+        attaquant = _Attaquant(force1)
+        for _ in range(nb):
+            scalaire[calcul_degats(attaquant, _Cible(defense, bouclier))] += 1
+
+    degats, _ = calcul_degats_lot(np.full(nb, force1), np.full(nb, defense), bouclier,
+                                  rng=np.random.default_rng(graine))
+    valeurs, comptes = np.unique(degats, return_counts=True)
+    vectorise = Counter(dict(zip(valeurs.tolist(), comptes.tolist())))
+
+    support = set(scalaire) | set(vectorise)
+    return 0.5 * sum(abs(scalaire[v] - vectorise[v]) / nb for v in support)
+
+
+def _benchmark_lot(nb=1_000_000):
+    for force1, defense, bouclier in ((50, 20, 0), (20, 25, 0), (50, 5, 40)):
+        distance = comparer_calcul_degats(force1, defense, bouclier)
+        print(f"force1={force1} defense={defense} bouclier={bouclier} : variation totale {distance:.4f}")
+
+    flux.initialiser(1)
+    attaquant, nb_scalaire = _Attaquant(50), nb // 10
+    with bus.rediriger(SortieNulle()):
+        debut = time.perf_counter()
+        for _ in range(nb_scalaire):
+            calcul_degats(attaquant, _Cible(20, 30))
+        duree_scalaire = (time.perf_counter() - debut) / nb_scalaire
+
+    rng = np.random.default_rng(1)
+    debut = time.perf_counter()
+    calcul_degats_lot(np.full(nb, 50), np.full(nb, 20), np.full(nb, 30), rng=rng)
+    duree_lot = (time.perf_counter() - debut) / nb
+    print(f"scalaire : {duree_scalaire * 1e9:.0f} ns/coup | lot : {duree_lot * 1e9:.1f} ns/coup "
+          f"| x{duree_scalaire / duree_lot:.0f}")
+
+
+def _benchmark_groupe():
+    from main import Jeu, Mage, Voleur
+
+    jeu = Jeu()
+    foret = jeu.zones["foret"]
+    flux.initialiser(3)
+    with bus.rediriger(SortieNulle()):
+        for taille in (1, 10, 100, 500):
+            classes = (Guerrier, Mage, Voleur)
+            membres = [classes[i % 3](f"Héros {i}") for i in range(taille)]
+            debut = time.perf_counter()
+            resultat = combat_groupe(membres, vagues_zone(foret, 3, taille, jeu))
+            duree = time.perf_counter() - debut
+            print(f"{taille:>4} contre {taille:>4} x 3 vagues : {resultat.issue:<9} en {resultat.tours:>3} tours, "
+                  f"{duree * 1000 / max(resultat.tours, 1):7.2f} ms/tour | {resultat.survivants} survivants")
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["lot"]:
+    _benchmark_lot()
+elif __name__ == "__main__" and sys.argv[1:] == ["groupe"]:
+    _benchmark_groupe()
+elif __name__ == "__main__":
+    nb = 200_000
+    debut = time.perf_counter()
+    stats = simuler_lot(partial(Guerrier, "Bot"), LoupSauvage, nb, graine=42)
+    duree = time.perf_counter() - debut
+    print(f"{nb} combats en {duree:.2f}s -> {nb / duree * 60:,.0f} combats/min ({os.cpu_count()} cœurs)")
+    for cle, valeur in stats.resume().items():
+        print(f"  {cle}: {valeur}")
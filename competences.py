@@ -0,0 +1,159 @@
+"""
+Registre des compétences : chaque compétence est une suite d'étapes déclarée
+une fois (formule de dégâts, statut, jet de chance...) et compilée en une
+fonction lancer(lanceur, cible), retrouvée par son identifiant (le nom
+affiché, celui de Personnage.competences) d'un seul accès au dictionnaire.
+
+Le module ne connaît pas main.py : les formules et les statuts viennent des
+déclarations (voir main.COMPETENCES), et le registre reçoit l'application
+des statuts et le tirage aléatoire à sa création, ce qui garde les tirages
+sur le flux du jeu courant (GameFacade remplace main.flux).
+
+Une étape est une fonction etape(contexte) ; si elle renvoie False, les
+étapes suivantes de la compétence ne sont pas jouées.
+
+    python competences.py       # coût d'un lancer : registre vs chaîne if/elif
+"""
+from messages import emettre
+
+
+class Contexte:
+    """État d'un lancer, partagé par ses étapes."""
+    __slots__ = ("registre", "lanceur", "cible", "degats")
+
+    def __init__(self, registre, lanceur, cible):
+        self.registre = registre
+        self.lanceur = lanceur
+        self.cible = cible
+        self.degats = 0  # derniers dégâts infligés
+
+
+class RegistreCompetences:
+    def __init__(self, appliquer_statut, tirage):
+        """appliquer_statut(entite, statut) ; tirage() -> float dans [0, 1)."""
+        self.appliquer_statut = appliquer_statut
+        self.tirage = tirage
+        self._lancers = {}
+        self.etapes = {}  # identifiant -> étapes déclarées
+
+    def declarer(self, identifiant, *etapes):
+        if identifiant in self._lancers:
+            raise ValueError(f"Compétence déjà déclarée : {identifiant!r}")
+        self.etapes[identifiant] = etapes
+        self._lancers[identifiant] = _compiler(self, etapes)
+        return self._lancers[identifiant]
+
+    def __getitem__(self, identifiant):
+        return self._lancers[identifiant]
+
+    def __contains__(self, identifiant):
+        return identifiant in self._lancers
+
+    def __len__(self):
+        return len(self._lancers)
+
+    def get(self, identifiant, defaut=None):
+        return self._lancers.get(identifiant, defaut)
+
+
+def _compiler(registre, etapes):
+    if len(etapes) == 1:
+        etape, = etapes
+
+        def lancer(lanceur, cible):
+            etape(Contexte(registre, lanceur, cible))
+        return lancer
+
+    def lancer(lanceur, cible):
+        contexte = Contexte(registre, lanceur, cible)
+        for etape in etapes:
+            if etape(contexte) is False:
+                return
+    return lancer
+
+
+# =========================
+# Étapes
+# =========================
+
+def degats(formule, titre, facteur=1.0, minimum=None):
+    """Inflige int(formule(lanceur, cible) * facteur) à la cible (au moins minimum)."""
+    gabarit = titre + " {cible_nom} perd {degats} PV (reste {cible_pv})."
+
+    def etape(contexte):
+        cible = contexte.cible
+        valeur = int(formule(contexte.lanceur, cible) * facteur)
+        if minimum is not None and valeur < minimum:
+            valeur = minimum
+        cible.pv -= valeur
+        contexte.degats = valeur
+        emettre("combat", gabarit, cible_nom=cible.nom, degats=valeur, cible_pv=cible.pv)
+    return etape
+
+
+def statut(fabrique, sur="cible"):
+    """Applique un statut neuf (fabrique()) à la cible ou au lanceur."""
+    def etape(contexte):
+        contexte.registre.appliquer_statut(getattr(contexte, sur), fabrique())
+    return etape
+
+
+def chance(probabilite, *etapes):
+    """Joue les étapes avec la probabilité donnée (un tirage par lancer)."""
+    def etape(contexte):
+        if contexte.registre.tirage() < probabilite:
+            for sous_etape in etapes:
+                if sous_etape(contexte) is False:
+                    return False
+    return etape
+
+
+def modifier(attribut, valeur, message, sur="lanceur"):
+    """Ajoute valeur à un attribut numérique (ex. bonus_defense, remis à zéro chaque tour)."""
+    def etape(contexte):
+        entite = getattr(contexte, sur)
+        setattr(entite, attribut, getattr(entite, attribut) + valeur)
+        emettre("combat", message, nom=entite.nom, valeur=valeur)
+    return etape
+
+
+def _benchmark(nb_competences=200, nb=200_000):
+    import time
+
+    from messages import bus, SortieNulle
+
+    class Cible:
+        nom, pv, defense = "Cible", 10 ** 9, 0
+
+    registre = RegistreCompetences(lambda entite, statut: None, lambda: 0.5)
+    noms = [f"Compétence {i}" for i in range(nb_competences)]
+    for i, nom in enumerate(noms):
+        registre.declarer(nom, degats(lambda lanceur, cible, i=i: i % 7 + 1, f"{nom} !"))
+
+    # Ancienne forme : une branche par compétence, comparée dans l'ordre (même effet au bout)
+    source = ["def par_chaine(nom, lanceur, cible):"]
+    for i, nom in enumerate(noms):
+        source.append(f"    {'if' if i == 0 else 'elif'} nom == {nom!r}:")
+        source.append(f"        effets[{i}](lanceur, cible)")
+    espace = {"effets": [registre[nom] for nom in noms]}
+    exec("\n".join(source), espace)
+    par_chaine = espace["par_chaine"]
+
+    lanceur, cible = Cible(), Cible()
+    with bus.rediriger(SortieNulle()):
+        for position in (0, nb_competences // 2, nb_competences - 1):
+            nom = noms[position]
+            debut = time.perf_counter()
+            for _ in range(nb):
+                par_chaine(nom, lanceur, cible)
+            chaine = time.perf_counter() - debut
+            debut = time.perf_counter()
+            for _ in range(nb):
+                registre[nom](lanceur, cible)
+            compile_ = time.perf_counter() - debut
+            print(f"compétence n°{position + 1:<4} if/elif {chaine / nb * 1e9:7.0f} ns | "
+                  f"registre {compile_ / nb * 1e9:7.0f} ns")
+
+
+if __name__ == "__main__":
+    _benchmark()
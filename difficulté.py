@@ -0,0 +1,238 @@
+"""
+Réglage automatique des multiplicateurs de NiveauDifficulte.
+
+Pour chaque niveau et chaque classe, on cherche l'échelle s telle que
+pv_multi * s et degats_multi * s (les valeurs de NIVEAUX, proportions
+gardées) donnent le taux de victoire visé contre le Gardien : grille
+d'échelles pour encadrer la cible, puis dichotomie.
+
+Le taux dépend de la façon de jouer. Par défaut il est exact (solveur.py)
+mais pour un joueur qui attaque à chaque tour, PV pleins ; les classes de
+POLITIQUES (celles dont la compétence change l'issue : Coup puissant,
+Boule de feu) sont évaluées par simulation (combat.simuler_lot, graine
+fixe) avec leur politique de strategy.py. Sans cela le Gardien du Mage
+serait réglé pour un Mage qui n'utilise jamais ses sorts, donc beaucoup
+trop faible. Le rapport indique la politique de chaque ligne.
+
+Les points d'une même étape sont évalués en parallèle sur un pool de
+processus, et le cache est indexé par les stats du duel après troncature
+entière, si bien que deux échelles qui donnent le même ennemi ne coûtent
+qu'une évaluation.
+
+Les réglages trouvés vont dans NiveauDifficulte.AJUSTEMENTS (installer), qui
+s'applique à chaque apparition d'ennemi d'un Jeu de ce niveau.
+
+    python difficulté.py        # réglage, rapport, et contrôle par simulation
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+import main
+import solveur
+import strategy
+from combat import simuler_lot
+
+CIBLES = {"facile": 0.90, "normal": 0.70, "difficile": 0.45}
+CLASSES = ("Guerrier", "Mage", "Voleur")
+# Classe -> politique de strategy.py (évaluation simulée) ; absente : attaque seule, taux exact
+POLITIQUES = {"Guerrier": "politique_competence", "Mage": "politique_competence"}
+NB_SIMULATIONS = 2000  # combats par point simulé (écart type ~0.01)
+GRAINE_SIMULATION = 3
+TOLERANCE_SIMULATION = 0.02  # ~2 écarts types : plus fin n'aurait pas de sens sur un taux simulé
+ECHELLES = tuple(2 ** (k / 2) for k in range(-8, 5))  # 1/16 .. 4
+TOLERANCE = 0.005
+ITERATIONS_MAX = 30
+
+
+# =========================
+# Évaluation
+# =========================
+
+def stats_duel(classe, multi, ennemi="GardienDonjon", politique=None):
+    """
+    Clé de cache du duel pour un ennemi réglé par multi : tuple de stats de
+    solveur.py (politique None), ou (politique, classe, ennemi, pv, pv_max,
+    defense, force1) pour une évaluation simulée.
+    """
+    adversaire = main.NiveauDifficulte.appliquer_multiplicateurs(getattr(main, ennemi)(), multi)
+    if politique is None:
+        return solveur.stats_combat(getattr(main, classe)("Bot"), adversaire)
+    return (politique, classe, ennemi, adversaire.pv, adversaire.pv_max, adversaire.defense, adversaire.force1)
+
+
+def _ennemi_regle(ennemi, pv, pv_max, defense, force1):
+    adversaire = getattr(main, ennemi)()
+    adversaire.pv, adversaire.pv_max, adversaire.defense, adversaire.force1 = pv, pv_max, defense, force1
+    return adversaire
+
+
+def _evaluer(point):
+    """Exécuté dans un processus de travail."""
+    if isinstance(point[0], str):
+        politique, classe, ennemi, *stats = point
+        return simuler_lot(partial(getattr(main, classe), "Bot"), partial(_ennemi_regle, ennemi, *stats),
+                           NB_SIMULATIONS, getattr(strategy, politique), processus=1,
+                           graine=GRAINE_SIMULATION).taux_victoire
+    return solveur.resoudre_stats(*point).victoire
+
+
+class CacheEvaluations:
+    """stats du duel -> taux de victoire, éventuellement conservé dans un fichier JSON."""
+
+    def __init__(self, chemin=None):
+        self.chemin = chemin
+        self.taux = {}
+        self.evaluations = self.reutilisations = 0
+        if chemin and os.path.exists(chemin):
+            with open(chemin, encoding="utf-8") as fichier:
+                self.taux = {tuple(stats): taux for stats, taux in json.load(fichier)}
+
+    def evaluer(self, points, pool=None):
+        """Taux de victoire de chaque point (tuple de stats) ; les inconnus sont calculés en parallèle."""
+        manquants = list(dict.fromkeys(stats for stats in points if stats not in self.taux))
+        self.reutilisations += len(points) - len(manquants)
+        self.evaluations += len(manquants)
+        resultats = pool.map(_evaluer, manquants) if pool and len(manquants) > 1 else map(_evaluer, manquants)
+        self.taux.update(zip(manquants, resultats))
+        return [self.taux[stats] for stats in points]
+
+    def enregistrer(self):
+        if self.chemin:
+            with open(self.chemin, "w", encoding="utf-8") as fichier:
+                json.dump([[list(stats), taux] for stats, taux in self.taux.items()], fichier)
+
+
+# =========================
+# Recherche
+# =========================
+
+def _multi(niveau, echelle):
+    base = main.NiveauDifficulte.NIVEAUX[niveau]
+    return {**base, "pv_multi": round(base["pv_multi"] * echelle, 4),
+            "degats_multi": round(base["degats_multi"] * echelle, 4)}
+
+
+def regler(cibles=CIBLES, classes=CLASSES, ennemi="GardienDonjon", processus=None, cache=None,
+           tolerance=TOLERANCE, politiques=POLITIQUES):
+    """
+    Renvoie {(niveau, classe): réglage} ; un réglage contient les multiplicateurs
+    choisis, le taux obtenu, la politique évaluée (None : attaque seule, taux
+    exact), la cible, atteinte (à tolerance près, TOLERANCE_SIMULATION pour
+    un taux simulé) et encadree
+    (False si la cible sort de la plage d'échelles : on garde alors le point le
+    plus proche). Encadrée mais pas atteinte : le taux saute d'un palier à
+    l'autre quand une stat entière change.
+    """
+    cache = cache or CacheEvaluations()
+    processus = processus or os.cpu_count() or 1
+    paires = [(niveau, classe) for niveau in cibles for classe in classes]
+    tolerances = {paire: tolerance if politiques.get(paire[1]) is None else max(tolerance, TOLERANCE_SIMULATION)
+                  for paire in paires}
+
+    def taux(echelles):
+        """echelles : {paire: échelle} -> {paire: taux}, une seule passe parallèle."""
+        points = [stats_duel(classe, _multi(niveau, echelle), ennemi, politiques.get(classe))
+                  for (niveau, classe), echelle in echelles.items()]
+        return dict(zip(echelles, cache.evaluer(points, pool)))
+
+    with ProcessPoolExecutor(max_workers=processus) if processus > 1 else nullcontext() as pool:
+        # Grille : le taux décroît avec l'échelle ; on encadre la cible
+        grille = {paire: [] for paire in paires}
+        for echelle in ECHELLES:
+            for paire, valeur in taux({paire: echelle for paire in paires}).items():
+                grille[paire].append((echelle, valeur))
+
+        reglages, encadrements = {}, {}
+        for paire, points in grille.items():
+            cible = cibles[paire[0]]
+            haut = [(e, t) for e, t in points if t >= cible]  # échelles assez faciles
+            bas = [(e, t) for e, t in points if t < cible]
+            if haut and bas:
+                encadrements[paire] = (max(haut), min(bas))
+            else:
+                reglages[paire] = min(points, key=lambda point: abs(point[1] - cible))
+
+        # Dichotomie (géométrique) sur toutes les paires encore encadrées à la fois
+        for _ in range(ITERATIONS_MAX):
+            actifs = {paire: (facile[0] * difficile[0]) ** 0.5
+                      for paire, (facile, difficile) in encadrements.items()
+                      if abs(facile[1] - cibles[paire[0]]) > tolerances[paire]
+                      and abs(difficile[1] - cibles[paire[0]]) > tolerances[paire]
+                      and difficile[0] / facile[0] > 1.001}
+            if not actifs:
+                break
+            for paire, valeur in taux(actifs).items():
+                facile, difficile = encadrements[paire]
+                point = (actifs[paire], valeur)
+                encadrements[paire] = (point, difficile) if valeur >= cibles[paire[0]] else (facile, point)
+
+        for paire, (facile, difficile) in encadrements.items():
+            reglages[paire] = min((facile, difficile), key=lambda point: abs(point[1] - cibles[paire[0]]))
+
+    cache.enregistrer()
+    resultat = {}
+    for (niveau, classe), (echelle, valeur) in reglages.items():
+        multi = _multi(niveau, echelle)
+        resultat[niveau, classe] = {
+            "pv_multi": multi["pv_multi"], "degats_multi": multi["degats_multi"], "taux": valeur,
+            "politique": politiques.get(classe), "cible": cibles[niveau],
+            "atteinte": abs(valeur - cibles[niveau]) <= tolerances[niveau, classe],
+            "encadree": (niveau, classe) in encadrements,
+        }
+    return resultat
+
+
+def installer(reglages):
+    """Met les réglages dans NiveauDifficulte.AJUSTEMENTS (parties créées ensuite)."""
+    for (niveau, classe), reglage in reglages.items():
+        main.NiveauDifficulte.AJUSTEMENTS.setdefault(niveau, {})[classe] = {
+            "pv_multi": reglage["pv_multi"], "degats_multi": reglage["degats_multi"]}
+    main.Jeu.ennemis.vider()  # prototypes réglés avec les anciens multiplicateurs
+
+
+def rapport(reglages, cache=None):
+    lignes = [f"{'niveau':<10} {'classe':<9} {'pv_multi':>8} {'degats':>7} {'taux':>7} {'cible':>6}  "
+              f"{'évalué avec':<32}"]
+    for (niveau, classe), reglage in reglages.items():
+        politique = reglage.get("politique")
+        evaluation = f"{politique} (simulé)" if politique else "attaque seule (exact)"
+        lignes.append(f"{niveau:<10} {classe:<9} {reglage['pv_multi']:8.3f} {reglage['degats_multi']:7.3f} "
+                      f"{reglage['taux']:7.3f} {reglage['cible']:6.2f}  {evaluation:<32}"
+                      + ("" if reglage["atteinte"] else "  (palier)" if reglage["encadree"] else "  (hors de portée)"))
+    if cache is not None:
+        lignes.append(f"{cache.evaluations} évaluations, {cache.reutilisations} reprises du cache")
+    ajustements = {}
+    for (niveau, classe), reglage in reglages.items():
+        ajustements.setdefault(niveau, {})[classe] = {"pv_multi": reglage["pv_multi"],
+                                                     "degats_multi": reglage["degats_multi"]}
+    lignes.append(f"AJUSTEMENTS = {ajustements!r}")
+    return "\n".join(lignes)
+
+
+if __name__ == "__main__":
+    cache = CacheEvaluations()
+    debut = time.perf_counter()
+    reglages = regler(cache=cache)
+    duree = time.perf_counter() - debut
+    print(rapport(reglages, cache))
+    print(f"Réglage en {duree:.2f} s ({os.cpu_count()} cœurs)")
+
+    # Relance : tout vient du cache
+    debut = time.perf_counter()
+    regler(cache=cache)
+    print(f"Relance (cache) en {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    # Contrôle : combats simulés avec les ennemis tels que Jeu les fait apparaître
+    installer(reglages)
+    jeu = main.Jeu()
+    for (niveau, classe), reglage in reglages.items():
+        jeu.difficulte = niveau
+        joueur = getattr(main, classe)
+        politique = getattr(strategy, reglage["politique"] or "politique_attaque")
+        stats = simuler_lot(partial(joueur, "Bot"), partial(jeu.apparition_boss, joueur("Bot")),
+                            5000, politique, processus=1, graine=7)
+        print(f"{niveau:<10} {classe:<9} réglage {reglage['taux']:.3f} | partie simulée {stats.taux_victoire:.3f}")
@@ -0,0 +1,251 @@
+"""
+Stockage compact des ennemis pour les grandes rencontres et les longues simulations.
+
+TableEnnemis range les statistiques qui changent en combat dans des colonnes
+typées (array), une ligne par ennemi. Le reste (nom, type, particularités,
+méthodes) est partagé via l'instance modèle dont la ligne est issue.
+VueEnnemi expose une ligne avec la même API d'attributs qu'un Ennemi, mais
+n'en est pas un : isinstance(vue, Ennemi) est faux (action_attaquer ne met
+donc pas sa phase à jour), type() et pickle voient une VueEnnemi. C'est un
+format de stockage et de mesure, pas un ennemi de combat.
+
+FabriqueEnnemis fait apparaître les ennemis du jeu par copie d'un prototype
+déjà réglé pour la difficulté.
+
+    python ennemis.py           # mémoire de 1M ennemis : objets vs table
+    python ennemis.py fabrique  # apparitions : construction vs prototype
+"""
+from array import array
+
+
+class _Colonne:
+    """Attribut d'une VueEnnemi lu / écrit dans la colonne du même nom."""
+    __slots__ = ("nom",)
+
+    def __set_name__(self, proprietaire, nom):
+        self.nom = nom
+
+    def __get__(self, vue, proprietaire=None):
+        if vue is None:
+            return self
+        return getattr(vue.table, self.nom)[vue.index]
+
+    def __set__(self, vue, valeur):
+        getattr(vue.table, self.nom)[vue.index] = valeur
+
+
+class VueEnnemi:
+    """Ligne de TableEnnemis avec les attributs d'un Ennemi (pv, defense, statuts, mettre_a_jour_phase...)."""
+    __slots__ = ("table", "index")
+
+    pv = _Colonne()
+    pv_max = _Colonne()
+    force1 = _Colonne()
+    defense = _Colonne()
+    agilite = _Colonne()
+    phase = _Colonne()
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def statuts(self):
+        return self.table.statuts(self.index)
+
+    def __getattr__(self, nom):
+        # Attributs et méthodes non stockés en colonne : ceux du modèle
+        modele = self.table.modele_de(self.index)
+        attribut = getattr(type(modele), nom, None)
+        if callable(attribut):
+            return attribut.__get__(self)
+        return getattr(modele, nom)
+
+    def __str__(self):
+        return f"{self.nom} ({self.type}, phase {self.phase})"
+
+
+class TableEnnemis:
+    """Ennemis en colonnes typées (struct-of-arrays)."""
+    COLONNES = ("pv", "pv_max", "force1", "defense", "agilite", "phase")
+    FORCE_PAR_DEFAUT = 25  # même valeur que le tour ennemi quand force1 manque
+
+    def __init__(self):
+        for colonne in self.COLONNES:
+            setattr(self, colonne, array("i"))
+        self.modele = array("I")  # index dans self.modeles
+        self.modeles = []
+        self._index_modeles = {}
+        self._statuts = {}  # index -> Statuts, créés au premier accès
+
+    def __len__(self):
+        return len(self.pv)
+
+    def __iter__(self):
+        return (VueEnnemi(self, i) for i in range(len(self)))
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return VueEnnemi(self, index)
+
+    def _modele(self, ennemi):
+        cle = (type(ennemi), ennemi.nom)
+        if cle not in self._index_modeles:
+            self._index_modeles[cle] = len(self.modeles)
+            self.modeles.append(ennemi)
+        return self._index_modeles[cle]
+
+    def modele_de(self, index):
+        return self.modeles[self.modele[index]]
+
+    def ajouter(self, ennemi, nb=1):
+        """Ajoute nb lignes copiées de ennemi ; renvoie l'index de la première."""
+        debut = len(self)
+        valeurs = (ennemi.pv, ennemi.pv_max, getattr(ennemi, "force1", self.FORCE_PAR_DEFAUT),
+                   ennemi.defense, ennemi.agilite, ennemi.phase)
+        for colonne, valeur in zip(self.COLONNES, valeurs):
+            getattr(self, colonne).extend(array("i", [valeur]) * nb)
+        self.modele.extend(array("I", [self._modele(ennemi)]) * nb)
+        return debut
+
+    def statuts(self, index):
+        statuts = self._statuts.get(index)
+        if statuts is None:
+            statuts = self._statuts[index] = type(self.modele_de(index).statuts)()
+        return statuts
+
+    def vivants(self):
+        return [i for i, pv in enumerate(self.pv) if pv > 0]
+
+
+# =========================
+# Fabrique à prototypes
+# =========================
+
+def _attributs(classe):
+    """Slots d'une classe d'ennemi, sauf statuts (jamais partagés)."""
+    noms = []
+    for base in reversed(classe.__mro__):
+        noms += [nom for nom in base.__dict__.get("__slots__", ()) if nom != "statuts" and nom not in noms]
+    return noms
+
+
+class FabriqueEnnemis:
+    """
+    Un prototype par (classe d'ennemi, niveau, classe du joueur), construit au
+    premier besoin puis passé par regler(ennemi, niveau, classe_joueur) ;
+    creer() en recopie les attributs sans rappeler __init__ ni le réglage.
+
+    statuts : fabrique des Statuts d'un ennemi neuf ; par défaut la classe de
+    ceux du prototype (ce module n'importe jamais main, qui peut tourner en
+    __main__).
+    """
+
+    def __init__(self, regler=None, statuts=None):
+        self.regler = regler
+        self.statuts = statuts
+        self._prototypes = {}  # (classe, niveau, classe_joueur) -> ((nom, valeur)..., fabrique de statuts)
+
+    def prototype(self, classe, niveau=None, classe_joueur=None):
+        cle = (classe, niveau, classe_joueur)
+        prototype = self._prototypes.get(cle)
+        if prototype is None:
+            modele = classe()
+            if self.regler is not None:
+                modele = self.regler(modele, niveau, classe_joueur)
+            attributs = tuple((nom, getattr(modele, nom)) for nom in _attributs(classe) if hasattr(modele, nom))
+            prototype = self._prototypes[cle] = (attributs, self.statuts or type(modele.statuts))
+        return prototype
+
+    def creer(self, classe, niveau=None, classe_joueur=None):
+        attributs, statuts = (self._prototypes.get((classe, niveau, classe_joueur))
+                              or self.prototype(classe, niveau, classe_joueur))
+        ennemi = classe.__new__(classe)
+        ennemi.statuts = statuts()
+        for nom, valeur in attributs:
+            setattr(ennemi, nom, valeur)
+        return ennemi
+
+    def vider(self):
+        """Oublie les prototypes (après un changement de réglage)."""
+        self._prototypes.clear()
+
+
+def _mesurer(construire):
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    objet = construire()
+    taille = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objet, taille
+
+
+class _EnnemiAvant:
+    """Ennemi tel qu'avant les __slots__ : __dict__, particularités en liste, statuts en liste."""
+    def __init__(self, modele):
+        for nom in ("nom", "type", "pv", "pv_max", "difficulte", "phase", "defense", "agilite"):
+            setattr(self, nom, getattr(modele, nom))
+        self.particularites = list(modele.particularites)
+        self.statuts = []
+
+
+def _table_pleine(nb):
+    from main import LoupSauvage
+
+    table = TableEnnemis()
+    table.ajouter(LoupSauvage(), nb)
+    return table
+
+
+def _benchmark_fabrique(nb=1_000_000):
+    import time
+
+    from main import GardienDonjon, LoupSauvage, NiveauDifficulte
+
+    def construction():
+        for _ in range(nb):
+            NiveauDifficulte.appliquer_stats(LoupSauvage(), "difficile", "Guerrier")
+
+    def prototype():
+        fabrique = FabriqueEnnemis(NiveauDifficulte.appliquer_stats)
+        for _ in range(nb):
+            fabrique.creer(LoupSauvage, "difficile", "Guerrier")
+
+    reference = NiveauDifficulte.appliquer_stats(GardienDonjon(), "difficile", "Guerrier")
+    copie = FabriqueEnnemis(NiveauDifficulte.appliquer_stats).creer(GardienDonjon, "difficile", "Guerrier")
+    assert all(getattr(copie, nom) == getattr(reference, nom) for nom in _attributs(GardienDonjon))
+
+    for libelle, apparitions in (
+        ("construction + appliquer_stats", construction),
+        ("FabriqueEnnemis", prototype),
+    ):
+        debut = time.perf_counter()
+        apparitions()
+        duree = time.perf_counter() - debut
+        print(f"{libelle:<32} {duree:6.2f} s  ({duree / nb * 1e9:.0f} ns/ennemi)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    from main import LoupSauvage
+
+    if sys.argv[1:] == ["fabrique"]:
+        _benchmark_fabrique()
+        sys.exit()
+
+    nb = 1_000_000
+    loup = LoupSauvage()
+
+    for libelle, construire in (
+        ("objets à __dict__ (avant)", lambda: [_EnnemiAvant(loup) for _ in range(nb)]),
+        ("objets à __slots__", lambda: [LoupSauvage() for _ in range(nb)]),
+        ("TableEnnemis", lambda: _table_pleine(nb)),
+    ):
+        _, taille = _mesurer(construire)
+        print(f"{libelle:<28} {taille / 2**20:8.1f} Mo  ({taille / nb:.0f} octets/ennemi)")
+
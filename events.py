@@ -0,0 +1,167 @@
+"""
+Événements d'exploration : registre nom -> gestionnaire.
+
+Un gestionnaire s'enregistre une fois (registre.enregistrer) et reçoit
+(jeu, joueur, zone) ; il renvoie False pour interrompre l'exploration comme
+Jeu.explorer, tout autre résultat vaut True. Chaque zone compile sa liste
+pondérée au chargement en TableAlias d'objets Evenement : le tirage désigne
+directement l'événement, sans chercher de gestionnaire par nom.
+
+Un Evenement est créé à la première mention de son nom, même si aucun
+gestionnaire n'est encore enregistré (il est alors sans effet) ; enregistrer
+le complète en place, si bien que les tables déjà compilées le voient.
+
+Crochets avant/apres (instrumentation) : tant qu'il n'y en a aucun,
+Evenement.executer est le gestionnaire lui-même ; en ajouter ou en retirer
+recompose executer pour tous les événements, une fois.
+
+Les événements interactifs (saisie du joueur : combat, marchand, boss)
+sont joués par Jeu.explorer avec leur gestionnaire ; GameFacade les découpe
+en décisions et ne passe par executer que pour les autres.
+
+    python events.py        # coût d'une exploration : chaîne if/elif vs table, avec et sans crochet
+"""
+from zone import TableAlias
+
+
+def _sans_effet(jeu, joueur, zone):
+    return True
+
+
+class Evenement:
+    __slots__ = ("nom", "traiter", "interactif", "executer")
+
+    def __init__(self, nom, traiter=None, interactif=False):
+        self.nom = nom
+        self.traiter = traiter or _sans_effet
+        self.interactif = interactif
+        self.executer = self.traiter  # recomposé par le registre quand il y a des crochets
+
+    def __repr__(self):
+        return f"Evenement({self.nom!r})"
+
+    def __reduce__(self):
+        # Les gestionnaires ne se copient pas : on retrouve l'événement par son nom
+        return evenement, (self.nom,)
+
+
+class RegistreEvenements:
+    def __init__(self):
+        self._par_nom = {}
+        self.avant = []  # crochet(evenement, jeu, joueur, zone)
+        self.apres = []  # crochet(evenement, jeu, joueur, zone, resultat)
+
+    def evenement(self, nom):
+        """L'Evenement de ce nom (créé sans effet s'il n'existe pas encore)."""
+        evenement = self._par_nom.get(nom)
+        if evenement is None:
+            evenement = self._par_nom[nom] = Evenement(nom)
+        return evenement
+
+    def enregistrer(self, nom, traiter=None, interactif=False):
+        """Enregistre traiter(jeu, joueur, zone) ; utilisable en décorateur si traiter est omis."""
+        if traiter is None:
+            def decorateur(fonction):
+                self.enregistrer(nom, fonction, interactif)
+                return fonction
+            return decorateur
+        evenement = self.evenement(nom)
+        if evenement.traiter is not _sans_effet:
+            raise ValueError(f"Événement déjà enregistré : {nom!r}")
+        evenement.traiter = traiter
+        evenement.interactif = interactif
+        self._composer(evenement)
+        return evenement
+
+    def __contains__(self, nom):
+        return nom in self._par_nom and self._par_nom[nom].traiter is not _sans_effet
+
+    def compiler(self, evenements):
+        """[(nom, poids)] -> TableAlias d'Evenement (une fois par zone)."""
+        return TableAlias((self.evenement(nom), poids) for nom, poids in evenements)
+
+    # =========================
+    # Crochets
+    # =========================
+
+    def ajouter_crochet(self, avant=None, apres=None):
+        if avant:
+            self.avant.append(avant)
+        if apres:
+            self.apres.append(apres)
+        self._composer_tout()
+
+    def retirer_crochet(self, avant=None, apres=None):
+        if avant:
+            self.avant.remove(avant)
+        if apres:
+            self.apres.remove(apres)
+        self._composer_tout()
+
+    def _composer_tout(self):
+        for evenement in self._par_nom.values():
+            self._composer(evenement)
+
+    def _composer(self, evenement):
+        if not (self.avant or self.apres):
+            evenement.executer = evenement.traiter
+            return
+        traiter, avant, apres = evenement.traiter, tuple(self.avant), tuple(self.apres)
+
+        def executer(jeu, joueur, zone):
+            for crochet in avant:
+                crochet(evenement, jeu, joueur, zone)
+            resultat = traiter(jeu, joueur, zone)
+            for crochet in apres:
+                crochet(evenement, jeu, joueur, zone, resultat)
+            return resultat
+        evenement.executer = executer
+
+
+registre = RegistreEvenements()
+
+
+def evenement(nom):
+    """Evenement du registre global (utilisé par le pickle)."""
+    return registre.evenement(nom)
+
+
+def _benchmark(nb=500_000):
+    import random
+    import time
+
+    registre = RegistreEvenements()
+    noms = ["combat", "coffre", "dialogue", "cle", "repos", "marchand", "boss"]
+    noms += [f"evenement_{i}" for i in range(20)]  # types ajoutés par le contenu
+    for nom in noms:
+        registre.enregistrer(nom, lambda jeu, joueur, zone: True)
+    table = registre.compiler([(nom, 1) for nom in noms])
+    table_noms = TableAlias((nom, 1) for nom in noms)
+
+    # Ancienne forme : nom tiré puis comparé branche par branche
+    source = ["def par_chaine(nom, jeu, joueur, zone):"]
+    for i, nom in enumerate(noms):
+        source.append(f"    {'if' if i == 0 else 'elif'} nom == {nom!r}:")
+        source.append(f"        return gestionnaires[{i}](jeu, joueur, zone)")
+    espace = {"gestionnaires": [registre.evenement(nom).traiter for nom in noms]}
+    exec("\n".join(source), espace)
+    par_chaine = espace["par_chaine"]
+
+    def mesurer(explorer):
+        rng = random.Random(1)
+        debut = time.perf_counter()
+        for _ in range(nb):
+            explorer(rng)
+        return (time.perf_counter() - debut) / nb * 1e9
+
+    chaine = mesurer(lambda rng: par_chaine(table_noms.tirer(rng), None, None, None))
+    directe = mesurer(lambda rng: table.tirer(rng).executer(None, None, None))
+    appels = []
+    registre.ajouter_crochet(avant=lambda evenement, jeu, joueur, zone: appels.append(evenement.nom))
+    crochet = mesurer(lambda rng: table.tirer(rng).executer(None, None, None))
+    print(f"{len(noms)} types d'événements, ns par exploration (tirage compris) : if/elif {chaine:.0f} | "
+          f"table {directe:.0f} | table + 1 crochet {crochet:.0f} ({len(appels)} appels comptés)")
+
+
+if __name__ == "__main__":
+    _benchmark()
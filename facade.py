@@ -0,0 +1,266 @@
+"""
+Le jeu vu comme une machine à états, sans aucune lecture de l'entrée standard.
+
+    partie = GameFacade("Guerrier", "Aria", graine=42)
+    partie.observe()                      # {"decision": "menu", "actions": (...), ...}
+    partie.step("foret")
+    partie.step(["attaquer", "competence:Charge"])   # plusieurs actions par appel
+
+Décisions possibles : "combat", "marchand", "menu", et "fin" (plus aucune
+action). Les pauses « Appuie sur Entrée » du terminal ne sont pas des
+décisions et sont sautées. Le déroulé est celui de jeu_principal : mêmes
+fonctions de main.py, mêmes tirages. Chaque partie a ses propres flux
+aléatoires, donc deux parties de même graine jouées avec les mêmes actions
+restent identiques même entrelacées avec d'autres.
+
+    python facade.py            # parties jouées au hasard, parties/s et actions/s
+"""
+import contextlib
+
+import main
+from aleatoire import FluxAleatoires
+from messages import bus, SortieMemoire, SortieNulle
+
+CLASSES = {"Guerrier": main.Guerrier, "Mage": main.Mage, "Voleur": main.Voleur}
+DIFFICULTES = tuple(main.NiveauDifficulte.NIVEAUX)
+
+# Action -> choix équivalent au terminal
+ACTIONS_MENU = {"village": "1", "foret": "2", "donjon": "3", "statut": "4",
+                "sauvegarder": "5", "charger": "6", "quitter": "0"}
+ACTIONS_FICHIERS = ("sauvegarder", "charger")  # lisent / écrivent sauvegarde.json du dossier courant
+ACTIONS_ZONES = ("village", "foret", "donjon")  # remplacées par les sorties en monde procédural
+ACTIONS_MARCHAND = {"potion": "1", "epee": "2", "armure": "3", "partir": "4"}
+ACTIONS_COMBAT = ("attaquer", "objet", "defendre", "fuir")  # plus "competence:<nom>"
+
+
+class ActionInvalide(ValueError):
+    """Action hors des actions légales ; nb_appliquees actions du lot ont été jouées avant."""
+
+    def __init__(self, message, nb_appliquees=0):
+        super().__init__(message)
+        self.nb_appliquees = nb_appliquees
+
+
+def _saisie_interdite(invite=""):
+    raise RuntimeError(f"GameFacade ne lit jamais l'entrée standard (invite {invite!r})")
+
+
+class GameFacade:
+    def __init__(self, classe="Guerrier", nom="Héros", graine=None, messages=False, etat=None,
+                 difficulte="normal", fichiers=True, monde=None):
+        """messages=True : observe() renvoie aussi les textes émis depuis l'observation précédente.
+        etat : sauvegarde (Jeu.etat_sauvegarde) à reprendre au lieu d'une nouvelle partie, avec sa
+        difficulté (l'argument difficulte ne sert qu'aux nouvelles parties).
+        fichiers=False : pas d'actions sauvegarder / charger (parties du serveur, sauvegardées par lui).
+        monde : monde.Monde où jouer ; recréé depuis etat si la sauvegarde vient d'un monde."""
+        self.flux = FluxAleatoires(graine)
+        if monde is None and etat and etat.get("monde"):
+            from monde import Monde
+
+            monde = Monde(**etat["monde"])
+        self._actions_menu = tuple(action for action in ACTIONS_MENU
+                                   if (fichiers or action not in ACTIONS_FICHIERS)
+                                   and (monde is None or action not in ACTIONS_ZONES))
+        self._sortie = SortieMemoire() if messages else SortieNulle()
+        self.jeu = main.Jeu(difficulte, monde=monde)
+        self.tour = 0  # tours de la boucle principale
+        self.decision = None
+        self.actions = ()
+        self.resultat = None
+        self.ennemi = None
+        self.tour_combat = 0
+        self._boss = False
+        with self._contexte():
+            self.joueur = self.jeu.restaurer(etat) if etat else CLASSES[classe](nom)
+            self._nouveau_tour()
+
+    @contextlib.contextmanager
+    def _contexte(self):
+        """Flux de la partie, sorties de la partie, et aucune saisie possible."""
+        flux_jeu, entree = main.flux, bus.entree
+        main.flux, bus.entree = self.flux, _saisie_interdite
+        try:
+            with bus.rediriger(self._sortie):
+                yield
+        finally:
+            main.flux, bus.entree = flux_jeu, entree
+
+    # ==========================
+    # API
+    # ==========================
+
+    def observe(self):
+        joueur, ennemi = self.joueur, self.ennemi
+        observation = {
+            "decision": self.decision,
+            "actions": self.actions,
+            "tour": self.tour,
+            "zone": self.jeu.position,
+            "or": self.jeu.or_,
+            "quete": self.jeu.quete.etat,
+            "joueur": {"pv": joueur.pv, "pv_max": joueur.pv_max, "objets": len(joueur.inventory)},
+            "ennemi": None if ennemi is None else {"nom": ennemi.nom, "pv": ennemi.pv, "pv_max": ennemi.pv_max},
+            "tour_combat": self.tour_combat if ennemi is not None else 0,
+            "resultat": self.resultat,
+        }
+        if isinstance(self._sortie, SortieMemoire):
+            observation["messages"] = self._sortie.relever()
+        return observation
+
+    def step(self, actions):
+        """Joue une action, ou une suite d'actions dans l'ordre ; renvoie observe()."""
+        self.avancer(actions)
+        return self.observe()
+
+    def avancer(self, actions):
+        """step() sans construire d'observation (boucles de bots)."""
+        if isinstance(actions, str):
+            actions = (actions,)
+        with self._contexte():
+            for nb_appliquees, action in enumerate(actions):
+                if action not in self.actions:
+                    raise ActionInvalide(f"{action!r} invalide pour la décision {self.decision!r} "
+                                         f"(attendu : {', '.join(self.actions) or 'aucune'})", nb_appliquees)
+                if self.decision == "combat":
+                    self._combat(action)
+                elif self.decision == "menu":
+                    self._menu(action)
+                else:
+                    self.jeu.acheter(self.joueur, ACTIONS_MARCHAND[action])
+                    self._apres_exploration()
+
+    def sauvegarde(self):
+        """État de sauvegarde (entre deux tours : un combat en cours n'y figure pas)."""
+        return self.jeu.etat_sauvegarde(self.joueur)
+
+    @property
+    def terminee(self):
+        return self.decision == "fin"
+
+    # ==========================
+    # Transitions
+    # ==========================
+
+    def _attendre(self, decision, actions):
+        self.decision = decision
+        self.actions = actions
+
+    def _nouveau_tour(self):
+        """Début d'un tour de boucle principale : exploration de la zone courante."""
+        jeu, joueur = self.jeu, self.joueur
+        if not main.partie_en_cours(jeu, joueur):
+            return self._finir("arret")
+        evenement = jeu.debut_exploration()
+        if evenement is None:
+            self._apres_exploration()
+        elif evenement.interactif:
+            transition = self._INTERACTIFS.get(evenement.nom)
+            if transition is None:
+                raise NotImplementedError(f"Événement interactif {evenement.nom!r} sans décision dans GameFacade")
+            transition(self)
+        else:
+            jeu.declencher(evenement, joueur)
+            self._apres_exploration()
+
+    # Événements qui demandent une saisie au terminal : découpés en décisions
+    def _evenement_combat(self):
+        jeu = self.jeu
+        self._engager(jeu.tirer_ennemi(jeu.zones[jeu.position], self.joueur), boss=False)
+
+    def _evenement_boss(self):
+        self._engager(self.jeu.apparition_boss(self.joueur), boss=True)
+
+    def _evenement_marchand(self):
+        self.jeu.afficher_marchand()
+        self._attendre("marchand", tuple(ACTIONS_MARCHAND))
+
+    _INTERACTIFS = {"combat": _evenement_combat, "boss": _evenement_boss, "marchand": _evenement_marchand}
+
+    def _apres_exploration(self):
+        if not main.partie_en_cours(self.jeu, self.joueur):
+            return self._finir("arret")
+        main.afficher_menu_principal(self.jeu)
+        monde = self.jeu.monde
+        sorties = () if monde is None else tuple(monde.sorties_ouvertes(self.jeu))
+        self._attendre("menu", sorties + self._actions_menu)
+
+    def _menu(self, action):
+        joueur = main.appliquer_menu_principal(self.jeu, self.joueur, ACTIONS_MENU.get(action, action))
+        if joueur is None:
+            return self._finir("abandon")
+        self.joueur = joueur
+        self.tour += 1
+        self._nouveau_tour()
+
+    def _engager(self, ennemi, boss):
+        self.ennemi = ennemi
+        self._boss = boss
+        self.tour_combat = 1
+        self._actions_combat = ACTIONS_COMBAT + tuple(f"competence:{nom}" for nom in self.joueur.competences)
+        self._ouvrir_tour_combat()
+
+    def _ouvrir_tour_combat(self):
+        joueur, ennemi = self.joueur, self.ennemi
+        if joueur.pv > 0 and ennemi.pv > 0 and main.ouvrir_tour_combat(joueur, ennemi, self.tour_combat):
+            self._attendre("combat", self._actions_combat)
+        else:
+            self._fin_combat()
+
+    def _combat(self, action):
+        competence = None
+        if action.startswith("competence:"):
+            action, competence = "competence", action[len("competence:"):]
+        if main.resoudre_tour_combat(self.joueur, self.ennemi, action, competence):
+            return self._fin_combat()
+        self.tour_combat += 1
+        self._ouvrir_tour_combat()
+
+    def _fin_combat(self):
+        ennemi, self.ennemi = self.ennemi, None
+        if self._boss:
+            self.jeu.issue_boss(self.joueur, ennemi)
+        else:
+            self.jeu.issue_combat(self.joueur, ennemi)
+        self._apres_exploration()
+
+    def _finir(self, raison):
+        if self.jeu.quete.est_terminee():
+            raison = "victoire"
+        elif self.joueur.pv <= 0:
+            raison = "mort"
+        self.resultat = raison
+        self._attendre("fin", ())
+
+
+def _partie_au_hasard(graine):
+    import random
+
+    choix = random.Random(graine)
+    partie = GameFacade("Guerrier", "Bot", graine=graine)
+    nb_actions = 0
+    while not partie.terminee and nb_actions < 10_000:
+        actions = [action for action in partie.actions if action not in ("quitter", "sauvegarder", "charger")]
+        partie.step(choix.choice(actions))
+        nb_actions += 1
+    return partie, nb_actions
+
+
+if __name__ == "__main__":
+    import collections
+    import time
+
+    # Même graine, mêmes actions : même partie
+    a, _ = _partie_au_hasard(7)
+    b, _ = _partie_au_hasard(7)
+    assert a.observe() == b.observe()
+
+    nb_parties, nb_actions, resultats = 2000, 0, collections.Counter()
+    debut = time.perf_counter()
+    for graine in range(nb_parties):
+        partie, n = _partie_au_hasard(graine)
+        nb_actions += n
+        resultats[partie.resultat] += 1
+    duree = time.perf_counter() - debut
+    print(f"{nb_parties} parties, {nb_actions} actions en {duree:.2f} s : "
+          f"{nb_parties / duree:.0f} parties/s, {nb_actions / duree:.0f} actions/s")
+    print(dict(resultats))
@@ -1,9 +1,28 @@
-import random
+# Lancer le jeu : `python main.py` le fait tourner dans le module main, comme
+# tous les autres modules qui l'importent, et jamais dans une seconde copie
+# sous __main__ (prototypes, événements et classes enregistrés deux fois).
+if __name__ == "__main__":
+    import main
+    main.jeu_principal()
+    raise SystemExit
+
+
 import json
 from dataclasses import dataclass, asdict
 from typing import Dict, Any, List
 import os
 
+from aleatoire import flux
+from competences import RegistreCompetences, chance, degats, modifier, statut
+from events import registre as EVENEMENTS
+from ennemis import FabriqueEnnemis
+from messages import emettre, saisir
+from objets import catalogue, compiler_butin, prototype
+from quetes import MoteurQuetes, Objectif, Quete
+from rejeu import Enregistrement
+from sauvegarde import JournalSauvegarde
+from zone import TableAlias
+
 # =========================
 # EXTENSIONS OPTIONNELLES
 # =========================
@@ -16,13 +35,29 @@ class NiveauDifficulte:
         "difficile": {"pv_multi": 1.5, "degats_multi": 1.3, "or_multi": 0.7}
     }
     
+    # niveau -> classe du joueur -> multiplicateurs qui remplacent ceux de NIVEAUX
+    # (réglages trouvés par difficulté.py, installés avec difficulté.installer ;
+    # après une modification, Jeu.ennemis.vider() pour refaire les prototypes)
+    AJUSTEMENTS = {}
+
     @staticmethod
-    def appliquer_stats(ennemi_base, niveau):
-        """Modifie les stats de l'ennemi selon la difficulté."""
+    def multiplicateurs(niveau, classe=None):
         multi = NiveauDifficulte.NIVEAUX[niveau]
+        ajustement = NiveauDifficulte.AJUSTEMENTS.get(niveau, {}).get(classe)
+        return {**multi, **ajustement} if ajustement else multi
+
+    @staticmethod
+    def appliquer_stats(ennemi_base, niveau, classe=None):
+        """Modifie les stats de l'ennemi selon la difficulté (et la classe du joueur)."""
+        return NiveauDifficulte.appliquer_multiplicateurs(ennemi_base, NiveauDifficulte.multiplicateurs(niveau, classe))
+
+    @staticmethod
+    def appliquer_multiplicateurs(ennemi_base, multi):
         ennemi_base.pv = int(ennemi_base.pv * multi["pv_multi"])
+        ennemi_base.pv_max = int(ennemi_base.pv_max * multi["pv_multi"])
         ennemi_base.defense = int(ennemi_base.defense * multi["pv_multi"])
-        ennemi_base.force1 = int(getattr(ennemi_base, 'force1', 20) * multi["degats_multi"])
+        # 25 : force du tour ennemi quand force1 manque ("normal" ne change rien)
+        ennemi_base.force1 = int(getattr(ennemi_base, 'force1', 25) * multi["degats_multi"])
         return ennemi_base
 
 class Marchand:
@@ -47,6 +82,9 @@ class Marchand:
 # =========================
 
 class Personnage:
+    __slots__ = ("nom", "type", "pv", "pv_max", "intelligence", "agilite", "competences", "force1",
+                 "force2", "defense_base", "bonus_defense", "statuts", "weapon", "armor", "inventory")
+
     def __init__(self, nom, type_, pv, pv_max, intelligence, agilite, competences, force1, force2, defense):
         self.nom = nom
         self.type = type_
@@ -58,7 +96,8 @@ class Personnage:
         self.force1 = force1
         self.force2 = force2
         self.defense_base = defense
-        self.statuts = []
+        self.bonus_defense = 0  # bonus temporaire (action Défendre)
+        self.statuts = Statuts()
 
         # équipement
         self.weapon = None
@@ -69,9 +108,9 @@ class Personnage:
 
     @property
     def defense(self):
-        """Défense totale = base + armure."""
+        """Défense totale = base + armure + bonus du tour."""
         bonus = self.armor.defense_bonus if self.armor else 0
-        return self.defense_base + bonus
+        return self.defense_base + bonus + self.bonus_defense
 
     @property
     def attaque(self):
@@ -81,84 +120,233 @@ class Personnage:
 
     def equip_weapon(self, weapon):
         if not isinstance(weapon, Weapon):
-            print("Ce n'est pas une arme.")
+            emettre("inventaire", "Ce n'est pas une arme.")
             return
-        if weapon not in self.inventory.items:
-            print("L'arme doit être dans l'inventaire pour être équipée.")
+        if weapon not in self.inventory:
+            emettre("inventaire", "L'arme doit être dans l'inventaire pour être équipée.")
             return
         self.weapon = weapon
-        print(f"{self.nom} équipe {weapon.name} (+{weapon.attack_bonus} ATK).")
+        emettre("inventaire", "{nom} équipe {arme} (+{bonus} ATK).", nom=self.nom, arme=weapon.name, bonus=weapon.attack_bonus)
 
     def equip_armor(self, armor):
         if not isinstance(armor, Armor):
-            print("Ce n'est pas une armure.")
+            emettre("inventaire", "Ce n'est pas une armure.")
             return
-        if armor not in self.inventory.items:
-            print("L'armure doit être dans l'inventaire pour être équipée.")
+        if armor not in self.inventory:
+            emettre("inventaire", "L'armure doit être dans l'inventaire pour être équipée.")
             return
         self.armor = armor
         bonuses = [f"+{armor.defense_bonus} DEF"]
         if armor.int_bonus:
             bonuses.append(f"+{armor.int_bonus} INT")
-        print(f"{self.nom} équipe {armor.name} ({', '.join(bonuses)}).")
+        emettre("inventaire", "{nom} équipe {armure} ({bonus}).", nom=self.nom, armure=armor.name, bonus=", ".join(bonuses))
 
 
 # =========================
 # Items / Inventaire
 # =========================
 class Item:
+    __slots__ = ("name",)
+    empilable = False  # les objets empilables partagent un slot-compteur dans l'inventaire
+
     def __init__(self, name):
         self.name = name
 
+    def cle_pile(self):
+        """Deux objets empilables de même clé sont interchangeables."""
+        return (type(self), self.name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "item_type": self.__class__.__name__}
+
+    def __reduce_ex__(self, protocole):
+        # Un prototype du catalogue se picke par identifiant : il reste partagé une fois relu
+        identifiant = catalogue.identifiant(self)
+        if identifiant is None:
+            return super().__reduce_ex__(protocole)
+        return prototype, (identifiant,)
+
 class Weapon(Item):
+    __slots__ = ("attack_bonus", "int_bonus")
+
     def __init__(self, name, attack_bonus=0, int_bonus=0):
         super().__init__(name)
         self.attack_bonus = attack_bonus
         self.int_bonus = int_bonus  # si tu veux des armes magiques
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "item_type": "Weapon",
+            "attack_bonus": self.attack_bonus,
+            "int_bonus": getattr(self, "int_bonus", 0)
+        }
+
 
 class Armor(Item):
+    __slots__ = ("defense_bonus", "int_bonus")
+
     def __init__(self, name, defense_bonus=0, int_bonus=0):
         super().__init__(name)
         self.defense_bonus = defense_bonus
         self.int_bonus = int_bonus
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "item_type": "Armor",
+            "defense_bonus": self.defense_bonus,
+            "int_bonus": getattr(self, "int_bonus", 0)
+        }
+
 
 class Consumable(Item):
+    __slots__ = ("effect",)
+    empilable = True
+
     def __init__(self, name, effect):
         super().__init__(name)
         self.effect = effect  # fonction ou identifiant
 
+    def cle_pile(self):
+        return (type(self), self.name, self.effect)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "item_type": "Consumable",
+            "effect": self.effect
+        }
+
+
+# Prototypes partagés (objets.catalogue) : jamais modifiés, donc communs à tous les inventaires
+POTION_SOIN = catalogue.enregistrer("potion_soin", Consumable("Potion de soin", "soin"))
+POTION_SOIN_MARCHAND = catalogue.enregistrer("potion_soin_30", Consumable("Potion de soin", "soin_30"))
+EPEE_ACIER = catalogue.enregistrer("epee_acier", Weapon("Epee d'acier", attack_bonus=15))
+ARMURE_RENFORCEE = catalogue.enregistrer("armure_renforcee", Armor("Armure renforcee", defense_bonus=10))
+DAGUE_AFFUTEE = catalogue.enregistrer("dague_affutee", Weapon("Dague affûtée", 8), " Dague affûtée (+8 ATK)")
+MANTEAU_RENFORCE = catalogue.enregistrer("manteau_renforce", Armor("Manteau renforcé", 5),
+                                         " Manteau renforcé (+5 DEF)")
+EPEE_GARDIEN = catalogue.enregistrer("epee_gardien", Weapon("Épée du Gardien", attack_bonus=25, int_bonus=10))
+ARMURE_ANCESTRALE = catalogue.enregistrer("armure_ancestrale",
+                                          Armor("Armure Ancestrale", defense_bonus=20, int_bonus=15))
+
 
 class Inventory:
+    """
+    Inventaire indexé par nom (has/get/remove en O(1)) et par type (par_type
+    ne parcourt que les piles des types demandés).
+
+    Les consommables identiques sont empilés (un objet + un compteur).
+    capacity reste un nombre d'objets : une pile de 3 potions occupe 3 places.
+    """
+    __slots__ = ("capacity", "nb_objets", "_par_nom", "_par_type")
+
     def __init__(self, capacity=10):
         self.capacity = capacity
-        self.items = []  # liste des objets
+        self.nb_objets = 0
+        self._par_nom = {}  # nom -> liste de [objet, quantite]
+        self._par_type = {}  # type exact -> mêmes [objet, quantite], dans l'ordre d'ajout
+
+    def __len__(self):
+        return self.nb_objets
 
-    def add_item(self, item):
-        if len(self.items) >= self.capacity:
-            print("Inventaire plein, impossible d'ajouter l'objet.")
+    def __contains__(self, item):
+        return any(entree[0] is item for entree in self._par_nom.get(item.name, ()))
+
+    @property
+    def items(self):
+        """Liste à plat (une entrée par objet), pour l'affichage et la compatibilité."""
+        return [objet for entrees in self._par_nom.values()
+                for objet, quantite in entrees for _ in range(quantite)]
+
+    def piles(self):
+        """(objet, quantite) pour chaque pile / objet unique."""
+        return [(objet, quantite) for entrees in self._par_nom.values() for objet, quantite in entrees]
+
+    def add_item(self, item, quantite=1):
+        if self.nb_objets + quantite > self.capacity:
+            emettre("inventaire", "Inventaire plein, impossible d'ajouter l'objet.")
             return False
-        self.items.append(item)
-        print(f"Objet ajouté à l'inventaire : {item.name}.")
+        entrees = self._par_nom.get(item.name, ())
+        if item.empilable:
+            cle = item.cle_pile()
+            for entree in entrees:
+                if entree[0].empilable and entree[0].cle_pile() == cle:
+                    entree[1] += quantite
+                    break
+            else:
+                self._nouvelle_pile(item, quantite)
+        else:
+            for _ in range(quantite):
+                self._nouvelle_pile(item, 1)
+        self.nb_objets += quantite
+        emettre("inventaire", "Objet ajouté à l'inventaire : {objet}.", objet=item.name)
         return True
 
     def remove_item(self, item):
-        if item in self.items:
-            self.items.remove(item)
-            print(f"Objet retiré de l'inventaire : {item.name}.")
-            return True
-        print("Objet introuvable dans l'inventaire.")
+        entrees = self._par_nom.get(item.name, ())
+        for i, entree in enumerate(entrees):
+            if entree[0] is item or (item.empilable and entree[0].empilable
+                                     and entree[0].cle_pile() == item.cle_pile()):
+                entree[1] -= 1
+                if entree[1] <= 0:
+                    del entrees[i]
+                    if not entrees:
+                        del self._par_nom[item.name]
+                    piles = self._par_type[type(entree[0])]
+                    del piles[next(j for j, pile in enumerate(piles) if pile is entree)]
+                    if not piles:
+                        del self._par_type[type(entree[0])]
+                self.nb_objets -= 1
+                emettre("inventaire", "Objet retiré de l'inventaire : {objet}.", objet=item.name)
+                return True
+        emettre("inventaire", "Objet introuvable dans l'inventaire.")
         return False
 
-    def has_item(self, item_name):
-        return any(i.name == item_name for i in self.items)
-
-    def get_item(self, item_name):
-        for i in self.items:
-            if i.name == item_name:
-                return i
-        return None
+    def _nouvelle_pile(self, item, quantite):
+        entree = [item, quantite]
+        self._par_nom.setdefault(item.name, []).append(entree)
+        self._par_type.setdefault(type(item), []).append(entree)
+
+    def has_item(self, objet):
+        return objet in self._par_nom
+
+    def get_item(self, objet):
+        entrees = self._par_nom.get(objet)
+        return entrees[0][0] if entrees else None
+
+    def quantite(self, objet):
+        return sum(quantite for _, quantite in self._par_nom.get(objet, ()))
+
+    def par_type(self, type_item):
+        """Objets des piles de type type_item (sous-classes comprises)."""
+        return [entree[0] for type_pile, entrees in self._par_type.items() if issubclass(type_pile, type_item)
+                for entree in entrees]
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        """Une entrée par pile, avec "quantite" seulement si > 1."""
+        donnees = []
+        for objet, quantite in self.piles():
+            entree = catalogue.donnees(objet)
+            if quantite > 1:
+                entree["quantite"] = quantite
+            donnees.append(entree)
+        return donnees
+
+    @classmethod
+    def from_dict(cls, donnees, capacity=10):
+        inventaire = cls(capacity)
+        for entree in donnees:
+            item = creer_item_from_dict(entree)
+            quantite = entree.get("quantite", 1)
+            if item.empilable:
+                inventaire._nouvelle_pile(item, quantite)
+            else:
+                for _ in range(quantite):
+                    inventaire._nouvelle_pile(item, 1)
+            inventaire.nb_objets += quantite
+        return inventaire
 
 
 # =========================
@@ -167,7 +355,10 @@ class Inventory:
 class Competence:
     def __init__(self, nom, effet=None):
         self.nom = nom
-        self.effet = effet
+        self.effet = effet  # lancer(lanceur, cible) ; par défaut celui de COMPETENCES
+
+    def lancer(self, lanceur, cible):
+        (self.effet or COMPETENCES[self.nom])(lanceur, cible)
 
 
 class CoupPuissant(Competence):
@@ -207,6 +398,8 @@ class ComboAttack(Competence):
 
 
 class Guerrier(Personnage):
+    __slots__ = ()
+
     def __init__(self, nom):
         competences = ["Coup puissant", "Charge"]
         super().__init__(
@@ -224,6 +417,8 @@ class Guerrier(Personnage):
 
 
 class Mage(Personnage):
+    __slots__ = ()
+
     def __init__(self, nom):
         competences = ["Boule de feu", "Bouclier"]
         super().__init__(
@@ -241,6 +436,8 @@ class Mage(Personnage):
 
 
 class Voleur(Personnage):
+    __slots__ = ()
+
     def __init__(self, nom):
         competences = ["Attaque sournoise", "Esquive"]
         super().__init__(
@@ -261,32 +458,37 @@ class Voleur(Personnage):
 # ==============
 
 class Ennemi:
+    __slots__ = ("nom", "type", "pv", "pv_max", "difficulte", "particularites", "phase", "defense",
+                 "agilite", "statuts", "force1")
+
     def __init__(self, nom, type_, pv, pv_max, difficulte, particularites, phase=1, defense=0, agilite=0):
         self.nom = nom
         self.type = type_  # "standard", "elite", "boss"
         self.pv = pv
         self.pv_max=100
         self.difficulte = difficulte
-        self.particularites = particularites # liste de tags
+        self.particularites = particularites # tuple de tags (partagé par la classe)
         self.phase = phase
         self.defense = defense
         self.agilite = agilite
-        self.statuts = [] # liste de StatusEffect actifs
+        self.statuts = Statuts() # StatusEffect actifs
 
     def mettre_a_jour_phase(self):
         """Hook pour le moteur de combat (boss à phases)."""
         if self.type == "boss" and hasattr(self, "pv_max") and self.pv <= self.pv_max // 2:
             if self.phase == 1:
                 self.phase = 2
-                print(f"{self.nom} entre en phase 2 !")
+                emettre("combat", "{nom} entre en phase 2 !", nom=self.nom)
 
     def __str__(self):
         return f"{self.nom} ({self.type}, phase {self.phase})"
 
 
 class LoupSauvage(Ennemi):
+    __slots__ = ()
+
     def __init__(self, nom="Loup sauvage"):
-        particularites = ["attaque_multiple", "rapide"]
+        particularites = ("attaque_multiple", "rapide")
         super().__init__(
             nom=nom,
             type_="standard",
@@ -301,8 +503,10 @@ class LoupSauvage(Ennemi):
 
 
 class Bandit(Ennemi):
+    __slots__ = ()
+
     def __init__(self, nom="Bandit"):
-        particularites = ["vol_objets"]
+        particularites = ("vol_objets",)
         super().__init__(
             nom=nom,
             type_="standard",
@@ -317,8 +521,10 @@ class Bandit(Ennemi):
 
 
 class Squelette(Ennemi):
+    __slots__ = ()
+
     def __init__(self, nom="Squelette"):
-        particularites = ["resistant_physique"]
+        particularites = ("resistant_physique",)
         super().__init__(
             nom=nom,
             type_="standard",
@@ -333,8 +539,10 @@ class Squelette(Ennemi):
 
 
 class ChampionCorrompu(Ennemi):
+    __slots__ = ()
+
     def __init__(self, nom="Champion corrompu"):
-        particularites = ["pv_eleves", "competence_speciale"]
+        particularites = ("pv_eleves", "competence_speciale")
         super().__init__(
             nom=nom,
             type_="elite",
@@ -349,14 +557,16 @@ class ChampionCorrompu(Ennemi):
 
 
 class GardienDonjon(Ennemi):
+    __slots__ = ()
+
     def __init__(self, nom="Gardien du donjon"):
-        particularites = [
+        particularites = (
             "attaque_puissante",
             "resistant",
             "pv_eleves",
             "competence_speciale",
             "phase_multiple",
-        ]
+        )
         super().__init__(
             nom=nom,
             type_="boss",
@@ -377,10 +587,13 @@ class GardienDonjon(Ennemi):
 # ===========================
 
 class StatusEffect:
+    __slots__ = ("nom", "duration", "trigger_moment", "expiration")
+
     def __init__(self, nom, duration, trigger_moment):
         self.nom = nom
         self.duration = duration
         self.trigger_moment = trigger_moment
+        self.expiration = None  # tour d'expiration, géré par Statuts
 
     def apply(self, target):
         pass
@@ -397,16 +610,20 @@ class StatusEffect:
 
 
 class Poison(StatusEffect):
+    __slots__ = ("damage_per_turn",)
+
     def __init__(self, damage_per_turn=10, duration=3):
         super().__init__("Poison", duration, trigger_moment="start_turn")
         self.damage_per_turn = damage_per_turn
 
     def apply(self, target):
         target.pv -= self.damage_per_turn
-        print(f"{target.nom} souffre du poison et perd {self.damage_per_turn} PV (reste {target.pv}).")
+        emettre("statut", "{nom} souffre du poison et perd {degats} PV (reste {pv}).", nom=target.nom, degats=self.damage_per_turn, pv=target.pv)
 
 
 class Shield(StatusEffect):
+    __slots__ = ("shield_points",)
+
     def __init__(self, shield_points=30, duration=3):
         super().__init__("Bouclier", duration, trigger_moment="on_hit")
         self.shield_points = shield_points
@@ -415,41 +632,166 @@ class Shield(StatusEffect):
         absorb = min(damage, self.shield_points)
         self.shield_points -= absorb
         damage_rest = damage - absorb
-        print(f"Le bouclier absorbe {absorb} dégâts (reste {self.shield_points} points de bouclier).")
+        emettre("statut", "Le bouclier absorbe {absorbe} dégâts (reste {reste} points de bouclier).", absorbe=absorb, reste=self.shield_points)
         if self.shield_points <= 0:
             self.duration = 0  #expiration
         return damage_rest
 
     def on_expire(self, target):
-        print(f"Le bouclier de {target.nom} se dissipe.")
+        emettre("statut", "Le bouclier de {nom} se dissipe.", nom=target.nom)
 
 
 class Stun(StatusEffect):
+    __slots__ = ()
+
     def __init__(self, duration=1):
         super().__init__("Etourdissement", duration, trigger_moment="start_turn")
 
     def apply(self, target):
-        print(f"{target.nom} est étourdi et saute son tour !")
+        emettre("statut", "{nom} est étourdi et saute son tour !", nom=target.nom)
+
+
+class Brulure(StatusEffect):
+    __slots__ = ("damage_per_turn",)
+
+    def __init__(self, damage_per_turn=5, duration=3):
+        super().__init__("Brûlure", duration, trigger_moment="end_turn")
+        self.damage_per_turn = damage_per_turn
+
+    def apply(self, target):
+        target.pv -= self.damage_per_turn
+        emettre("statut", "{nom} brûle et perd {degats} PV (reste {pv}).", nom=target.nom, degats=self.damage_per_turn, pv=target.pv)
 
 
 # ======================
 # Gestion générique des statuts
 # ======================
 
+class Statuts:
+    """
+    Statuts actifs d'une entité, indexés par moment de déclenchement et par type.
+
+    Les durées sont comptées en tours : chaque statut est rangé dans une roue
+    temporelle à la case de son tour d'expiration, et seule la case du tour
+    courant est examinée. "Étourdi ?" et "bouclier restant" sont des compteurs.
+    Stun et Shield sont reconnus par isinstance (sous-classes comprises).
+    """
+    TAILLE_ROUE = 8
+    __slots__ = ("tour", "nb_etourdissements", "total_bouclier", "_par_moment", "_par_type", "_boucliers", "_roue")
+
+    def __init__(self):
+        self.tour = 0
+        self.nb_etourdissements = 0
+        self.total_bouclier = 0
+        # Alloués au premier statut : la plupart des entités n'en ont jamais
+        self._par_moment = None
+        self._par_type = None
+        self._boucliers = None  # Shield et sous-classes, dans l'ordre d'application
+        self._roue = None
+
+    def __iter__(self):
+        if self._par_type is None:
+            return iter(())
+        return (statut for statuts in list(self._par_type.values()) for statut in statuts)
+
+    def __len__(self):
+        if self._par_type is None:
+            return 0
+        return sum(len(statuts) for statuts in self._par_type.values())
+
+    @property
+    def etourdi(self):
+        return self.nb_etourdissements > 0
+
+    def par_type(self, type_statut):
+        return list(self._par_type.get(type_statut, ())) if self._par_type else []
+
+    def ajouter(self, statut):
+        if self._roue is None:
+            self._par_moment = {}
+            self._par_type = {}
+            self._boucliers = {}
+            self._roue = [[] for _ in range(self.TAILLE_ROUE)]
+        # dict = ensemble ordonné : retrait en O(1)
+        self._par_moment.setdefault(statut.trigger_moment, {})[statut] = None
+        self._par_type.setdefault(type(statut), {})[statut] = None
+        statut.expiration = self.tour + max(statut.duration, 1)
+        self._roue[statut.expiration % self.TAILLE_ROUE].append(statut)
+        if isinstance(statut, Stun):
+            self.nb_etourdissements += 1
+        elif isinstance(statut, Shield):
+            self._boucliers[statut] = None
+            self.total_bouclier += statut.shield_points
+
+    append = ajouter  # compatibilité avec l'ancienne liste
+
+    def retirer(self, statut):
+        if statut.expiration is None:
+            return
+        del self._par_moment[statut.trigger_moment][statut]
+        del self._par_type[type(statut)][statut]
+        statut.expiration = None  # l'entrée restée dans la roue sera ignorée
+        if isinstance(statut, Stun):
+            self.nb_etourdissements -= 1
+        elif isinstance(statut, Shield):
+            del self._boucliers[statut]
+            self.total_bouclier -= statut.shield_points
+
+    def restant(self, statut):
+        """Tours restants avant expiration."""
+        return statut.expiration - self.tour if statut.expiration is not None else 0
+
+    def declencher(self, moment, entite):
+        if self._par_moment is None:
+            return
+        for statut in list(self._par_moment.get(moment, ())):
+            statut.apply(entite)
+
+    def debut_tour(self, entite):
+        """Avance d'un tour : effets start_turn puis expirations du tour."""
+        self.tour += 1
+        if self._roue is None:
+            return
+        self.declencher("start_turn", entite)
+
+        case = self.tour % self.TAILLE_ROUE
+        restants = []
+        for statut in self._roue[case]:
+            if statut.expiration == self.tour:
+                self.retirer(statut)
+                statut.duration = 0
+                statut.on_expire(entite)
+            elif statut.expiration is not None:
+                restants.append(statut)  # expire à un tour suivant de la roue
+        self._roue[case] = restants
+
+    def absorber(self, entite, degats):
+        """Fait passer les dégâts au travers des boucliers, dans l'ordre d'application."""
+        if self.total_bouclier <= 0:
+            return degats
+        for bouclier in list(self._boucliers):
+            avant = bouclier.shield_points
+            degats = bouclier.absorb_damage(entite, degats)
+            self.total_bouclier -= avant - bouclier.shield_points
+            if bouclier.shield_points <= 0:
+                self.retirer(bouclier)
+                bouclier.on_expire(entite)
+            if degats <= 0:
+                break
+        return degats
+
+
 def appliquer_statut(cible, statut):
-    cible.statuts.append(statut)
-    print(f"{cible.nom} reçoit le statut {statut.nom}.")
+    cible.statuts.ajouter(statut)
+    emettre("statut", "{cible_nom} reçoit le statut {statut}.", cible_nom=cible.nom, statut=statut.nom)
 
 
 def traiter_statuts_debut_tour(entite):
-    nouveaux_statuts = []
-    for statut in entite.statuts:
-        if statut.trigger_moment == "start_turn":
-            statut.apply(entite)
-        # tick gère la durée et l’expiration
-        if statut.tick(entite):
-            nouveaux_statuts.append(statut)
-    entite.statuts = nouveaux_statuts
+    entite.statuts.debut_tour(entite)
+
+
+def traiter_statuts_fin_tour(entite):
+    entite.statuts.declencher("end_turn", entite)
 
 
 def reduire_degats_par_bouclier(entite, degats):
@@ -457,23 +799,11 @@ def reduire_degats_par_bouclier(entite, degats):
     Passe les dégâts au travers de tous les boucliers.
     Ne touche pas le moteur de combat : il appelle juste cette fonction.
     """
-    nouveaux_statuts = []
-    dmg = degats
-    for statut in entite.statuts:
-        if isinstance(statut, Shield):
-            dmg = statut.absorb_damage(entite, dmg)
-        # Gestion de la durée (tour, nombre de coups, etc.)
-        if statut.tick(entite):
-            nouveaux_statuts.append(statut)
-    entite.statuts = nouveaux_statuts
-    return dmg
+    return entite.statuts.absorber(entite, degats)
 
 
 def est_etourdi(entite):
-    for statut in entite.statuts:
-        if isinstance(statut, Stun):
-            return True
-    return False
+    return entite.statuts.etourdi
 
 
 # =====================
@@ -483,12 +813,12 @@ def est_etourdi(entite):
 def calcul_degats(attaquant, cible):
     defense_cible = getattr(cible, "defense", 0)
     base = attaquant.force1 - defense_cible
-    variance = random.randint(-2, 2)
+    variance = flux.degats.randint(-2, 2)
     degats = base + variance
 
-    if random.random() < 0.10:
+    if flux.degats.random() < 0.10:
         degats = int(degats * 2)
-        print("Coup critique !")
+        emettre("combat", "Coup critique !")
 
     if degats < 1:
         degats = 1
@@ -503,88 +833,92 @@ def tenter_fuite(personnage, ennemi):
     chance_fuite = 0.5 + (personnage.agilite - agilite_ennemi) * 0.01
     chance_fuite = max(0.1, min(0.9, chance_fuite))
 
-    if random.random() < chance_fuite:
-        print(f"{personnage.nom} réussit à fuir !")
+    if flux.fuite.random() < chance_fuite:
+        emettre("combat", "{personnage_nom} réussit à fuir !", personnage_nom=personnage.nom)
         return True
     else:
-        print(f"{personnage.nom} échoue à fuir...")
+        emettre("combat", "{personnage_nom} échoue à fuir...", personnage_nom=personnage.nom)
         return False
 
 
 def action_attaquer(attaquant, cible):
     if est_etourdi(attaquant):
-        print(f"{attaquant.nom} est étourdi et ne peut pas attaquer ce tour.")
+        emettre("combat", "{attaquant_nom} est étourdi et ne peut pas attaquer ce tour.", attaquant_nom=attaquant.nom)
         return
     degats = calcul_degats(attaquant, cible)
     cible.pv -= degats
-    print(f"{attaquant.nom} attaque {cible.nom} et inflige {degats} dégâts. Il reste {cible.pv} PV à {cible.nom}.")
+    emettre("combat", "{attaquant_nom} attaque {cible_nom} et inflige {degats} dégâts. Il reste {cible_pv} PV à {cible_nom}.", attaquant_nom=attaquant.nom, cible_nom=cible.nom, degats=degats, cible_pv=cible.pv)
     if isinstance(cible, Ennemi):
         cible.mettre_a_jour_phase()
 
 
 def action_defendre(personnage):
-    personnage.defense += 5
-    print(f"{personnage.nom} se met en défense et augmente sa défense de 5 pour ce tour.")
+    personnage.bonus_defense = 5
+    emettre("combat", "{personnage_nom} se met en défense et augmente sa défense de 5 pour ce tour.", personnage_nom=personnage.nom)
+
+
+# Compétences : étapes déclarées ici, compilées par competences.py
+COMPETENCES = RegistreCompetences(appliquer_statut, lambda: flux.competences.random())
+
+
+def _degats_magiques(lanceur, cible):
+    return lanceur.intelligence * 1.2 - getattr(cible, "defense", 0)
+
+
+COMPETENCES.declarer("Coup puissant", degats(calcul_degats, "Attaque puissante !", facteur=1.5))
+COMPETENCES.declarer("Boule de feu", degats(_degats_magiques, "Boule de feu !", minimum=1),
+                     statut(lambda: Poison(damage_per_turn=8, duration=3)))
+COMPETENCES.declarer("Bouclier", statut(lambda: Shield(shield_points=40, duration=3), sur="lanceur"))
+COMPETENCES.declarer("Attaque sournoise", degats(calcul_degats, "Attaque sournoise !", facteur=1.2),
+                     chance(0.3, statut(lambda: Stun(duration=1))))
+COMPETENCES.declarer("Charge", degats(calcul_degats, "Charge !", facteur=1.3),
+                     chance(0.2, statut(lambda: Stun(duration=1))))
+COMPETENCES.declarer("Attaque empoisonnée", degats(calcul_degats, "Attaque empoisonnée !"),
+                     statut(lambda: Poison(damage_per_turn=10, duration=3)))
+COMPETENCES.declarer("Esquive", modifier("bonus_defense", 15, "{nom} se prépare à esquiver (+{valeur} DEF ce tour)."))
 
 
 def action_competence(personnage, competence, cible):
     if est_etourdi(personnage):
-        print(f"{personnage.nom} est étourdi et ne peut pas utiliser de compétence.")
+        emettre("combat", "{personnage_nom} est étourdi et ne peut pas utiliser de compétence.", personnage_nom=personnage.nom)
         return
 
     if competence not in personnage.competences:
-        print(f"{personnage.nom} ne possède pas la compétence {competence}.")
+        emettre("combat", "{personnage_nom} ne possède pas la compétence {competence}.", personnage_nom=personnage.nom, competence=competence)
         return
 
-    print(f"{personnage.nom} utilise {competence} sur {cible.nom}.")
+    emettre("combat", "{personnage_nom} utilise {competence} sur {cible_nom}.", personnage_nom=personnage.nom, competence=competence, cible_nom=cible.nom)
 
-    if competence == "Coup puissant":
-        degats = int(calcul_degats(personnage, cible) * 1.5)
-        cible.pv -= degats
-        print(f"Attaque puissante ! {cible.nom} perd {degats} PV (reste {cible.pv}).")
-    elif competence == "Boule de feu":
-        defense_cible = getattr(cible, "defense", 0)
-        degats = int((personnage.intelligence * 1.2) - defense_cible)
-        if degats < 1:
-            degats = 1
-        cible.pv -= degats
-        print(f"Boule de feu ! {cible.nom} perd {degats} PV (reste {cible.pv}).")
-        # Applique Poison via une variante
-        appliquer_statut(cible, Poison(damage_per_turn=8, duration=3))
-    elif competence == "Bouclier":
-        appliquer_statut(personnage, Shield(shield_points=40, duration=3))
-    elif competence == "Attaque sournoise":
-        degats = int(calcul_degats(personnage, cible) * 1.2)
-        cible.pv -= degats
-        print(f"Attaque sournoise ! {cible.nom} perd {degats} PV (reste {cible.pv}).")
-        # chance d’étourdir
-        if random.random() < 0.3:
-            appliquer_statut(cible, Stun(duration=1))
+    lancer = COMPETENCES.get(competence)
+    if lancer is None:
+        emettre("combat", "Effet de cette compétence non encore implémenté.")
     else:
-        print("Effet de cette compétence non encore implémenté.")
+        lancer(personnage, cible)
 
 
 def action_objet(personnage, objet, cible=None):
     if est_etourdi(personnage):
-        print(f"{personnage.nom} est étourdi et ne peut pas utiliser d'objet.")
+        emettre("combat", "{personnage_nom} est étourdi et ne peut pas utiliser d'objet.", personnage_nom=personnage.nom)
         return
 
     if objet == "potion":
         soin = 30
         personnage.pv += soin
-        print(f"{personnage.nom} utilise une potion et récupère {soin} PV (total {personnage.pv}).")
+        emettre("combat", "{personnage_nom} utilise une potion et récupère {soin} PV (total {personnage_pv}).", personnage_nom=personnage.nom, soin=soin, personnage_pv=personnage.pv)
     elif objet == "bombe" and cible is not None:
         degats = 40
         cible.pv -= degats
-        print(f"{personnage.nom} lance une bombe sur {cible.nom}, qui perd {degats} PV (reste {cible.pv}).")
+        emettre("combat", "{personnage_nom} lance une bombe sur {cible_nom}, qui perd {degats} PV (reste {cible_pv}).", personnage_nom=personnage.nom, cible_nom=cible.nom, degats=degats, cible_pv=cible.pv)
     else:
-        print(f"Objet {objet} non géré pour l’instant.")
+        emettre("combat", "Objet {objet} non géré pour l’instant.", objet=objet)
 
 # =========================
 # NOUVELLES COMPÉTENCES AVEC COMBO
 # =========================
 
 class Guerrier(Personnage):
+    __slots__ = ()
+
     def __init__(self, nom):
         competences = ["Coup puissant", "Charge", "Attaque empoisonnée"]
         super().__init__(
@@ -596,87 +930,150 @@ class Guerrier(Personnage):
 # ==========================
 
 class Zone:
-    def __init__(self, nom, description, evenements, ennemis_possibles, acces):
+    def __init__(self, nom, description, evenements, ennemis_possibles, acces, butin=()):
         self.nom = nom
         self.description = description
         self.evenements = evenements  # liste pondérée d'événements
         self.ennemis_possibles = ennemis_possibles
         self.acces = acces  # conditions d'accès (clé, etc.)
+        self.butin = butin  # coffres normaux : (prototype ou montant d'or, poids)
+
+    @property
+    def evenements(self):
+        return self._evenements
+
+    @evenements.setter
+    def evenements(self, evenements):
+        # Compilée une fois ici plutôt qu'à chaque exploration : le tirage donne l'Evenement
+        self._evenements = evenements
+        self.tirage_evenements = EVENEMENTS.compiler(evenements)
+
+    @property
+    def ennemis_possibles(self):
+        return self._ennemis_possibles
+
+    @ennemis_possibles.setter
+    def ennemis_possibles(self, ennemis_possibles):
+        self._ennemis_possibles = ennemis_possibles
+        self.tirage_ennemis = TableAlias((ennemi, 1) for ennemi in ennemis_possibles)
+
+    @property
+    def butin(self):
+        return self._butin
+
+    @butin.setter
+    def butin(self, butin):
+        self._butin = butin
+        self.tirage_butin = compiler_butin(butin)
 
 # =========================
 # MOTEUR DE COMBAT INTERACTIF
 # =========================
 
+ACTIONS_COMBAT = {"1": "attaquer", "2": "competence", "3": "objet", "4": "defendre", "5": "fuir"}
+
+
+def debut_tour_combat(personnage, ennemi):
+    """Statuts de début de tour. Renvoie False si quelqu'un est déjà tombé."""
+    personnage.bonus_defense = 0
+    traiter_statuts_debut_tour(personnage)
+    traiter_statuts_debut_tour(ennemi)
+    return personnage.pv > 0 and ennemi.pv > 0
+
+
+def action_joueur(personnage, ennemi, action, competence=None):
+    """Exécute l'action du joueur. Renvoie True si le joueur a réussi à fuir."""
+    if action == "attaquer":
+        action_attaquer(personnage, ennemi)
+    elif action == "competence":
+        action_competence(personnage, competence, ennemi)
+    elif action == "objet":
+        if personnage.inventory.has_item("Potion de soin"):
+            potion = personnage.inventory.get_item("Potion de soin")
+            personnage.inventory.remove_item(potion)
+            personnage.pv = min(personnage.pv_max, personnage.pv + 40)
+            emettre("combat", "+40 PV ({personnage_pv}/{personnage_pv_max})", personnage_pv=personnage.pv, personnage_pv_max=personnage.pv_max)
+    elif action == "defendre":
+        action_defendre(personnage)
+    elif action == "fuir":
+        return tenter_fuite(personnage, ennemi)
+    return False
+
+
+def tour_ennemi(personnage, ennemi):
+    if ennemi.pv > 0 and not est_etourdi(ennemi):
+        # IA simple
+        if flux.ia.random() < 0.3 and "competence_speciale" in ennemi.particularites:
+            appliquer_statut(personnage, Brulure())
+        else:
+            # Ajouter force1 aux ennemis pour qu'ils attaquent
+            if not hasattr(ennemi, 'force1'): setattr(ennemi, 'force1', 25)
+            action_attaquer(ennemi, personnage)
+
+
+def fin_tour_combat(personnage, ennemi):
+    traiter_statuts_fin_tour(personnage)
+    traiter_statuts_fin_tour(ennemi)
+
+
+def ouvrir_tour_combat(personnage, ennemi, tour):
+    """Annonce le tour et applique les statuts. Renvoie False si le combat s'arrête là."""
+    emettre("combat", "\n--- Tour {tour} ---", tour=tour)
+    emettre("combat", "{personnage_nom}: {personnage_pv}/{personnage_pv_max} PV | {ennemi_nom}: {ennemi_pv} PV", personnage_nom=personnage.nom, personnage_pv=personnage.pv, personnage_pv_max=personnage.pv_max, ennemi_nom=ennemi.nom, ennemi_pv=ennemi.pv)
+    return debut_tour_combat(personnage, ennemi)
+
+
+def resoudre_tour_combat(personnage, ennemi, action, competence=None):
+    """Action du joueur, riposte et fin de tour. Renvoie True si le joueur a fui."""
+    if action_joueur(personnage, ennemi, action, competence):
+        return True
+    
+    # Tour ennemi
+    tour_ennemi(personnage, ennemi)
+    
+    # Fin tour statuts end_turn
+    fin_tour_combat(personnage, ennemi)
+    
+    # Fin de combat : message clair
+    if personnage.pv <= 0:
+        emettre("combat", "\n{personnage_nom} est vaincu...", personnage_nom=personnage.nom)
+    elif ennemi.pv <= 0:
+        emettre("combat", "\n{ennemi_nom} est vaincu !", ennemi_nom=ennemi.nom)
+    return False
+
+
 def combat_interactif(personnage, ennemi):
     tour = 1
     while personnage.pv > 0 and ennemi.pv > 0:
-        print(f"\n--- Tour {tour} ---")
-        print(f"{personnage.nom}: {personnage.pv}/{personnage.pv_max} PV | {ennemi.nom}: {ennemi.pv} PV")
-        
         # Statuts
-        traiter_statuts_debut_tour(personnage)
-        traiter_statuts_debut_tour(ennemi)
-        
-        if personnage.pv <= 0 or ennemi.pv <= 0: break
+        if not ouvrir_tour_combat(personnage, ennemi, tour): break
         
         # Menu joueur
-        print("\n1. Attaquer | 2. Compétence | 3. Objet | 4. Défendre | 5. Fuir")
-        choix = input("Action : ").strip()
-        
-        if choix == "1":
-            action_attaquer(personnage, ennemi)
-        elif choix == "2":
-            print("Compétences:", ", ".join(personnage.competences))
-            comp = input("Choisir : ")
-            action_competence(personnage, comp, ennemi)
-        elif choix == "3":
-            if personnage.inventory.has_item("Potion de soin"):
-                potion = personnage.inventory.get_item("Potion de soin")
-                personnage.inventory.remove_item(potion)
-                personnage.pv = min(personnage.pv_max, personnage.pv + 40)
-                print(f"+40 PV ({personnage.pv}/{personnage.pv_max})")
-        elif choix == "4":
-            action_defendre(personnage)
-        elif choix == "5":
-            if tenter_fuite(personnage, ennemi): break
-        
-        # Tour ennemi
-        if ennemi.pv > 0 and not est_etourdi(ennemi):
-            # IA simple
-            if random.random() < 0.3 and "competence_speciale" in ennemi.particularites:
-                appliquer_statut(personnage, Brulure())
-            else:
-                # Ajouter force1 aux ennemis pour qu'ils attaquent
-                if not hasattr(ennemi, 'force1'): setattr(ennemi, 'force1', 25)
-                action_attaquer(ennemi, personnage)
-        
-        # Fin tour statuts end_turn
-        for statut in personnage.statuts + ennemi.statuts:
-            if statut.trigger_moment == "end_turn":
-                statut.apply(personnage if isinstance(statut, Brulure) else ennemi)
-        
+        emettre("combat", "\n1. Attaquer | 2. Compétence | 3. Objet | 4. Défendre | 5. Fuir")
+        choix = saisir("Action : ").strip()
+        action = ACTIONS_COMBAT.get(choix)
+        comp = None
+        if action == "competence":
+            emettre("menu", "Compétences: {competences}", competences=", ".join(personnage.competences))
+            comp = saisir("Choisir : ")
+        if resoudre_tour_combat(personnage, ennemi, action, comp): break
         tour += 1
-        # Fin de combat : message clair
-        if personnage.pv <= 0:
-            print(f"\n{personnage.nom} est vaincu...")
-        elif ennemi.pv <= 0:
-            print(f"\n{ennemi.nom} est vaincu !")
 
 # ========================
 # FONCTION PRINCIPALE
 # ========================
 
 def jeu_principal():
-    print(" L'AVENTURE DU DONJON PERDU - VERSION ULTIME ")
-    print("\n1. Nouvelle partie ")
-    print("2. Charger sauvegarde ")
-    choix = input("→ ").strip()
+    emettre("menu", " L'AVENTURE DU DONJON PERDU - VERSION ULTIME ")
+    emettre("menu", "\n1. Nouvelle partie ")
+    emettre("menu", "2. Charger sauvegarde ")
+    choix = saisir("→ ").strip()
     
     if choix == "2":
         jeu = Jeu("normal")  # Difficulté par défaut pour chargement
         joueur = jeu.charger()
         if not joueur:
-            print(" Sauvegarde corrompue → Nouvelle partie")
+            emettre("menu", " Sauvegarde corrompue → Nouvelle partie")
             return nouvelle_partie()
     else:
         nouvelle_partie()
@@ -685,12 +1082,12 @@ def jeu_principal():
     while joueur.pv > 0 and not jeu.quete.est_terminee():
         jeu.explorer(joueur)
         
-        print("\n" + "="*60)
-        print("MENU COMPLET :")
-        print("1. Village     2. Forêt     3. Donjon ")
-        print("4. Status     5. Sauvegarder     6. Marchand ")
-        print("0. Quitter ")
-        choix = input("→ ").strip()
+        emettre("menu", "\n" + "=" * 60)
+        emettre("menu", "MENU COMPLET :")
+        emettre("menu", "1. Village     2. Forêt     3. Donjon ")
+        emettre("menu", "4. Status     5. Sauvegarder     6. Marchand ")
+        emettre("menu", "0. Quitter ")
+        choix = saisir("→ ").strip()
         
         if choix == "1":
             jeu.deplacer("village")
@@ -709,63 +1106,94 @@ def jeu_principal():
             break
     
     if jeu.quete.est_terminee():
-        print("\n LÉGENDE ACCOMPLIE ! Le village est sauvé !")
+        emettre("menu", "\n LÉGENDE ACCOMPLIE ! Le village est sauvé !")
 
 def nouvelle_partie():
     global joueur, jeu
     
-    diff = input("Difficulté (f/n/d) [n] : ").lower() or 'n'
+    diff = saisir("Difficulté (f/n/d) [n] : ").lower() or 'n'
     diff_map = {'f': 'facile', 'n': 'normal', 'd': 'difficile'}
     difficulte = diff_map.get(diff, 'normal')
     
-    nom = input("Nom du héros : ")
-    print("\n1. Guerrier | 2. Mage | 3. Voleur ")
-    choix_classe = input("Classe : ").strip()
+    nom = saisir("Nom du héros : ")
+    emettre("menu", "\n1. Guerrier | 2. Mage | 3. Voleur ")
+    choix_classe = saisir("Classe : ").strip()
     classes = {"1": Guerrier, "2": Mage, "3": Voleur}
     Classe = classes.get(choix_classe, Guerrier)
 
     joueur = Classe(nom)
     jeu = Jeu(difficulte)
 
-    print(f"\n {joueur.nom} le {joueur.type} prêt pour l'aventure ({difficulte.upper()})!")
-    print(f" Objectif : {jeu.quete.description[0]}")
+    emettre("menu", "\n {joueur_nom} le {joueur_type} prêt pour l'aventure ({difficulte})!", joueur_nom=joueur.nom, joueur_type=joueur.type, difficulte=difficulte.upper())
+    emettre("menu", " Objectif : {objectif}", objectif=jeu.quete.description[0])
     return joueur, jeu
 
 def print_status(joueur, jeu):
-    print(f"\n {joueur.nom} ({joueur.type})")
-    print(f" PV: {joueur.pv}/{joueur.pv_max} | ATK: {joueur.attaque}")
-    print(f" DEF: {joueur.defense} | INT: {joueur.intelligence}")
-    print(f" Inventaire: {len(joueur.inventory.items)}/10")
-    print(f"Zone: {jeu.position.upper()} |  Or: {jeu.or_}")
-    print(f" Quête: {jeu.quete.description[jeu.quete.etat]}")
+    emettre("menu", "\n {joueur_nom} ({joueur_type})", joueur_nom=joueur.nom, joueur_type=joueur.type)
+    emettre("menu", " PV: {joueur_pv}/{joueur_pv_max} | ATK: {joueur_attaque}", joueur_pv=joueur.pv, joueur_pv_max=joueur.pv_max, joueur_attaque=joueur.attaque)
+    emettre("menu", " DEF: {joueur_defense} | INT: {joueur_intelligence}", joueur_defense=joueur.defense, joueur_intelligence=joueur.intelligence)
+    emettre("menu", " Inventaire: {nb_objets}/{capacite}", nb_objets=len(joueur.inventory), capacite=joueur.inventory.capacity)
+    emettre("menu", "Zone: {zone} |  Or: {or_}", zone=jeu.position.upper(), or_=jeu.or_)
+    emettre("menu", " Quête: {quete}", quete=jeu.quete.description[jeu.quete.etat])
 
 
 # ==========================
 # SYSTÈME DE QUÊTE PRINCIPALE
 # ==========================
 
+QUETE_PRINCIPALE = Quete("principale", [
+    Objectif("cle", "collecter", "cle_donjon", description=" Trouver la Clé du Donjon dans la Forêt"),
+    Objectif("gardien", "tuer", "GardienDonjon", apres=("cle",), description=" Vaincre le Gardien du Donjon"),
+], titre="QUÊTE PRINCIPALE", fin=" Quête terminée !")
+
+
 class QuetePrincipale:
-    def __init__(self):
-        self.etat = 0  # 0: chercher clé, 1: donjon accessible, 2: terminé
-        self.description = [
-            " Trouver la Clé du Donjon dans la Forêt",
-            " Vaincre le Gardien du Donjon",
-            " Quête terminée !"
-        ]
+    """Quête principale vue comme un compteur d'étapes, sur un MoteurQuetes (quetes.py)."""
+
+    def __init__(self, moteur=None):
+        self.moteur = moteur or MoteurQuetes()
+        if QUETE_PRINCIPALE.identifiant not in self.moteur.quetes:
+            self.moteur.ajouter(QUETE_PRINCIPALE)
+        # 0: chercher clé, 1: donjon accessible, 2: terminé
+        self.description = [QUETE_PRINCIPALE.objectifs[nom].description for nom in QUETE_PRINCIPALE.ordre]
+        self.description.append(QUETE_PRINCIPALE.fin)
+
+    @property
+    def etat(self):
+        return len(self.moteur.atteints[QUETE_PRINCIPALE.identifiant])
+
+    @etat.setter
+    def etat(self, etat):
+        self.moteur.placer(QUETE_PRINCIPALE.identifiant, QUETE_PRINCIPALE.ordre[:etat])
 
     def progresser(self):
-        if self.etat < 2:
-            self.etat += 1
-            print(f" Progression : {self.description[self.etat]}")
+        """Valide l'étape en cours sans passer par son déclencheur."""
+        if self.etat < len(QUETE_PRINCIPALE.ordre):
+            self.moteur.atteindre(QUETE_PRINCIPALE.identifiant, QUETE_PRINCIPALE.ordre[self.etat])
 
     def est_terminee(self):
-        return self.etat == 2
+        return self.moteur.est_terminee(QUETE_PRINCIPALE.identifiant)
 
     def peut_entrer_donjon(self):
-        return self.etat >= 1
+        return "cle" in self.moteur.atteints[QUETE_PRINCIPALE.identifiant]
+
+# Coffre normal : un lot équiprobable
+BUTIN_COFFRE = [("potion_soin", 1), ("dague_affutee", 1), ("manteau_renforce", 1), (25, 1)]
 
 class Jeu:
-    def __init__(self):
+    # Prototypes réglés par difficulté, partagés par toutes les parties
+    ennemis = FabriqueEnnemis(NiveauDifficulte.appliquer_stats, statuts=Statuts)
+    # Chances de trouver la clé (quête à l'étape 0)
+    CHANCE_CLE_BUTIN = 0.4  # sur un ennemi vaincu
+    CHANCE_CLE_COFFRE = 0.6  # dans un coffre de la Forêt
+    monde = None  # monde.Monde en mode monde procédural
+
+    def __init__(self, difficulte="normal", quetes=(), monde=None):
+        """
+        quetes : quêtes (quetes.Quete) suivies en plus de la quête principale ;
+        monde : monde.Monde remplaçant les trois zones fixes (départ en monde.depart).
+        """
+        self.difficulte = difficulte  # clé de NiveauDifficulte.NIVEAUX, appliquée à chaque apparition
         self.zones = {
             "village": Zone(
                 nom="Village",
@@ -779,71 +1207,83 @@ class Jeu:
                 description=" Forêt dangereuse - Cherche la Clé du Donjon ici !",
                 evenements=[("combat", 0.4), ("coffre", 0.3), ("dialogue", 0.2), ("cle", 0.1)],
                 ennemis_possibles=[LoupSauvage, Bandit, Squelette],
-                acces=None
+                acces=None,
+                butin=BUTIN_COFFRE
             ),
             "donjon": Zone(
                 nom="Donjon",
                 description=" Donjon scellé - Seul le Gardien reste...",
                 evenements=[("combat", 0.5), ("coffre", 0.4), ("boss", 0.1)],
                 ennemis_possibles=[ChampionCorrompu],
-                acces="quete"
+                acces="quete",
+                butin=BUTIN_COFFRE
             )
         }
         self.position = "village"
-        self.quete = QuetePrincipale()
+        if monde is not None:
+            self.monde = self.zones = monde
+            self.position = monde.depart
+        self.quetes = MoteurQuetes(quetes)
+        self.quete = QuetePrincipale(self.quetes)
         self.or_ = 50
         self.nb_explorations_foret = 0
+        self.journaux = {}  # nom de fichier -> JournalSauvegarde
+
+    def __getstate__(self):
+        # Les journaux ouverts ne se copient pas : ils sont rouverts à la demande
+        etat = self.__dict__.copy()
+        etat["journaux"] = {}
+        return etat
         
     def tirer_evenement(self, evenements):
-        evenements_possibles = []
-        poids_total = 0
-        for evt, poids in evenements:
-            evenements_possibles.extend([evt] * int(poids * 10))
-            poids_total += poids
-        if not evenements_possibles:
-            return "rien"
-
-        return random.choice(evenements_possibles)
+        """evenements : TableAlias compilée (Zone.tirage_evenements) ou liste (evt, poids). Renvoie un Evenement."""
+        if not isinstance(evenements, TableAlias):
+            evenements = EVENEMENTS.compiler(evenements)
+        if not evenements:
+            return EVENEMENTS.evenement("rien")
+        return evenements.tirer(flux.evenements)
 
     def status_quete(self):
         """Affiche l'état actuel de la quête."""
-        print(f"\n QUÊTE PRINCIPALE : {self.quete.description[self.quete.etat]}")
-        print(f" Or : {self.or_} | Zone : {self.position.upper()}")
+        emettre("exploration", "\n QUÊTE PRINCIPALE : {quete}", quete=self.quete.description[self.quete.etat])
+        emettre("exploration", " Or : {or_} | Zone : {zone}", or_=self.or_, zone=self.position.upper())
         if self.quete.etat == 0:
-            print(" Indice : Explore la Forêt pour trouver la Clé !")
-
-    def explorer(self, joueur):
+            emettre("exploration", " Indice : Explore la Forêt pour trouver la Clé !")
+
+    def signaler(self, declencheur, cible=None, quantite=1):
+        """Fait de jeu ("tuer", "collecter", "entrer"...) vers les quêtes qui l'attendent."""
+        for quete in self.quetes.signaler(declencheur, cible, quantite):
+            if quete.or_:
+                self.or_ += quete.or_
+                emettre("quete", " {titre} : +{or_} or (Total: {total})", titre=quete.titre, or_=quete.or_,
+                        total=self.or_)
+
+    def debut_exploration(self):
+        """Vérifie l'accès, présente la zone et tire l'événement (None si la zone est fermée)."""
         zone = self.zones[self.position]
 
         # Vérifier accès donjon
         if self.position == "donjon" and not self.quete.peut_entrer_donjon():
-            print(" Le donjon est scellé ! Trouve d'abord la Clé dans la Forêt.")
-            return False
+            emettre("exploration", " Le donjon est scellé ! Trouve d'abord la Clé dans la Forêt.")
+            return None
 
         self.status_quete()
-        print(f"\n{'='*50}")
-        print(f" {zone.description}")
-        print('='*50)
-
-        evenement = self.tirer_evenement(zone.evenements)
-
-        if evenement == "combat":
-            return self.evenement_combat(joueur, zone)
-        elif evenement == "coffre":
-            return self.evenement_coffre(joueur, zone)
-        elif evenement == "marchand":
-            self.evenement_marchand(joueur)
-        elif evenement == "dialogue":
-            self.evenement_dialogue()
-        elif evenement == "cle":
-            self.evenement_cle()
-        elif evenement == "boss":
-            return self.evenement_boss(joueur)
-        elif evenement == "repos":
-            self.evenement_repos(joueur)
-        
-        return True  # Continuons l'exploration
+        emettre("exploration", "\n" + "=" * 50)
+        emettre("exploration", " {zone_description}", zone_description=zone.description)
+        emettre("exploration", "=" * 50)
+
+        return self.tirer_evenement(zone.tirage_evenements)
+
+    def explorer(self, joueur):
+        evenement = self.debut_exploration()
+        if evenement is None:
+            return False
+
+        return self.declencher(evenement, joueur)
 
+    def declencher(self, evenement, joueur):
+        """Joue un Evenement dans la zone courante ; même valeur de retour qu'explorer."""
+        return evenement.executer(self, joueur, self.zones[self.position]) is not False
 
     def evenement_dialogue(self):
         dialogues = {
@@ -851,151 +1291,169 @@ class Jeu:
             "foret": "Tu trouves une vieille inscription : 'Seul le cœur pur trouve la clé...'",
             "donjon": "Une voix spectrale : 'Prouve ta valeur face au Gardien !'"
         }
-        print(dialogues.get(self.position, "Quelque chose d'interessant..."))
+        emettre("exploration", "{texte}", texte=dialogues.get(self.position, "Quelque chose d'interessant..."))
 
     def evenement_marchand(self, joueur):
-        print("Un marchand itinerant t'aborde :")
-        print("1. Potion de soin (20 or)")
-        print("2. Epee d'acier (50 or)") 
-        print("3. Armure renforcee (40 or)")
-        print("4. Quitter")
-        
-        choix = input("Choix : ")
+        self.afficher_marchand()
+        self.acheter(joueur, saisir("Choix : "))
+
+    def afficher_marchand(self):
+        emettre("exploration", "Un marchand itinerant t'aborde :")
+        emettre("exploration", "1. Potion de soin (20 or)")
+        emettre("exploration", "2. Epee d'acier (50 or)") 
+        emettre("exploration", "3. Armure renforcee (40 or)")
+        emettre("exploration", "4. Quitter")
+
+    def acheter(self, joueur, choix):
         if choix == "1" and self.or_ >= 20:
             self.or_ -= 20
-            potion = Consumable("Potion de soin", "soin_30")
-            joueur.inventory.add_item(potion)
-            print("Potion achetée !")
+            joueur.inventory.add_item(POTION_SOIN_MARCHAND)
+            self.signaler("collecter", catalogue.identifiant(POTION_SOIN_MARCHAND))
+            emettre("exploration", "Potion achetée !")
         elif choix == "2" and self.or_ >= 50:
             self.or_ -= 50
-            epee = Weapon("Epee d'acier", attack_bonus=15)
-            joueur.inventory.add_item(epee)
-            print("Epee d'acier achetée !")
+            joueur.inventory.add_item(EPEE_ACIER)
+            self.signaler("collecter", catalogue.identifiant(EPEE_ACIER))
+            emettre("exploration", "Epee d'acier achetée !")
         elif choix == "3" and self.or_ >= 40:
             self.or_ -= 40
-            armure = Armor("Armure renforcee", defense_bonus=10)
-            joueur.inventory.add_item(armure)
-            print("Armure renforcee achetée !")
+            joueur.inventory.add_item(ARMURE_RENFORCEE)
+            self.signaler("collecter", catalogue.identifiant(ARMURE_RENFORCEE))
+            emettre("exploration", "Armure renforcee achetée !")
         else:
-            print("Pas assez d'or ou choix invalide.")
+            emettre("exploration", "Pas assez d'or ou choix invalide.")
 
     def evenement_repos(self, joueur):
         soin = min(50, joueur.pv_max - joueur.pv)
         joueur.pv += soin
-        print(f"Repos au village. +{soin} PV (total: {joueur.pv})")
+        emettre("exploration", "Repos au village. +{soin} PV (total: {joueur_pv})", soin=soin, joueur_pv=joueur.pv)
 
 
     def evenement_combat(self, joueur, zone):
-        ennemi_classe = random.choice(zone.ennemis_possibles)
-        ennemi = ennemi_classe()
-        print(f"\n{ennemi.nom} apparaît !")
-        input("Appuie sur Entree pour combattre...")
+        ennemi = self.tirer_ennemi(zone, joueur)
+        saisir("Appuie sur Entree pour combattre...")
         combat_interactif(joueur, ennemi)  # combat interactif
 
-        if ennemi.pv <= 0:
-            gain_or = random.randint(10, 30)
+        if self.issue_combat(joueur, ennemi):
+            emettre("exploration", "Combat terminé. Appuie sur Entrée pour continuer...")
+            saisir()
+            return True
+        return False
+
+    def tirer_ennemi(self, zone, joueur=None):
+        ennemi_classe = zone.tirage_ennemis.tirer(flux.rencontres)
+        ennemi = self.ennemis.creer(ennemi_classe, self.difficulte, joueur and joueur.type)
+        emettre("exploration", "\n{ennemi_nom} apparaît !", ennemi_nom=ennemi.nom)
+        return ennemi
+
+    def issue_combat(self, joueur, ennemi):
+        """Butin après un combat d'exploration. Renvoie True si la clé est tombée."""
+        vaincu = ennemi.pv <= 0
+        if vaincu:
+            multi = NiveauDifficulte.multiplicateurs(self.difficulte, joueur.type)
+            gain_or = int(flux.butin.randint(10, 30) * multi["or_multi"])
             self.or_ += gain_or
-            print(f"+{gain_or} or (Total: {self.or_})")
+            emettre("exploration", "+{gain_or} or (Total: {or_})", gain_or=gain_or, or_=self.or_)
+            self.signaler("tuer", type(ennemi).__name__)
 
-            if self.quete.etat == 0 and random.random() < 0.4:
-                self.quete.progresser()
-                print("LA CLÉ DU DONJON tombe du cadavre !")
-                print("Combat terminé. Appuie sur Entrée pour continuer...")
-                input()
+            if self.quete.etat == 0 and flux.butin_cle.random() < self.CHANCE_CLE_BUTIN:
+                self.signaler("collecter", "cle_donjon")
+                emettre("exploration", "LA CLÉ DU DONJON tombe du cadavre !")
                 return True
         return False
 
 
     def combat(self, joueur, ennemi):
         if ennemi.pv <= 0:
-            gain_or = random.randint(10, 30)
+            gain_or = flux.butin.randint(10, 30)
             self.or_ += gain_or
-            print(f" +{gain_or} or (Total: {self.or_})")
+            emettre("exploration", " +{gain_or} or (Total: {or_})", gain_or=gain_or, or_=self.or_)
+            self.signaler("tuer", type(ennemi).__name__)
 
             # Chance de drop clé (étape 1)
-            if self.quete.etat == 0 and random.random() < 0.4:
-                self.quete.progresser()
-                print(" LA CLÉ DU DONJON tombe du cadavre !")
+            if self.quete.etat == 0 and flux.butin_cle.random() < self.CHANCE_CLE_BUTIN:
+                self.signaler("collecter", "cle_donjon")
+                emettre("exploration", " LA CLÉ DU DONJON tombe du cadavre !")
                 return True
         return False
 
     def evenement_coffre(self, joueur, zone):
-        if self.quete.etat == 0 and zone.nom == "Forêt" and random.random() < 0.6:
+        if self.quete.etat == 0 and zone.nom == "Forêt" and flux.coffre.random() < self.CHANCE_CLE_COFFRE:
             # Coffre spécial : CLÉ DU DONJON
-            self.quete.progresser()
-            print(" COFFRE MYSTÉRIEUX ! Tu trouves la CLÉ DU DONJON !")
+            self.signaler("collecter", "cle_donjon")
+            emettre("exploration", " COFFRE MYSTÉRIEUX ! Tu trouves la CLÉ DU DONJON !")
             return True
 
-        # Coffre normal
-        loots = [
-            (Consumable("Potion de soin", "soin"), " Potion de soin"),
-            (Weapon("Dague affûtée", 8), " Dague affûtée (+8 ATK)"),
-            (Armor("Manteau renforcé", 5), " Manteau renforcé (+5 DEF)"),
-            ("or", 25)
-        ]
-        loot = random.choice(loots)
-
-        if isinstance(loot, tuple) and loot[0] == "or":
-            self.or_ += loot[1]
-            print(f" +{loot[1]} or trouvé !")
-        else:
-            item, message = loot
-            if joueur.inventory.add_item(item):
-                print(message)
+        # Coffre normal : la table de la zone désigne un prototype, rien n'est construit
+        lot = zone.tirage_butin.tirer(flux.coffre)
+        if lot is None:
+            return True
+        if lot.objet is None:
+            self.or_ += lot.or_
+            emettre("exploration", " +{montant} or trouvé !", montant=lot.or_)
+        elif joueur.inventory.add_item(lot.objet):
+            emettre("exploration", "{message}", message=lot.message)
+            self.signaler("collecter", catalogue.identifiant(lot.objet))
         return True
 
     def evenement_cle(self):
         """Événement dédié à la clé (rare)."""
-        self.quete.progresser()
-        print(" Un éclat mystérieux apparaît ! C'est la CLÉ DU DONJON !")
+        self.signaler("collecter", "cle_donjon")
+        emettre("exploration", " Un éclat mystérieux apparaît ! C'est la CLÉ DU DONJON !")
         return True
 
     def evenement_boss(self, joueur):
-        print("\n === COMBAT FINAL ===")
-        print("Le GARDIEN DU DONJON se dresse devant toi !")
-        input("Appuie sur Entrée pour le dernier combat...")
-
-        boss = GardienDonjon()
+        boss = self.apparition_boss(joueur)
+        saisir("Appuie sur Entrée pour le dernier combat...")
         combat_interactif(joueur, boss)
-        if boss.pv <= 0:
-            self.quete.progresser()
+        return self.issue_boss(joueur, boss)
+
+    def apparition_boss(self, joueur=None):
+        emettre("exploration", "\n === COMBAT FINAL ===")
+        emettre("exploration", "Le GARDIEN DU DONJON se dresse devant toi !")
+        return self.ennemis.creer(GardienDonjon, self.difficulte, joueur and joueur.type)
+
+    def issue_boss(self, joueur, boss):
+        """Fin du combat final. Renvoie False si le Gardien est tombé (fin du jeu)."""
+        vaincu = boss.pv <= 0
+        if vaincu:
+            self.signaler("tuer", type(boss).__name__)
             self.donner_recompense_finale(joueur)
             return False  # Fin du jeu
         return True
 
     def donner_recompense_finale(self, joueur):
         """Récompense légendaire pour la victoire finale."""
-        print("\n FÉLICITATIONS ! Tu as sauvé le village !")
-        print(" Récompense légendaire :")
+        emettre("exploration", "\n FÉLICITATIONS ! Tu as sauvé le village !")
+        emettre("exploration", " Récompense légendaire :")
 
         # Arme OU armure légendaire (au hasard)
-        if random.random() < 0.5:
-            arme = Weapon("Épée du Gardien", attack_bonus=25, int_bonus=10)
+        if flux.recompense.random() < 0.5:
+            arme = EPEE_GARDIEN
             joueur.inventory.add_item(arme)
             joueur.equip_weapon(arme)
-            print(" Épée du Gardien équipée automatiquement (+25 ATK, +10 INT)")
+            emettre("exploration", " Épée du Gardien équipée automatiquement (+25 ATK, +10 INT)")
         else:
-            armure = Armor("Armure Ancestrale", defense_bonus=20, int_bonus=15)
+            armure = ARMURE_ANCESTRALE
             joueur.inventory.add_item(armure)
             joueur.equip_armor(armure)
-            print(" Armure Ancestrale équipée (+20 DEF, +15 INT)")
+            emettre("exploration", " Armure Ancestrale équipée (+20 DEF, +15 INT)")
 
     def deplacer(self, nouvelle_zone):
         ancien = self.position
         self.position = nouvelle_zone
-        print(f"\n{ancien.upper()} → {nouvelle_zone.upper()}")
-
-    def sauvegarder(self, nom_fichier="sauvegarde.json"):
-        import json
-        data = {
-            "position": self.position,
-            "quete_etat": self.quete.etat,
-            "or": self.or_,
-            "nb_explorations_foret": self.nb_explorations_foret
-        }
-        with open(nom_fichier, 'w') as f:
-            json.dump(data, f)
-        print(f"Sauvegardé dans {nom_fichier}")
+        emettre("exploration", "\n{ancien} → {nouvelle}", ancien=ancien.upper(), nouvelle=nouvelle_zone.upper())
+        self.signaler("entrer", nouvelle_zone)
+
+
+# Gestionnaires des événements de zone (events.py) ; les interactifs demandent une saisie
+EVENEMENTS.enregistrer("combat", lambda jeu, joueur, zone: jeu.evenement_combat(joueur, zone), interactif=True)
+EVENEMENTS.enregistrer("marchand", lambda jeu, joueur, zone: jeu.evenement_marchand(joueur), interactif=True)
+EVENEMENTS.enregistrer("boss", lambda jeu, joueur, zone: jeu.evenement_boss(joueur), interactif=True)
+EVENEMENTS.enregistrer("coffre", lambda jeu, joueur, zone: jeu.evenement_coffre(joueur, zone))
+EVENEMENTS.enregistrer("dialogue", lambda jeu, joueur, zone: jeu.evenement_dialogue())
+EVENEMENTS.enregistrer("cle", lambda jeu, joueur, zone: jeu.evenement_cle())
+EVENEMENTS.enregistrer("repos", lambda jeu, joueur, zone: jeu.evenement_repos(joueur))
 
 # ==========================
 # SERIALISATION PERSONNAGE
@@ -1019,14 +1477,17 @@ class SauvegardePersonnage:
     armor_equipee: Dict[str, Any] = None
 
 
+@dataclass
 class SauvegardeJeu:
     """Structure complète de sauvegarde."""
-    def __init__(self):
-        self.personnage: SauvegardePersonnage = None
-        self.position: str = "village"
-        self.quete_etat: int = 0
-        self.or_: int = 50
-        self.nb_explorations_foret: int = 0
+    personnage: SauvegardePersonnage = None
+    position: str = "village"
+    quete_etat: int = 0
+    or_: int = 50
+    nb_explorations_foret: int = 0
+    quetes: Dict[str, Any] = None  # MoteurQuetes.etat()
+    monde: Dict[str, Any] = None  # Monde.parametres() en mode monde procédural
+    difficulte: str = "normal"  # clé de NiveauDifficulte.NIVEAUX
 
 def to_dict(self) -> Dict[str, Any]:
     """Convertit le personnage en dict sérialisable."""
@@ -1034,16 +1495,16 @@ def to_dict(self) -> Dict[str, Any]:
         "nom": self.nom,
         "type": self.type,
         "pv": self.pv,
-        "pv_max": 100,  # fixe pour l'instant
+        "pv_max": self.pv_max,
         "intelligence": self.intelligence,
         "agilite": self.agilite,
         "force1": self.force1,
         "force2": self.force2,
         "defense_base": self.defense_base,
         "competences": self.competences,
-        "weapon_equipee": self.weapon.to_dict() if self.weapon else None,
-        "armor_equipee": self.armor.to_dict() if self.armor else None,
-        "inventaire": [item.to_dict() for item in self.inventory.items]
+        "weapon_equipee": catalogue.donnees(self.weapon) if self.weapon else None,
+        "armor_equipee": catalogue.donnees(self.armor) if self.armor else None,
+        "inventaire": self.inventory.to_dict()
     }
 
 def from_dict(self, data: Dict[str, Any]):
@@ -1058,92 +1519,109 @@ def from_dict(self, data: Dict[str, Any]):
     self.force2 = data["force2"]
     self.defense_base = data["defense_base"]
     self.competences = data["competences"]
-    self.inventory = Inventory(capacity=10)
-    
     # Restaurer inventaire
-    for item_data in data["inventaire"]:
-        item = self.creer_item_from_dict(item_data)
-        self.inventory.add_item(item)
+    self.inventory = Inventory.from_dict(data["inventaire"], capacity=10)
     
-    # Équipements
+    # Équipements : on reprend l'exemplaire de l'inventaire s'il y est
     if data["weapon_equipee"]:
-        self.weapon = self.creer_item_from_dict(data["weapon_equipee"])
+        self.weapon = equipement_depuis_inventaire(self.inventory, data["weapon_equipee"])
     if data["armor_equipee"]:
-        self.armor = self.creer_item_from_dict(data["armor_equipee"])
+        self.armor = equipement_depuis_inventaire(self.inventory, data["armor_equipee"])
+
+def equipement_depuis_inventaire(inventaire, data: Dict[str, Any]) -> Item:
+    if "id" in data:
+        return catalogue[data["id"]]  # même instance que celle de l'inventaire
+    item = inventaire.get_item(data["name"])
+    if item is not None and item.to_dict() == data:
+        return item
+    return creer_item_from_dict(data)
 
 def creer_item_from_dict(data: Dict[str, Any]) -> Item:
-    """Fabrique un Item depuis ses données sérialisées."""
+    """Fabrique un Item depuis ses données sérialisées (prototype partagé s'il existe)."""
+    if "id" in data:
+        return catalogue[data["id"]]
     item_type = data.get("item_type", "Item")
     
     if item_type == "Weapon":
-        return Weapon(data["name"], data["attack_bonus"], data.get("int_bonus", 0))
+        item = Weapon(data["name"], data["attack_bonus"], data.get("int_bonus", 0))
     elif item_type == "Armor":
-        return Armor(data["name"], data["defense_bonus"], data.get("int_bonus", 0))
+        item = Armor(data["name"], data["defense_bonus"], data.get("int_bonus", 0))
     elif item_type == "Consumable":
-        return Consumable(data["name"], data["effect"])
+        item = Consumable(data["name"], data["effect"])
     else:
-        return Item(data["name"])
-
-# Ajoute ces méthodes aux classes Item, Weapon, Armor, Consumable
-def to_dict(self) -> Dict[str, Any]:  # Pour Item
-    return {"name": self.name, "item_type": self.__class__.__name__}
-
-def to_dict(self) -> Dict[str, Any]:  # Pour Weapon (override)
-    return {
-        "name": self.name,
-        "item_type": "Weapon",
-        "attack_bonus": self.attack_bonus,
-        "int_bonus": getattr(self, "int_bonus", 0)
-    }
-
-def to_dict(self) -> Dict[str, Any]:  # Pour Armor
-    return {
-        "name": self.name,
-        "item_type": "Armor",
-        "defense_bonus": self.defense_bonus,
-        "int_bonus": getattr(self, "int_bonus", 0)
-    }
-
-def to_dict(self) -> Dict[str, Any]:  # Pour Consumable
-    return {
-        "name": self.name,
-        "item_type": "Consumable",
-        "effect": self.effect
-    }
+        item = Item(data["name"])
+    return catalogue.dedoublonner(item)  # anciennes sauvegardes : contenu complet
 
 # ==========================
 # MÉTHODES JEU SAUVEGARDE
 # ==========================
 
-def sauvegarder(self, joueur, nom_fichier="sauvegarde.json"):
-    """Sauvegarde complète du jeu."""
+def etat_sauvegarde(self, joueur) -> Dict[str, Any]:
+    """État complet du jeu sous forme de dict JSON."""
     sauvegarde = SauvegardeJeu()
     sauvegarde.personnage = SauvegardePersonnage(**joueur.to_dict())
     sauvegarde.position = self.position
     sauvegarde.quete_etat = self.quete.etat
     sauvegarde.or_ = self.or_
     sauvegarde.nb_explorations_foret = self.nb_explorations_foret
+    sauvegarde.quetes = self.quetes.etat()
+    sauvegarde.monde = self.monde.parametres() if self.monde is not None else None
+    sauvegarde.difficulte = self.difficulte
+    return asdict(sauvegarde)
+
+def sauvegarder(self, joueur, nom_fichier="sauvegarde.json"):
+    """Sauvegarde complète du jeu (seuls les changements sont écrits dans le journal)."""
+    etat = self.etat_sauvegarde(joueur)
+    self.journal(nom_fichier).enregistrer(etat)
     
-    with open(nom_fichier, 'w', encoding='utf-8') as f:
-        json.dump(asdict(sauvegarde), f, indent=2, ensure_ascii=False)
-    
-    print(f" Sauvegarde créée : {nom_fichier}")
-    print(" PV:", sauvegarde.personnage.pv, f"/{sauvegarde.personnage.pv_max}")
+    emettre("sauvegarde", " Sauvegarde créée : {nom_fichier}", nom_fichier=nom_fichier)
+    emettre("sauvegarde", " PV: {pv} /{pv_max}", pv=etat["personnage"]["pv"], pv_max=etat["personnage"]["pv_max"])
 
 def charger(self, nom_fichier="sauvegarde.json"):
     """Restaure complètement l'état du jeu."""
     if not os.path.exists(nom_fichier):
-        print(" Aucune sauvegarde trouvée.")
+        emettre("sauvegarde", " Aucune sauvegarde trouvée.")
         return None
     
-    with open(nom_fichier, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Restaurer jeu
-    self.position = data["position"]
-    self.quete.etat = data["quete_etat"]
-    self.or_ = data["or_"]
-    self.nb_explorations_foret = data["nb_explorations_foret"]
+    try:
+        data = self.journal(nom_fichier).charger()
+    except (ValueError, KeyError) as erreur:
+        emettre("sauvegarde", " Sauvegarde illisible : {erreur}", erreur=erreur)
+        return None
+    try:
+        self.verifier_monde(data)
+    except ValueError as erreur:
+        emettre("sauvegarde", " Sauvegarde d'un autre monde : {erreur}", erreur=erreur)
+        return None
+    try:
+        return self.restaurer(data)
+    except (KeyError, IndexError, TypeError, ValueError) as erreur:
+        # Lisible mais ancienne ou partielle (champ manquant, mauvais type)
+        emettre("sauvegarde", " Sauvegarde illisible : {erreur!r}", erreur=erreur)
+        return None
+
+def verifier_monde(self, data: Dict[str, Any]):
+    """ValueError si la sauvegarde vient d'un autre monde que celui du jeu (zones fixes ou Monde)."""
+    sauve = data.get("monde")
+    actuel = self.monde.parametres() if self.monde is not None else None
+    if sauve == actuel:
+        return
+    if sauve is None:
+        raise ValueError("sauvegarde des zones fixes, à charger dans un Jeu sans monde")
+    raise ValueError(f"sauvegarde du monde procédural {sauve}, à charger dans Jeu(monde=Monde(**monde))")
+
+def restaurer(self, data: Dict[str, Any]):
+    """Restaure le jeu et renvoie le joueur. La sauvegarde est lue en entier avant
+    de toucher au jeu : incomplète (KeyError, TypeError...), le jeu reste intact."""
+    self.verifier_monde(data)
+    position = data["position"]
+    quete_etat = data["quete_etat"]
+    self.quete.description[quete_etat]  # IndexError avant toute modification
+    or_ = data["or_"]
+    nb_explorations_foret = data["nb_explorations_foret"]
+    difficulte = data["difficulte"]
+    if difficulte not in NiveauDifficulte.NIVEAUX:
+        raise ValueError(f"Difficulté inconnue : {difficulte!r}")
     
     # Restaurer personnage
     perso_data = data["personnage"]
@@ -1162,70 +1640,157 @@ def charger(self, nom_fichier="sauvegarde.json"):
     # Appliquer les données sauvegardées
     joueur.from_dict(perso_data)
     
-    print(f" Chargé : {joueur.nom} ({joueur.type})")
-    print(f" Zone : {self.position} |  Or : {self.or_}")
-    print(f" Quête : {self.quete.description[self.quete.etat]}")
+    # Restaurer jeu
+    self.quetes.restaurer(data.get("quetes") or {})
+    self.position = position
+    self.quete.etat = quete_etat
+    self.or_ = or_
+    self.nb_explorations_foret = nb_explorations_foret
+    self.difficulte = difficulte
+    
+    emettre("sauvegarde", " Chargé : {joueur_nom} ({joueur_type})", joueur_nom=joueur.nom, joueur_type=joueur.type)
+    emettre("sauvegarde", " Zone : {position} |  Or : {or_} |  Difficulté : {difficulte}",
+            position=self.position, or_=self.or_, difficulte=self.difficulte)
+    emettre("sauvegarde", " Quête : {quete}", quete=self.quete.description[self.quete.etat])
     
     return joueur
 
+def sauvegarder_emplacement(self, joueur, magasin, emplacement):
+    """Sauvegarde dans un emplacement d'un MagasinSauvegardes (SQLite)."""
+    magasin.enregistrer(emplacement, self.etat_sauvegarde(joueur))
+    emettre("sauvegarde", " Sauvegarde créée : emplacement {emplacement}", emplacement=emplacement)
+
+def charger_emplacement(self, magasin, emplacement):
+    data = magasin.charger(emplacement)
+    if data is None:
+        emettre("sauvegarde", " Emplacement {emplacement} vide.", emplacement=emplacement)
+        return None
+    try:
+        return self.restaurer(data)
+    except (KeyError, IndexError, TypeError, ValueError) as erreur:
+        emettre("sauvegarde", " Emplacement {emplacement} illisible : {erreur!r}", emplacement=emplacement, erreur=erreur)
+        return None
+
+def journal(self, nom_fichier="sauvegarde.json"):
+    """Un JournalSauvegarde par fichier, gardé ouvert pour toute la partie."""
+    if nom_fichier not in self.journaux:
+        self.journaux[nom_fichier] = JournalSauvegarde(nom_fichier)
+    return self.journaux[nom_fichier]
+
+# Rattachement des méthodes de sérialisation aux classes
+Personnage.to_dict = to_dict
+Personnage.from_dict = from_dict
+Jeu.etat_sauvegarde = etat_sauvegarde
+Jeu.sauvegarder = sauvegarder
+Jeu.charger = charger
+Jeu.restaurer = restaurer
+Jeu.verifier_monde = verifier_monde
+Jeu.sauvegarder_emplacement = sauvegarder_emplacement
+Jeu.charger_emplacement = charger_emplacement
+Jeu.journal = journal
+
 # ==========================
 # JEU PRINCIPAL FINAL
 # ==========================
 
-def jeu_principal():
-    print(" L'Aventure du Donjon Perdu ")
+def demarrer_partie():
+    """Menu initial : nouvelle partie ou chargement ; renvoie (joueur, jeu)."""
+    emettre("menu", " L'Aventure du Donjon Perdu ")
     
     # Menu initial
-    print("\n1. Nouvelle partie ")
-    print("2. Charger sauvegarde ")
-    choix = input("Choix : ").strip()
+    emettre("menu", "\n1. Nouvelle partie ")
+    emettre("menu", "2. Charger sauvegarde ")
+    choix = saisir("Choix : ").strip()
     
     if choix == "2":
         jeu = Jeu()
         joueur = jeu.charger()
         if not joueur:
-            print("Nouvelle partie par défaut.")
-            nom = input("Nom : ")
+            emettre("menu", "Nouvelle partie par défaut.")
+            nom = saisir("Nom : ")
             joueur = Guerrier(nom)
     else:
         # Nouvelle partie
-        nom = input("Nom du héros : ")
-        print("\n1. Guerrier | 2. Mage | 3. Voleur")
-        classe_choix = input("Classe : ")
+        nom = saisir("Nom du héros : ")
+        emettre("menu", "\n1. Guerrier | 2. Mage | 3. Voleur")
+        classe_choix = saisir("Classe : ")
         classes = {"1": Guerrier(nom), "2": Mage(nom), "3": Voleur(nom)}
         joueur = classes.get(classe_choix, Guerrier(nom))
-        jeu = Jeu()
+        diff = saisir("Difficulté (f/n/d) [n] : ").strip().lower() or 'n'
+        diff_map = {'f': 'facile', 'n': 'normal', 'd': 'difficile'}
+        jeu = Jeu(diff_map.get(diff, 'normal'))
+    return joueur, jeu
+
+def partie_en_cours(jeu, joueur):
+    return joueur.pv > 0 and not jeu.quete.est_terminee()
+
+def tour_principal(jeu, joueur):
+    """Un tour de la boucle principale : exploration puis menu.
+    Renvoie le joueur (éventuellement rechargé) ou None pour quitter."""
+    jeu.explorer(joueur)
+    if not partie_en_cours(jeu, joueur):
+        return joueur  # mort ou quête terminée : la boucle s'arrête d'elle-même
+    
+    afficher_menu_principal(jeu)
+    return appliquer_menu_principal(jeu, joueur, saisir("→ ").strip())
+
+def afficher_menu_principal(jeu=None):
+    emettre("menu", "\n" + "═" * 60)
+    emettre("menu", " MENU PRINCIPAL :")
+    if jeu is not None and jeu.monde is not None:
+        # Monde procédural : les sorties de la zone au lieu des trois zones fixes
+        ouvertes = jeu.monde.portes_ouvertes(jeu)
+        sorties = [f"{direction} ({jeu.zones[destination].nom}{'' if porte is None or porte in ouvertes else ', scellé'})"
+                   for direction, destination, porte in jeu.monde.sorties(jeu.position)]
+        emettre("menu", "Sorties : {sorties}", sorties="   ".join(sorties))
+    else:
+        emettre("menu", "1. Village   2. Forêt   3. Donjon ")
+    emettre("menu", "4. Status  5. Sauvegarder   6. Charger   0. Quitter ")
+
+def appliquer_menu_principal(jeu, joueur, choix):
+    """Choix du menu principal. Renvoie le joueur (éventuellement rechargé) ou None pour quitter.
+    En monde procédural, les choix 1-3 sont remplacés par les directions (nord, sud, est, ouest)."""
+    if jeu.monde is not None and choix in jeu.monde.DIRECTIONS:
+        jeu.monde.sortir(jeu, choix)
+    elif jeu.monde is not None and choix in ("1", "2", "3"):
+        emettre("menu", " Pas de zones fixes dans ce monde : choisis une sortie (nord, sud, est, ouest).")
+    elif choix == "1": jeu.deplacer("village")
+    elif choix == "2":
+        jeu.deplacer("foret")
+        jeu.nb_explorations_foret += 1
+    elif choix == "3": jeu.deplacer("donjon")
+    elif choix == "4":
+        emettre("menu", "{joueur_nom} | PV: {joueur_pv}/100", joueur_nom=joueur.nom, joueur_pv=joueur.pv)
+        emettre("menu", " ATK: {joueur_attaque} |  DEF: {joueur_defense}", joueur_attaque=joueur.attaque, joueur_defense=joueur.defense)
+        emettre("menu", " {nb_objets}/{capacite} objets", nb_objets=len(joueur.inventory), capacite=joueur.inventory.capacity)
+    elif choix == "5":
+        jeu.sauvegarder(joueur)
+    elif choix == "6":
+        joueur_temp = jeu.charger()
+        if joueur_temp: joueur = joueur_temp
+    elif choix == "0": return None
+    return joueur
+
+def jeu_principal(fichier_rejeu="derniere_partie.rejeu"):
+    """Partie interactive ; les saisies sont enregistrées dans fichier_rejeu (None : pas d'enregistrement)."""
+    enregistrement = Enregistrement(fichier_rejeu) if fichier_rejeu else None
+    joueur, jeu = demarrer_partie()
+    if enregistrement:
+        enregistrement.point_de_reprise(0, jeu, joueur)
     
     # Boucle principale
-    while joueur.pv > 0 and not jeu.quete.est_terminee():
-        if not jeu.explorer(joueur):
+    tour = 0
+    while partie_en_cours(jeu, joueur):
+        precedent = joueur
+        joueur = tour_principal(jeu, joueur)
+        if joueur is None:
             break
-        
-        print("\n" + "═" * 60)
-        print(" MENU PRINCIPAL :")
-        print("1. Village   2. Forêt   3. Donjon ")
-        print("4. Status  5. Sauvegarder   6. Charger   0. Quitter ")
-        choix = input("→ ").strip()
-        
-        if choix == "1": jeu.deplacer("village")
-        elif choix == "2":
-            jeu.deplacer("foret")
-            jeu.nb_explorations_foret += 1
-        elif choix == "3": jeu.deplacer("donjon")
-        elif choix == "4":
-            print(f"{joueur.nom} | PV: {joueur.pv}/{100}")
-            print(f" ATK: {joueur.attaque} |  DEF: {joueur.defense}")
-            print(f" {len(joueur.inventory.items)}/{joueur.inventory.capacity} objets")
-        elif choix == "5":
-            jeu.sauvegarder(joueur)
-        elif choix == "6":
-            joueur_temp = jeu.charger()
-            if joueur_temp: joueur = joueur_temp
-        elif choix == "0": break
+        tour += 1
+        if enregistrement:
+            # Un chargement remplace le joueur : l'état vient du disque, on le fige
+            enregistrement.point_de_reprise(tour, jeu, joueur, resynchro=joueur is not precedent)
     
+    if enregistrement:
+        enregistrement.fermer()
     if jeu.quete.est_terminee():
-        print("\n LÉGENDE ACCOMPLIE ! Le village est sauvé ! ")
-
-# Lancer le jeu
-if __name__ == "__main__":
-    jeu_principal()
\ No newline at end of file
+        emettre("menu", "\n LÉGENDE ACCOMPLIE ! Le village est sauvé ! ")
@@ -0,0 +1,136 @@
+"""
+Bus de messages du jeu.
+
+Le code de jeu n'appelle plus print() : il émet des messages structurés
+(type, gabarit, données) et les sorties branchées sur le bus décident quoi en
+faire. Le gabarit n'est formaté que par les sorties qui affichent ou écrivent :
+sans sortie active, emettre() retourne immédiatement.
+
+    SortieTerminal  tamponne et affiche au prochain vider() (une fois par tour)
+    SortieNulle     ignore tout (simulations sans interface)
+    SortieFichier   écrit "type<TAB>texte" dans un fichier
+    SortieMemoire   garde les (type, texte) en liste jusqu'à relever()
+"""
+import atexit
+import contextlib
+
+
+class Sortie:
+    muette = False
+
+    def recevoir(self, type_, gabarit, donnees):
+        raise NotImplementedError
+
+    def vider(self):
+        pass
+
+    def fermer(self):
+        self.vider()
+
+
+class SortieNulle(Sortie):
+    """Ne reçoit jamais rien : le bus l'ignore dès le branchement."""
+    muette = True
+
+    def recevoir(self, type_, gabarit, donnees):
+        pass
+
+
+class SortieTerminal(Sortie):
+    def __init__(self):
+        self.tampon = []
+
+    def recevoir(self, type_, gabarit, donnees):
+        self.tampon.append(gabarit.format(**donnees) if donnees else gabarit)
+
+    def vider(self):
+        if self.tampon:
+            print("\n".join(self.tampon), flush=True)
+            self.tampon.clear()
+
+
+class SortieFichier(Sortie):
+    def __init__(self, chemin, types=None):
+        self.fichier = open(chemin, "a", encoding="utf-8")
+        self.types = set(types) if types else None  # None = tous les types
+
+    def recevoir(self, type_, gabarit, donnees):
+        if self.types is None or type_ in self.types:
+            texte = gabarit.format(**donnees) if donnees else gabarit
+            self.fichier.write(f"{type_}\t{texte}\n")
+
+    def vider(self):
+        self.fichier.flush()
+
+    def fermer(self):
+        self.fichier.close()
+
+
+class SortieMemoire(Sortie):
+    def __init__(self, types=None):
+        self.messages = []
+        self.types = set(types) if types else None
+
+    def recevoir(self, type_, gabarit, donnees):
+        if self.types is None or type_ in self.types:
+            self.messages.append((type_, gabarit.format(**donnees) if donnees else gabarit))
+
+    def relever(self):
+        """Renvoie les messages reçus depuis le dernier relevé."""
+        messages, self.messages = self.messages, []
+        return messages
+
+
+class BusMessages:
+    def __init__(self, *sorties):
+        self.entree = input  # source des saisies (remplacée par l'enregistrement / le rejeu)
+        self.sorties = []
+        self._actives = []  # sorties non muettes, parcourues par emettre()
+        for sortie in sorties:
+            self.brancher(sortie)
+
+    def brancher(self, sortie):
+        self.sorties.append(sortie)
+        self._actualiser()
+
+    def debrancher(self, sortie):
+        sortie.vider()
+        self.sorties.remove(sortie)
+        self._actualiser()
+
+    def _actualiser(self):
+        self._actives = [sortie for sortie in self.sorties if not sortie.muette]
+
+    def emettre(self, type_, gabarit, **donnees):
+        for sortie in self._actives:
+            sortie.recevoir(type_, gabarit, donnees)
+
+    def vider(self):
+        for sortie in self._actives:
+            sortie.vider()
+
+    @contextlib.contextmanager
+    def rediriger(self, *sorties):
+        """Remplace temporairement les sorties (ex. rediriger(SortieNulle()) en simulation)."""
+        self.vider()
+        anciennes = self.sorties
+        self.sorties = list(sorties)
+        self._actualiser()
+        try:
+            yield self
+        finally:
+            self.vider()
+            self.sorties = anciennes
+            self._actualiser()
+
+
+# Bus global utilisé par main.py
+bus = BusMessages(SortieTerminal())
+emettre = bus.emettre
+atexit.register(bus.vider)
+
+
+def saisir(invite=""):
+    """input() qui affiche d'abord les messages en attente."""
+    bus.vider()
+    return bus.entree(invite)
@@ -0,0 +1,348 @@
+"""
+Monde procédural : grille de zones reliées en graphe, générées à la demande.
+
+Tout dérive de la graine par hachage entier (pas d'état à conserver) :
+    biome       par région de TAILLE_REGION x TAILLE_REGION zones (jamais à
+                accès dans la région de départ : le village a une sortie libre)
+    arêtes      labyrinthe « arbre binaire » (chaque zone s'ouvre vers
+                l'ouest ou le nord, donc tout est relié) plus des passages
+                supplémentaires avec la probabilité CHANCE_PASSAGE
+    portes      une arête qui entre dans un biome à accès (ex. ruines) porte
+                sa condition `acces`, vérifiée par GARDES contre le Jeu
+    contenu     la Zone elle-même (événements, ennemis, butin), tirée d'un
+                random.Random propre à ses coordonnées
+
+Une Zone n'est construite qu'au premier accès (monde[identifiant]) et gardée
+dans un cache LRU ; évincée, elle sera reconstruite à l'identique. Les
+voisins, portes et coûts se calculent sans construire de Zone : l'A* de
+chemin() traverse le monde sans le charger.
+
+Monde est un Mapping identifiant ("x,y") -> Zone : Jeu(monde=...) l'utilise
+à la place de ses trois zones. Le menu principal y propose les sorties de la
+zone (nord, sud, est, ouest : sortir()), et les sauvegardes gardent
+parametres() pour recréer le même monde au chargement.
+
+    python monde.py             # mémoire vs zones visitées, régénération, A*
+"""
+import heapq
+import random
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import main
+from aleatoire import deriver_graine
+
+TAILLE_REGION = 12
+CHANCE_PASSAGE = 0.35
+CAPACITE_CACHE = 1024
+
+# Biomes : gabarit des zones, coût d'entrée (A*) et condition d'accès
+BIOMES = {
+    "village": {"nom": "Village", "description": " Village sûr - Prépare-toi pour l'aventure !",
+                "evenements": [("dialogue", 0.5), ("marchand", 0.3), ("repos", 0.2)],
+                "ennemis": [], "cout": 1, "acces": None},
+    "plaine": {"nom": "Plaine", "description": " Plaine dégagée - Quelques voyageurs...",
+               "evenements": [("dialogue", 0.3), ("marchand", 0.1), ("repos", 0.2), ("coffre", 0.2), ("combat", 0.2)],
+               "ennemis": [main.LoupSauvage, main.Bandit], "cout": 1, "acces": None},
+    "foret": {"nom": "Forêt", "description": " Forêt dangereuse - Cherche la Clé du Donjon ici !",
+              "evenements": [("combat", 0.4), ("coffre", 0.3), ("dialogue", 0.2), ("cle", 0.1)],
+              "ennemis": [main.LoupSauvage, main.Bandit, main.Squelette], "cout": 2, "acces": None},
+    "marais": {"nom": "Marais", "description": " Marais brumeux - Chaque pas coûte...",
+               "evenements": [("combat", 0.5), ("coffre", 0.2), ("dialogue", 0.3)],
+               "ennemis": [main.Squelette], "cout": 3, "acces": None},
+    "ruines": {"nom": "Ruines", "description": " Ruines scellées - Le Gardien rôde...",
+               "evenements": [("combat", 0.5), ("coffre", 0.4), ("boss", 0.1)],
+               "ennemis": [main.ChampionCorrompu], "cout": 2, "acces": "quete"},
+}
+# Tirage du biome d'une région (le village n'est qu'à l'origine)
+POIDS_BIOMES = (("plaine", 0.35), ("foret", 0.35), ("marais", 0.2), ("ruines", 0.1))
+# Région de départ : sans biome à accès, sinon toutes les sorties du village peuvent être scellées
+POIDS_DEPART = tuple((biome, poids) for biome, poids in POIDS_BIOMES if BIOMES[biome]["acces"] is None)
+
+# Condition d'accès -> test sur le Jeu
+GARDES = {"quete": lambda jeu: jeu.quete.peut_entrer_donjon()}
+
+# Sorties d'une zone, dans l'ordre de Monde.voisins
+DIRECTIONS = {"ouest": (-1, 0), "est": (1, 0), "nord": (0, -1), "sud": (0, 1)}
+_DIRECTION_PAR_PAS = {pas: direction for direction, pas in DIRECTIONS.items()}
+
+
+_MASQUE = 0xFFFFFFFFFFFFFFFF
+_MULTIPLICATEURS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                    0xFF51AFD7ED558CCD)
+
+
+def _hachage(graine, *entiers):
+    """Flottant de [0, 1) stable pour (graine, entiers...) : combinaison puis finaliseur splitmix64."""
+    valeur = graine
+    for entier, multiplicateur in zip(entiers, _MULTIPLICATEURS):
+        valeur ^= (entier + 1) * multiplicateur
+    valeur &= _MASQUE
+    valeur = (valeur ^ (valeur >> 30)) * 0xBF58476D1CE4E5B9 & _MASQUE
+    valeur = (valeur ^ (valeur >> 27)) * 0x94D049BB133111EB & _MASQUE
+    return (valeur ^ (valeur >> 31)) / 2 ** 64
+
+
+def identifiant(x, y):
+    return f"{x},{y}"
+
+
+def coordonnees(identifiant_):
+    x, _, y = identifiant_.partition(",")
+    return int(x), int(y)
+
+
+class Monde(Mapping):
+    DIRECTIONS = DIRECTIONS
+
+    def __init__(self, graine=0, largeur=200, hauteur=200, capacite=CAPACITE_CACHE):
+        """capacite : zones gardées en mémoire (None : aucune éviction)."""
+        self.graine = deriver_graine(graine, "monde") if not isinstance(graine, int) else graine
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.capacite = capacite
+        self.depart = identifiant(0, 0)
+        self._cache = OrderedDict()
+        self._biomes = {}  # région -> biome (quelques centaines d'entrées)
+        self.generations = self.evictions = 0
+
+    def parametres(self):
+        """Ce qui recrée le même monde : Monde(**monde.parametres()) (JSON, gardé par les sauvegardes)."""
+        return {"graine": self.graine, "largeur": self.largeur, "hauteur": self.hauteur}
+
+    def __getstate__(self):
+        # Le cache se reconstruit à l'identique : inutile de le copier
+        etat = self.__dict__.copy()
+        etat["_cache"] = OrderedDict()
+        return etat
+
+    # =========================
+    # Mapping identifiant -> Zone
+    # =========================
+
+    def __getitem__(self, identifiant_):
+        zone = self._cache.get(identifiant_)
+        if zone is not None:
+            self._cache.move_to_end(identifiant_)
+            return zone
+        x, y = self._valider(identifiant_)
+        zone = self._generer(x, y)
+        self._cache[identifiant_] = zone
+        self.generations += 1
+        if self.capacite is not None and len(self._cache) > self.capacite:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return zone
+
+    def __contains__(self, identifiant_):
+        try:
+            self._valider(identifiant_)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (identifiant(x, y) for y in range(self.hauteur) for x in range(self.largeur))
+
+    def __len__(self):
+        return self.largeur * self.hauteur
+
+    def en_memoire(self):
+        return len(self._cache)
+
+    def _valider(self, identifiant_):
+        try:
+            x, y = coordonnees(identifiant_)
+        except (AttributeError, ValueError):
+            raise KeyError(identifiant_) from None
+        if not (0 <= x < self.largeur and 0 <= y < self.hauteur):
+            raise KeyError(identifiant_)
+        return x, y
+
+    # =========================
+    # Structure (sans construire de Zone)
+    # =========================
+
+    def biome(self, x, y):
+        if x == 0 and y == 0:
+            return "village"
+        region = (x // TAILLE_REGION, y // TAILLE_REGION)
+        biome = self._biomes.get(region)
+        if biome is None:
+            tirage, cumul, poids_biomes = _hachage(self.graine, 1, *region), 0.0, POIDS_BIOMES
+            if region == (0, 0):
+                poids_biomes = POIDS_DEPART
+                tirage *= sum(poids for _, poids in POIDS_DEPART)
+            for biome, poids in poids_biomes:
+                cumul += poids
+                if tirage < cumul:
+                    break
+            self._biomes[region] = biome
+        return biome
+
+    def _ouvre_vers_ouest(self, x, y):
+        """Choix du labyrinthe en arbre binaire : la zone s'ouvre à l'ouest (sinon au nord)."""
+        if x == 0:
+            return False
+        if y == 0:
+            return True
+        return _hachage(self.graine, 2, x, y) < 0.5
+
+    def _arete(self, x, y, x2, y2):
+        """Arête ouverte entre deux zones adjacentes ?"""
+        if (x2, y2) < (x, y):
+            x, y, x2, y2 = x2, y2, x, y
+        vers_ouest = x2 == x + 1  # (x2, y2) est à l'est de (x, y)
+        if self._ouvre_vers_ouest(x2, y2) == vers_ouest:
+            return True
+        return _hachage(self.graine, 3, x, y, x2, y2) < CHANCE_PASSAGE
+
+    def porte(self, x, y, x2, y2):
+        """Condition d'accès pour aller de (x, y) à (x2, y2) (None : libre)."""
+        arrivee = self.biome(x2, y2)
+        acces = BIOMES[arrivee]["acces"]
+        return acces if acces and self.biome(x, y) != arrivee else None
+
+    def voisins(self, x, y):
+        """[(x2, y2, porte)] des zones reliées à (x, y)."""
+        resultat = []
+        for x2, y2 in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= x2 < self.largeur and 0 <= y2 < self.hauteur and self._arete(x, y, x2, y2):
+                resultat.append((x2, y2, self.porte(x, y, x2, y2)))
+        return resultat
+
+    def _generer(self, x, y):
+        biome = BIOMES[self.biome(x, y)]
+        rng = random.Random(deriver_graine(self.graine, "zone", x, y))
+        evenements = [(evenement, round(poids * (0.75 + rng.random() / 2), 3)) for evenement, poids in biome["evenements"]]
+        return main.Zone(
+            nom=biome["nom"],
+            description=f"{biome['description']} ({x},{y})",
+            evenements=evenements,
+            ennemis_possibles=biome["ennemis"],
+            acces=biome["acces"],
+            butin=main.BUTIN_COFFRE if biome["ennemis"] else (),
+        )
+
+    # =========================
+    # Déplacements
+    # =========================
+
+    @staticmethod
+    def portes_ouvertes(jeu):
+        return {acces for acces, garde in GARDES.items() if garde(jeu)}
+
+    def chemin(self, depart, arrivee, ouvertes=()):
+        """
+        A* de depart à arrivee (identifiants) en ne franchissant que les portes
+        de ouvertes ; coût d'un pas = coût du biome d'arrivée. Renvoie la liste
+        des identifiants (départ et arrivée compris), ou None si inaccessible.
+        """
+        debut, fin = self._valider(depart), self._valider(arrivee)
+        ouvertes = set(ouvertes)
+        fx, fy = fin
+        couts = {debut: 0}
+        precedents = {debut: None}
+        frontiere = [(abs(debut[0] - fx) + abs(debut[1] - fy), 0, debut)]  # heuristique : 1 par pas au mieux
+        fermes = set()
+        while frontiere:
+            _, cout, noeud = heapq.heappop(frontiere)
+            if noeud == fin:
+                pas = []
+                while noeud is not None:
+                    pas.append(identifiant(*noeud))
+                    noeud = precedents[noeud]
+                return pas[::-1]
+            if noeud in fermes:
+                continue
+            fermes.add(noeud)
+            for x2, y2, porte in self.voisins(*noeud):
+                if porte is not None and porte not in ouvertes:
+                    continue
+                suivant = (x2, y2)
+                nouveau = cout + BIOMES[self.biome(x2, y2)]["cout"]
+                if nouveau < couts.get(suivant, float("inf")):
+                    couts[suivant] = nouveau
+                    precedents[suivant] = noeud
+                    heapq.heappush(frontiere, (nouveau + abs(x2 - fx) + abs(y2 - fy), nouveau, suivant))
+        return None
+
+    def avancer(self, jeu, destination):
+        """Un pas de jeu.position vers une zone voisine ; False si pas d'arête ou porte fermée."""
+        x, y = coordonnees(jeu.position)
+        x2, y2 = self._valider(destination)
+        for voisin_x, voisin_y, porte in self.voisins(x, y):
+            if (voisin_x, voisin_y) == (x2, y2):
+                if porte is not None and porte not in self.portes_ouvertes(jeu):
+                    main.emettre("exploration", " Passage scellé vers {zone} !", zone=destination)
+                    return False
+                jeu.deplacer(destination)
+                return True
+        main.emettre("exploration", " Aucun passage direct vers {zone}.", zone=destination)
+        return False
+
+    def sorties(self, position):
+        """[(direction, identifiant, porte)] des arêtes qui partent de position."""
+        x, y = self._valider(position)
+        return [(_DIRECTION_PAR_PAS[x2 - x, y2 - y], identifiant(x2, y2), porte)
+                for x2, y2, porte in self.voisins(x, y)]
+
+    def sorties_ouvertes(self, jeu):
+        """Directions que jeu peut prendre depuis sa position (portes comprises)."""
+        ouvertes = self.portes_ouvertes(jeu)
+        return [direction for direction, _, porte in self.sorties(jeu.position) if porte is None or porte in ouvertes]
+
+    def sortir(self, jeu, direction):
+        """avancer() par la sortie `direction` de la zone du jeu."""
+        for nom, destination, _ in self.sorties(jeu.position):
+            if nom == direction:
+                return self.avancer(jeu, destination)
+        main.emettre("exploration", " Pas de sortie « {direction} » ici.", direction=direction)
+        return False
+
+
+def _benchmark():
+    import time
+    import tracemalloc
+
+    largeur = hauteur = 200
+    visites = (1_000, 5_000, 20_000)
+    print(f"Monde {largeur}x{hauteur} ({largeur * hauteur} zones) ; mémoire des zones après k visites")
+    for capacite in (None, CAPACITE_CACHE):
+        monde = Monde(7, largeur, hauteur, capacite)
+        rng = random.Random(1)
+        ordre = rng.sample(range(largeur * hauteur), max(visites))
+        tracemalloc.start()
+        debut = time.perf_counter()
+        mesures = []
+        for k, numero in enumerate(ordre, 1):
+            monde[identifiant(numero % largeur, numero // largeur)]
+            if k in visites:
+                mesures.append(f"{k}: {tracemalloc.get_traced_memory()[0] / 2 ** 20:6.1f} Mo")
+        duree = time.perf_counter() - debut
+        tracemalloc.stop()
+        print(f"  cache {str(capacite or 'illimité'):<9} | " + " | ".join(mesures)
+              + f" | {monde.en_memoire()} en mémoire, {duree / len(ordre) * 1e6:.0f} µs/visite")
+
+    # Une zone évincée revient à l'identique
+    def signature(zone):
+        return (zone.nom, zone.description, zone.evenements, [e.__name__ for e in zone.ennemis_possibles], zone.acces)
+
+    monde = Monde(7, largeur, hauteur, capacite=8)
+    avant = signature(monde["57,113"])
+    for x in range(100):
+        monde[identifiant(x, 0)]
+    print(f"Régénération après éviction identique : {signature(monde['57,113']) == avant} "
+          f"({monde.evictions} évictions)")
+
+    for ouvertes in ((), ("quete",)):
+        debut = time.perf_counter()
+        pas = monde.chemin("0,0", f"{largeur - 1},{hauteur - 1}", ouvertes)
+        duree = time.perf_counter() - debut
+        print(f"A* 0,0 -> {largeur - 1},{hauteur - 1} portes {list(ouvertes)} : "
+              f"{len(pas) - 1 if pas else 'aucun'} pas en {duree * 1000:.0f} ms, "
+              f"{monde.generations} zones construites au total")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,156 @@
+"""
+Objets partagés (poids-mouche) et tables de butin compilées.
+
+Un prototype est un objet immuable (Item de main.py) enregistré sous un
+identifiant dans `catalogue` : tous les inventaires qui le contiennent
+partagent la même instance, les sauvegardes n'en écrivent que l'identifiant
+({"id": ...}) et le pickle le retrouve par son identifiant au lieu de le
+copier. Un objet hors catalogue se sérialise comme avant (to_dict complet).
+
+Une table de butin est compilée une fois (par zone) en TableAlias de Lot :
+tirer un lot ne construit rien, il désigne un prototype ou une somme d'or.
+
+    python objets.py            # allocations par coffre : ancien butin vs table compilée
+"""
+from zone import TableAlias
+
+
+class CatalogueObjets:
+    """identifiant <-> prototype ; les prototypes ne doivent jamais être modifiés."""
+
+    def __init__(self):
+        self._par_id = {}
+        self._id_par_objet = {}  # id(prototype) -> identifiant
+        self._par_cle = {}  # contenu (to_dict) -> prototype, pour dédoublonner les anciennes sauvegardes
+        self.descriptions = {}  # identifiant -> texte affiché quand l'objet est trouvé
+
+    def enregistrer(self, identifiant, objet, description=None):
+        if identifiant in self._par_id:
+            raise ValueError(f"Prototype déjà enregistré : {identifiant!r}")
+        self._par_id[identifiant] = objet
+        self._id_par_objet[id(objet)] = identifiant
+        self._par_cle[self._cle(objet)] = objet
+        self.descriptions[identifiant] = description or f" {objet.name}"
+        return objet
+
+    def __getitem__(self, identifiant):
+        return self._par_id[identifiant]
+
+    def __contains__(self, identifiant):
+        return identifiant in self._par_id
+
+    def __len__(self):
+        return len(self._par_id)
+
+    @staticmethod
+    def _cle(objet):
+        return tuple(sorted(objet.to_dict().items()))
+
+    def identifiant(self, objet):
+        """Identifiant si objet est un prototype du catalogue (par identité), sinon None."""
+        return self._id_par_objet.get(id(objet))
+
+    def dedoublonner(self, objet):
+        """Le prototype de même contenu s'il existe, sinon objet lui-même."""
+        return self._par_cle.get(self._cle(objet), objet)
+
+    def donnees(self, objet):
+        """Forme sauvegardée : {"id": ...} pour un prototype, to_dict() sinon."""
+        identifiant = self._id_par_objet.get(id(objet))
+        return {"id": identifiant} if identifiant is not None else objet.to_dict()
+
+
+catalogue = CatalogueObjets()
+
+
+def prototype(identifiant):
+    """Prototype du catalogue global (utilisé par le pickle des objets partagés)."""
+    return catalogue[identifiant]
+
+
+# =========================
+# Butin
+# =========================
+
+class Lot:
+    """Résultat d'un tirage de butin : un prototype (objet) ou de l'or."""
+    __slots__ = ("objet", "or_", "message")
+
+    def __init__(self, objet=None, or_=0, message=""):
+        self.objet = objet
+        self.or_ = or_
+        self.message = message
+
+    def __repr__(self):
+        return f"Lot({self.objet.name!r})" if self.objet else f"Lot({self.or_} or)"
+
+
+def compiler_butin(entrees, catalogue=catalogue):
+    """
+    entrees : [(identifiant de prototype ou montant d'or (int), poids)].
+    Renvoie une TableAlias de Lot, tirée avec .tirer(rng) (None si vide).
+    """
+    lots = []
+    for valeur, poids in entrees:
+        if isinstance(valeur, int):
+            lots.append((Lot(or_=valeur), poids))
+        else:
+            lots.append((Lot(catalogue[valeur], message=catalogue.descriptions[valeur]), poids))
+    return TableAlias(lots)
+
+
+def _benchmark(nb=200_000):
+    import json
+    import random
+    import time
+
+    from main import Armor, Consumable, Guerrier, Item, Jeu, Weapon, DAGUE_AFFUTEE, POTION_SOIN
+    from messages import bus, SortieNulle
+
+    rng = random.Random(1)
+    table = Jeu().zones["foret"].tirage_butin
+
+    def ancien():
+        # ancien evenement_coffre : les quatre lots construits à chaque coffre
+        loots = [
+            (Consumable("Potion de soin", "soin"), " Potion de soin"),
+            (Weapon("Dague affûtée", 8), " Dague affûtée (+8 ATK)"),
+            (Armor("Manteau renforcé", 5), " Manteau renforcé (+5 DEF)"),
+            ("or", 25)
+        ]
+        return loots[int(rng.random() * 4)]
+
+    def compile_():
+        return table.tirer(rng)
+
+    constructions = 0
+    init = Item.__init__
+
+    def compter(self, name):
+        nonlocal constructions
+        constructions += 1
+        init(self, name)
+
+    Item.__init__ = compter
+    try:
+        for libelle, tirage in (("ancien butin", ancien), ("table compilée", compile_)):
+            constructions = 0
+            debut = time.perf_counter()
+            for _ in range(nb):
+                tirage()
+            duree = time.perf_counter() - debut
+            print(f"{libelle:<16} {duree / nb * 1e9:6.0f} ns/coffre | {constructions / nb:.1f} objets construits/coffre")
+    finally:
+        Item.__init__ = init
+
+    with bus.rediriger(SortieNulle()):
+        joueur = Guerrier("Bot")
+        joueur.inventory.add_item(POTION_SOIN, 4)
+        joueur.inventory.add_item(DAGUE_AFFUTEE)
+    complet = [dict(objet.to_dict(), quantite=quantite) for objet, quantite in joueur.inventory.piles()]
+    print(f"inventaire sauvegardé : {len(json.dumps(complet))} octets en objets complets, "
+          f"{len(json.dumps(joueur.inventory.to_dict()))} en identifiants")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,261 @@
+"""
+Progression de la quête principale comme chaîne de Markov.
+
+Un état est (étape de quête, zone) au début d'une exploration, plus deux
+états absorbants : MORT et TERMINEE. Une transition est un tour de boucle
+principale : exploration de la zone (Zone.evenements, mêmes effets que
+Jeu.explorer) puis déplacement choisi par une politique de navigation. Les
+chances de clé viennent de Jeu (CHANCE_CLE_BUTIN, CHANCE_CLE_COFFRE), les
+étapes et l'accès au donjon de QuetePrincipale : changer un poids dans
+main.py change le modèle sans autre retouche.
+
+Les combats se résument à une probabilité de victoire par classe d'ennemi
+(par défaut : jamais de défaite ; victoire_solveur donne l'issue exacte à PV
+pleins via solveur.py). Les PV, l'or et l'inventaire ne font pas partie de
+l'état, pas plus que la fuite : l'usure des PV d'un combat à l'autre n'est
+pas modélisée, et les chances d'atteindre le Gardien puis de le vaincre
+sont donc optimistes dès que les combats peuvent être perdus.
+
+Calcul : matrices creuses {i: {j: p}} en pur Python, Gauss-Seidel pour les
+probabilités d'atteinte et les espérances, produits matrice-vecteur pour la
+distribution complète du nombre d'explorations.
+
+    python progression.py       # modèle vs parties jouées par GameFacade
+"""
+import main
+
+MORT = "mort"
+TERMINEE = "terminee"
+TOLERANCE = 1e-12
+ITERATIONS_MAX = 100_000
+
+
+# =========================
+# Politiques de navigation
+# =========================
+# (étape, zone) -> zone suivante, ou {zone: probabilité}
+
+def navigation_objectif(etape, zone):
+    """Forêt jusqu'à la clé, puis donjon (comme strategy.partie_gourmande)."""
+    return "donjon" if etape >= 1 else "foret"
+
+
+def victoire_solveur(classe_joueur):
+    """Probabilité de victoire à PV pleins, exacte (politique : attaque à chaque tour)."""
+    import solveur
+
+    def victoire(classe_ennemi):
+        return solveur.resoudre(classe_joueur("Modèle"), classe_ennemi()).victoire
+    return victoire
+
+
+# =========================
+# Effets des événements
+# =========================
+# Chaque effet renvoie [(probabilité, issue)] avec issue : "progresse", MORT ou None.
+
+def _effet_combat(jeu, zone, etape, victoire):
+    issues = []
+    chance_cle = jeu.CHANCE_CLE_BUTIN if etape == 0 else 0.0
+    for classe in zone.ennemis_possibles:  # tirage équiprobable (Zone.tirage_ennemis)
+        p, gagne = 1 / len(zone.ennemis_possibles), victoire(classe)
+        issues += [(p * gagne * chance_cle, "progresse"), (p * gagne * (1 - chance_cle), None),
+                   (p * (1 - gagne), MORT)]
+    return issues
+
+
+def _effet_coffre(jeu, zone, etape, victoire):
+    # Jeu.evenement_coffre ne cache la clé que dans la Forêt
+    if etape == 0 and zone.nom == "Forêt":
+        return [(jeu.CHANCE_CLE_COFFRE, "progresse"), (1 - jeu.CHANCE_CLE_COFFRE, None)]
+    return [(1.0, None)]
+
+
+def _effet_cle(jeu, zone, etape, victoire):
+    # Jeu.evenement_cle donne la clé : seul l'objectif de l'étape 0 l'attend
+    return [(1.0, "progresse" if etape == 0 else None)]
+
+
+def _effet_boss(jeu, zone, etape, victoire):
+    gagne = victoire(main.GardienDonjon)
+    return [(gagne, "progresse"), (1 - gagne, MORT)]
+
+
+EFFETS = {"combat": _effet_combat, "coffre": _effet_coffre, "cle": _effet_cle, "boss": _effet_boss}
+
+
+# =========================
+# Chaîne
+# =========================
+
+class ChaineQuete:
+    def __init__(self, jeu=None, navigation=navigation_objectif, victoire=None, depart=None):
+        """depart : (étape, zone) de la première exploration (défaut : celui d'une nouvelle partie)."""
+        jeu = jeu or main.Jeu()
+        victoire = victoire or (lambda classe_ennemi: 1.0)
+        quete = main.QuetePrincipale()
+        self.nb_etapes = len(quete.description)
+        self.depart = depart or (quete.etat, jeu.position)
+
+        # États transitoires (étape, zone), puis les absorbants
+        acces = {}
+        self.etats = []
+        for etape in range(self.nb_etapes):
+            quete.etat = etape
+            if quete.est_terminee():
+                continue
+            acces[etape] = quete.peut_entrer_donjon()
+            self.etats += [(etape, nom) for nom in jeu.zones]
+        self.etats += [MORT, TERMINEE]
+        self.index = {etat: i for i, etat in enumerate(self.etats)}
+
+        self.transitions = {}  # i -> {j: p}
+        for i, (etape, nom) in enumerate(self.etats[:-2]):
+            zone = jeu.zones[nom]
+            if zone.acces == "quete" and not acces[etape]:
+                issues = [(1.0, None)]  # donjon scellé : aucune exploration
+            else:
+                issues = []
+                total = sum(poids for _, poids in zone.evenements)
+                for evenement, poids in zone.evenements:
+                    effet = EFFETS.get(evenement)
+                    for p, issue in effet(jeu, zone, etape, victoire) if effet else [(1.0, None)]:
+                        issues.append((poids / total * p, issue))
+
+            ligne = {}
+            for p, issue in issues:
+                if p <= 0:
+                    continue
+                if issue == MORT:
+                    suivants = {MORT: 1.0}
+                else:
+                    suivante = etape + 1 if issue == "progresse" else etape
+                    if suivante >= self.nb_etapes - 1:
+                        suivants = {TERMINEE: 1.0}
+                    else:
+                        choix = navigation(suivante, nom)
+                        choix = {choix: 1.0} if isinstance(choix, str) else choix
+                        suivants = {(suivante, zone_suivante): q for zone_suivante, q in choix.items()}
+                for etat, q in suivants.items():
+                    j = self.index[etat]
+                    ligne[j] = ligne.get(j, 0.0) + p * q
+            self.transitions[i] = ligne
+
+    def _cibles(self, etape):
+        """Indices des états où l'étape est atteinte."""
+        return {i for i, etat in enumerate(self.etats)
+                if etat == TERMINEE or (etat != MORT and etat[0] >= etape)}
+
+    def _resoudre(self, etape):
+        """(h, g) sur tous les états : h = P(atteindre l'étape), g = E[explorations * 1{atteinte}]."""
+        cibles = self._cibles(etape)
+        transitoires = [i for i in self.transitions if i not in cibles]
+        h = [1.0 if i in cibles else 0.0 for i in range(len(self.etats))]
+        h = _gauss_seidel(self.transitions, transitoires, h, lambda i: 0.0)
+        g = [0.0] * len(self.etats)
+        g = _gauss_seidel(self.transitions, transitoires, g, lambda i: h[i])
+        return h, g
+
+    def probabilite_atteinte(self, etape):
+        return self._resoudre(etape)[0][self.index[self.depart]]
+
+    def explorations_moyennes(self, etape):
+        """Nombre moyen d'explorations pour atteindre l'étape, sur les parties qui l'atteignent."""
+        h, g = self._resoudre(etape)
+        i = self.index[self.depart]
+        if i in self._cibles(etape):
+            return 0.0
+        return g[i] / h[i] if h[i] else float("inf")
+
+    def distribution(self, etape, horizon):
+        """P(étape atteinte à la t-ième exploration) pour t = 1..horizon."""
+        cibles = self._cibles(etape)
+        vecteur = {self.index[self.depart]: 1.0}
+        probabilites = []
+        for _ in range(horizon):
+            suivant, atteinte = {}, 0.0
+            for i, p in vecteur.items():
+                for j, q in self.transitions.get(i, {}).items():
+                    if j in cibles:
+                        atteinte += p * q
+                    elif j in self.transitions:
+                        suivant[j] = suivant.get(j, 0.0) + p * q
+            probabilites.append(atteinte)
+            vecteur = suivant
+        return probabilites
+
+    def resume(self, horizon=200):
+        """Par étape : probabilité d'atteinte, explorations moyennes et quantiles."""
+        etapes = {}
+        depart = self.index[self.depart]
+        for etape in range(1, self.nb_etapes):
+            h, g = self._resoudre(etape)
+            probabilite, cumul, quantiles = h[depart], 0.0, {}
+            if probabilite:
+                for t, p in enumerate(self.distribution(etape, horizon), 1):
+                    cumul += p
+                    for q in (0.5, 0.9, 0.99):
+                        if q not in quantiles and cumul >= q * probabilite:
+                            quantiles[q] = t
+            etapes[etape] = {"probabilite": probabilite,
+                             "explorations_moyennes": g[depart] / probabilite if probabilite else float("inf"),
+                             "quantiles": quantiles}
+        return etapes
+
+
+def _gauss_seidel(transitions, inconnues, x, second_membre):
+    """x[i] = second_membre(i) + somme_j P[i][j] x[j] pour i dans inconnues (x modifié en place)."""
+    for _ in range(ITERATIONS_MAX):
+        ecart = 0.0
+        for i in inconnues:
+            boucle, somme = 0.0, second_membre(i)
+            for j, p in transitions[i].items():
+                if j == i:
+                    boucle = p
+                else:
+                    somme += p * x[j]
+            valeur = somme / (1 - boucle) if boucle < 1 else 0.0  # état piège : jamais atteinte
+            ecart = max(ecart, abs(valeur - x[i]))
+            x[i] = valeur
+        if ecart < TOLERANCE:
+            return x
+    raise ArithmeticError(f"Gauss-Seidel sans convergence après {ITERATIONS_MAX} itérations")
+
+
+if __name__ == "__main__":
+    import time
+
+    from facade import GameFacade
+
+    def jouer(graine, classe):
+        """Parties à la politique du modèle : attaque, ignore le marchand, navigation_objectif."""
+        partie = GameFacade(classe, "Bot", graine=graine)
+        atteinte = {}
+        while not partie.terminee and partie.tour < 1000:
+            if partie.decision == "combat":
+                action = "attaquer"
+            elif partie.decision == "marchand":
+                action = "partir"
+            else:
+                action = navigation_objectif(partie.jeu.quete.etat, partie.jeu.position)
+            partie.avancer(action)
+            for e in range(1, partie.jeu.quete.etat + 1):
+                atteinte.setdefault(e, partie.tour + 1)  # le tour n commence par la (n+1)e exploration
+        return atteinte
+
+    nb = 20_000
+    for classe in (main.Guerrier, main.Voleur):
+        debut = time.perf_counter()
+        chaine = ChaineQuete(victoire=victoire_solveur(classe))
+        resume = chaine.resume()
+        duree = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        parties = [jouer(graine, classe.__name__) for graine in range(nb)]
+        duree_simulation = time.perf_counter() - debut
+        print(f"{classe.__name__} : modèle {duree * 1000:.1f} ms, {nb} parties {duree_simulation:.1f} s")
+        for etape, valeurs in resume.items():
+            tours = [atteinte[etape] for atteinte in parties if etape in atteinte]
+            print(f"  étape {etape} : P {valeurs['probabilite']:.4f} (simulé {len(tours) / nb:.4f}) | "
+                  f"explorations {valeurs['explorations_moyennes']:.2f} "
+                  f"(simulé {sum(tours) / max(len(tours), 1):.2f}) | quantiles {valeurs['quantiles']}")
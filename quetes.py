@@ -0,0 +1,241 @@
+"""
+Quêtes en graphes d'objectifs, avec index des déclencheurs.
+
+Une Quete est un graphe sans cycle d'Objectif : un objectif devient actif
+quand tous ceux de `apres` sont atteints, et la quête est terminée quand
+tous ses objectifs le sont. Un objectif attend un fait de jeu, le couple
+(déclencheur, cible) : ("tuer", "Bandit"), ("collecter", "potion_soin"),
+("entrer", "donjon") ; cible None accepte n'importe quelle cible. Il est
+atteint au bout de `nombre` signalements.
+
+Les définitions sont immuables et partagées entre parties ; MoteurQuetes
+porte la progression d'une partie et un index (déclencheur, cible) ->
+objectifs actifs. signaler() ne touche donc que les objectifs qui écoutent
+ce fait, quel que soit le nombre de quêtes en cours.
+
+    python quetes.py        # coût d'un signalement : index vs parcours de toutes les quêtes
+"""
+from messages import emettre
+
+
+class Objectif:
+    __slots__ = ("identifiant", "declencheur", "cible", "nombre", "apres", "description")
+
+    def __init__(self, identifiant, declencheur, cible=None, nombre=1, apres=(), description=""):
+        self.identifiant = identifiant
+        self.declencheur = declencheur
+        self.cible = cible
+        self.nombre = nombre
+        self.apres = tuple(apres)  # objectifs à atteindre avant celui-ci
+        self.description = description or f" {declencheur} {cible or ''}".rstrip()
+
+    @property
+    def cle(self):
+        return self.declencheur, self.cible
+
+
+class Quete:
+    def __init__(self, identifiant, objectifs, titre="", fin=None, or_=0):
+        """objectifs : Objectif dans l'ordre de déclaration ; fin : message de fin ; or_ : récompense."""
+        self.identifiant = identifiant
+        self.titre = titre or identifiant
+        self.fin = fin or f" {self.titre} : quête terminée !"
+        self.or_ = or_
+        self.objectifs = {}
+        for objectif in objectifs:
+            if objectif.identifiant in self.objectifs:
+                raise ValueError(f"Objectif en double dans {identifiant!r} : {objectif.identifiant!r}")
+            self.objectifs[objectif.identifiant] = objectif
+
+        self.suivants = {nom: [] for nom in self.objectifs}
+        for objectif in self.objectifs.values():
+            for precedent in objectif.apres:
+                if precedent not in self.objectifs:
+                    raise ValueError(f"{identifiant!r} : {objectif.identifiant!r} suit un objectif inconnu "
+                                     f"{precedent!r}")
+                self.suivants[precedent].append(objectif.identifiant)
+
+        # Ordre topologique (Kahn), stable par rapport à la déclaration
+        restants = {nom: len(objectif.apres) for nom, objectif in self.objectifs.items()}
+        prets = [nom for nom, nb in restants.items() if not nb]
+        self.ordre = []
+        while prets:
+            nom = prets.pop(0)
+            self.ordre.append(nom)
+            for suivant in self.suivants[nom]:
+                restants[suivant] -= 1
+                if not restants[suivant]:
+                    prets.append(suivant)
+        if len(self.ordre) != len(self.objectifs):
+            raise ValueError(f"La quête {identifiant!r} contient un cycle d'objectifs")
+        self.ordre = tuple(self.ordre)
+
+    def __repr__(self):
+        return f"Quete({self.identifiant!r}, {len(self.objectifs)} objectifs)"
+
+
+class MoteurQuetes:
+    """Progression des quêtes d'une partie."""
+
+    def __init__(self, quetes=()):
+        self.quetes = {}  # identifiant -> Quete
+        self.atteints = {}  # identifiant de quête -> objectifs atteints
+        self.compteurs = {}  # identifiant de quête -> {objectif actif: signalements comptés}
+        self._index = {}  # (déclencheur, cible) -> {(quête, objectif): None}, objectifs actifs seulement
+        for quete in quetes:
+            self.ajouter(quete)
+
+    def ajouter(self, quete):
+        if quete.identifiant in self.quetes:
+            raise ValueError(f"Quête déjà suivie : {quete.identifiant!r}")
+        self.quetes[quete.identifiant] = quete
+        self.placer(quete.identifiant)
+        return quete
+
+    def est_terminee(self, identifiant):
+        return len(self.atteints[identifiant]) == len(self.quetes[identifiant].objectifs)
+
+    def actifs(self, identifiant):
+        """Objectifs en cours de la quête, dans l'ordre topologique."""
+        quete = self.quetes[identifiant]
+        return [quete.objectifs[nom] for nom in quete.ordre if self._actif(quete, nom)]
+
+    def nb_ecouteurs(self):
+        return sum(len(ecouteurs) for ecouteurs in self._index.values())
+
+    # =========================
+    # Progression
+    # =========================
+
+    def signaler(self, declencheur, cible=None, quantite=1):
+        """Un fait de jeu ; renvoie les quêtes qu'il termine (souvent aucune)."""
+        ecouteurs = self._index.get((declencheur, cible))
+        if cible is not None and (declencheur, None) in self._index:
+            ecouteurs = list(ecouteurs or ()) + list(self._index[declencheur, None])
+        if not ecouteurs:
+            return ()
+        terminees = []
+        for identifiant, nom in list(ecouteurs):
+            quete = self.quetes[identifiant]
+            compteurs = self.compteurs[identifiant]
+            compteurs[nom] = compteurs.get(nom, 0) + quantite
+            if compteurs[nom] >= quete.objectifs[nom].nombre and self.atteindre(identifiant, nom):
+                terminees.append(quete)
+        return terminees
+
+    def atteindre(self, identifiant, nom):
+        """Valide un objectif actif ; renvoie True s'il termine la quête."""
+        quete = self.quetes[identifiant]
+        atteints = self.atteints[identifiant]
+        if not self._actif(quete, nom):
+            return False
+        atteints.add(nom)
+        self.compteurs[identifiant].pop(nom, None)
+        self._desindexer(identifiant, quete.objectifs[nom])
+        nouveaux = [suivant for suivant in quete.suivants[nom] if self._actif(quete, suivant)]
+        for suivant in nouveaux:
+            self._indexer(identifiant, quete.objectifs[suivant])
+
+        if len(atteints) == len(quete.objectifs):
+            emettre("quete", " Progression : {etape}", etape=quete.fin)
+            return True
+        if nouveaux:
+            emettre("quete", " Progression : {etape}", etape=quete.objectifs[nouveaux[0]].description)
+        else:
+            emettre("quete", " Objectif atteint : {objectif}", objectif=quete.objectifs[nom].description)
+        return False
+
+    def placer(self, identifiant, atteints=(), compteurs=None):
+        """Met une quête dans l'état donné (objectifs atteints, compteurs), sans message."""
+        quete = self.quetes[identifiant]
+        for objectif in quete.objectifs.values():
+            self._desindexer(identifiant, objectif)
+        self.atteints[identifiant] = set(atteints)
+        self.compteurs[identifiant] = dict(compteurs or {})
+        for nom in quete.ordre:
+            if self._actif(quete, nom):
+                self._indexer(identifiant, quete.objectifs[nom])
+
+    def _actif(self, quete, nom):
+        atteints = self.atteints[quete.identifiant]
+        return nom not in atteints and all(precedent in atteints for precedent in quete.objectifs[nom].apres)
+
+    def _indexer(self, identifiant, objectif):
+        self._index.setdefault(objectif.cle, {})[identifiant, objectif.identifiant] = None
+
+    def _desindexer(self, identifiant, objectif):
+        ecouteurs = self._index.get(objectif.cle)
+        if ecouteurs is not None:
+            ecouteurs.pop((identifiant, objectif.identifiant), None)
+            if not ecouteurs:
+                del self._index[objectif.cle]
+
+    # =========================
+    # Sauvegarde
+    # =========================
+
+    def etat(self):
+        """{quête: {"atteints": [...], "compteurs": {...}}} pour les quêtes entamées (JSON)."""
+        return {identifiant: {"atteints": [nom for nom in quete.ordre if nom in self.atteints[identifiant]],
+                              "compteurs": dict(self.compteurs[identifiant])}
+                for identifiant, quete in self.quetes.items()
+                if self.atteints[identifiant] or self.compteurs[identifiant]}
+
+    def restaurer(self, etat):
+        """Inverse de etat() ; les quêtes absentes repartent de zéro, les inconnues sont ignorées."""
+        for identifiant in self.quetes:
+            progression = etat.get(identifiant, {})
+            self.placer(identifiant, progression.get("atteints", ()), progression.get("compteurs"))
+
+
+def _benchmark(nb_quetes=500, nb_signaux=200_000):
+    import random
+    import time
+
+    from messages import bus, SortieNulle
+
+    ennemis = ["LoupSauvage", "Bandit", "Squelette", "ChampionCorrompu"]
+    objets = ["potion_soin", "dague_affutee", "manteau_renforce", "epee_acier"]
+    zones = ["village", "foret", "donjon"]
+    rng = random.Random(1)
+
+    def fait():
+        declencheur = rng.choice(("tuer", "collecter", "entrer"))
+        cibles = {"tuer": ennemis, "collecter": objets, "entrer": zones}[declencheur]
+        return declencheur, rng.choice(cibles)
+
+    quetes = []
+    for i in range(nb_quetes):
+        objectifs = []
+        for j in range(rng.randint(2, 5)):
+            declencheur, cible = fait()
+            objectifs.append(Objectif(f"o{j}", declencheur, cible, nombre=10 ** 9,  # jamais atteints
+                                      apres=(f"o{j - 1}",) if j and rng.random() < 0.5 else ()))
+        quetes.append(Quete(f"q{i}", objectifs))
+    moteur = MoteurQuetes(quetes)
+    faits = [fait() for _ in range(nb_signaux)]
+
+    def parcours(declencheur, cible):
+        # Sans index : chaque fait passe sur tous les objectifs actifs de toutes les quêtes
+        for quete in moteur.quetes.values():
+            for objectif in moteur.actifs(quete.identifiant):
+                if objectif.declencheur == declencheur and objectif.cible in (cible, None):
+                    compteurs = moteur.compteurs[quete.identifiant]
+                    compteurs[objectif.identifiant] = compteurs.get(objectif.identifiant, 0) + 1
+
+    with bus.rediriger(SortieNulle()):
+        debut = time.perf_counter()
+        for declencheur, cible in faits[:nb_signaux // 100]:
+            parcours(declencheur, cible)
+        sans_index = (time.perf_counter() - debut) / (nb_signaux // 100)
+        debut = time.perf_counter()
+        for declencheur, cible in faits:
+            moteur.signaler(declencheur, cible)
+        avec_index = (time.perf_counter() - debut) / nb_signaux
+    print(f"{nb_quetes} quêtes, {moteur.nb_ecouteurs()} objectifs actifs, {len(moteur._index)} clés d'index")
+    print(f"par signalement : parcours {sans_index * 1e6:.1f} µs | index {avec_index * 1e6:.2f} µs "
+          f"(x{sans_index / avec_index:.0f})")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,170 @@
+"""
+Enregistrement et rejeu des parties.
+
+Une partie est entièrement déterminée par la graine des flux aléatoires et
+la suite des saisies (menus de jeu_principal, choix de combat_interactif...).
+Enregistrement écrit les deux dans un fichier texte, une ligne JSON par
+saisie, plus un point de reprise (état picklé du jeu, du joueur et des flux)
+tous les `intervalle` tours de la boucle principale. Rejeu réexécute le
+journal sans affichage ; aller_a(tour) repart du point de reprise le plus
+proche au lieu du début.
+
+    python rejeu.py derniere_partie.rejeu         # rejoue jusqu'au bout
+    python rejeu.py derniere_partie.rejeu 5000    # état au début du tour 5000
+"""
+import base64
+import contextlib
+import io
+import json
+import os
+import pickle
+import tempfile
+import zlib
+
+from aleatoire import flux
+from messages import bus, SortieNulle
+
+FORMAT = 1
+INTERVALLE_REPRISE = 50
+
+
+class FinJournal(EOFError):
+    """Le rejeu demande une saisie au-delà de la fin du journal."""
+
+
+class Enregistrement:
+    """Enregistre les saisies de la session en cours (branché sur bus.entree)."""
+
+    def __init__(self, chemin, graine=None, intervalle=INTERVALLE_REPRISE):
+        flux.initialiser(graine)
+        self.intervalle = intervalle
+        self.nb_saisies = 0
+        self.fichier = open(chemin, "w", encoding="utf-8")
+        self._ecrire({"format": FORMAT, "graine": flux.graine})
+        self._entree = bus.entree
+        bus.entree = self._saisir
+
+    def _ecrire(self, ligne):
+        self.fichier.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+        self.fichier.flush()  # le journal doit survivre à un plantage du jeu
+
+    def _saisir(self, invite=""):
+        texte = self._entree(invite)
+        self.nb_saisies += 1
+        self._ecrire(texte)
+        return texte
+
+    def point_de_reprise(self, tour, jeu, joueur, resynchro=False):
+        """Fige l'état en fin de tour (tous les `intervalle` tours, ou toujours si resynchro).
+        resynchro : l'état ne se déduit pas des saisies (chargement depuis le disque)."""
+        if not resynchro and tour % self.intervalle:
+            return
+        etat = pickle.dumps((jeu, joueur, flux.etat()), pickle.HIGHEST_PROTOCOL)
+        self._ecrire({"tour": tour, "saisie": self.nb_saisies, "resynchro": resynchro,
+                      "etat": base64.b64encode(zlib.compress(etat)).decode("ascii")})
+
+    def fermer(self):
+        bus.entree = self._entree
+        self.fichier.close()
+
+
+def lire(chemin):
+    """Renvoie (entete, saisies, points) ; points : tour -> (nb de saisies lues, resynchro, état)."""
+    saisies, points = [], {}
+    with open(chemin, encoding="utf-8") as fichier:
+        entete = json.loads(fichier.readline())
+        if entete.get("format") != FORMAT:
+            raise ValueError(f"Format de rejeu inconnu : {entete.get('format')}")
+        for ligne in fichier:
+            valeur = json.loads(ligne)
+            if isinstance(valeur, str):
+                saisies.append(valeur)
+            else:
+                points[valeur["tour"]] = (valeur["saisie"], valeur["resynchro"], valeur["etat"])
+    return entete, saisies, points
+
+
+class _Depickler(pickle.Unpickler):
+    def find_class(self, module, nom):
+        # Journaux écrits quand `python main.py` jouait sous __main__ (avant le lanceur de main.py)
+        if module == "__main__":
+            module = "main"
+        return super().find_class(module, nom)
+
+
+@contextlib.contextmanager
+def _dossier_temporaire():
+    """Les sauvegardes faites pendant le rejeu n'écrasent pas celles du joueur."""
+    precedent = os.getcwd()
+    with tempfile.TemporaryDirectory() as dossier:
+        os.chdir(dossier)
+        try:
+            yield dossier
+        finally:
+            os.chdir(precedent)
+
+
+class Rejeu:
+    def __init__(self, chemin):
+        self.entete, self.saisies, self.points = lire(chemin)
+        if 0 not in self.points:
+            raise ValueError("Journal sans point de reprise initial")
+        self.position = 0
+
+    def _saisir(self, invite=""):
+        if self.position >= len(self.saisies):
+            raise FinJournal(f"{len(self.saisies)} saisies rejouées")
+        texte = self.saisies[self.position]
+        self.position += 1
+        return texte
+
+    def _reprendre(self, tour):
+        self.position, _, etat = self.points[tour]
+        donnees = zlib.decompress(base64.b64decode(etat))
+        jeu, joueur, etat_flux = _Depickler(io.BytesIO(donnees)).load()
+        flux.restaurer(etat_flux)
+        return jeu, joueur
+
+    def aller_a(self, tour=None):
+        """Rejoue sans affichage jusqu'au début de `tour` (None : fin du journal).
+        Renvoie (tour atteint, jeu, joueur)."""
+        import main
+
+        depart = max(t for t in self.points if tour is None or t <= tour)
+        jeu, joueur = self._reprendre(depart)
+        entree, bus.entree = bus.entree, self._saisir
+        try:
+            with bus.rediriger(SortieNulle()), _dossier_temporaire():
+                while (tour is None or depart < tour) and main.partie_en_cours(jeu, joueur):
+                    try:
+                        suivant = main.tour_principal(jeu, joueur)
+                    except FinJournal:
+                        break
+                    if suivant is None:
+                        break
+                    joueur = suivant
+                    depart += 1
+                    point = self.points.get(depart)
+                    if point and point[1]:
+                        jeu, joueur = self._reprendre(depart)
+                for journal in jeu.journaux.values():
+                    journal.attendre_compaction()
+        finally:
+            bus.entree = entree
+        return depart, jeu, joueur
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    rejeu = Rejeu(sys.argv[1])
+    cible = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    debut = time.perf_counter()
+    tour, jeu, joueur = rejeu.aller_a(cible)
+    duree = time.perf_counter() - debut
+    print(f"Tour {tour} atteint en {duree * 1000:.1f} ms ({rejeu.position}/{len(rejeu.saisies)} saisies)")
+    print(f"{joueur.nom} ({joueur.type}) PV {joueur.pv}/{joueur.pv_max} | zone {jeu.position} "
+          f"| or {jeu.or_} | quête {jeu.quete.etat}")
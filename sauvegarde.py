@@ -0,0 +1,668 @@
+"""
+Sauvegardes journalisées.
+
+Un fichier instantané (sauvegarde.json) contient l'état complet à un numéro
+de séquence donné ; chaque sauvegarde suivante n'ajoute qu'une ligne de delta
+dans le journal (sauvegarde.journal). Le chargement relit l'instantané puis
+rejoue la fin du journal. Au-delà de SEUIL_COMPACTION entrées, un thread
+réécrit l'instantané et vide le journal. Toute réécriture passe par un
+fichier temporaire renommé (os.replace), donc un crash ne laisse jamais un
+fichier à moitié écrit.
+
+Le codec binaire (encoder_etat / decoder_etat) est une alternative compacte
+au JSON pour stocker des milliers d'états de personnages ; MagasinSauvegardes
+les range dans une base SQLite multi-emplacements.
+
+    python sauvegarde.py        # benchmark codec binaire vs JSON
+"""
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+
+
+def ecrire_atomique(chemin, texte):
+    """Écrit dans chemin.tmp puis renomme : le fichier final est complet ou inchangé."""
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        f.write(texte)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+
+
+def migrer_etat(etat):
+    """Accepte les anciennes sauvegardes (clé "or" écrite par l'ancien Jeu.sauvegarder,
+    difficulté absente : partie en normal)."""
+    if not isinstance(etat, dict):
+        raise ValueError(f"état de jeu attendu (objet JSON), trouvé {type(etat).__name__}")
+    if "or" in etat and "or_" not in etat:
+        etat["or_"] = etat.pop("or")
+    etat.setdefault("nb_explorations_foret", 0)
+    etat.setdefault("difficulte", "normal")
+    return etat
+
+
+# =========================
+# Deltas
+# =========================
+
+def _piles(inventaire):
+    """Inventaire sérialisé -> {entrée canonique: quantité}, dans l'ordre."""
+    piles = {}
+    for entree in inventaire:
+        entree = dict(entree)
+        quantite = entree.pop("quantite", 1)
+        cle = json.dumps(entree, sort_keys=True, ensure_ascii=False)
+        piles[cle] = piles.get(cle, 0) + quantite
+    return piles
+
+
+def _inventaire(piles):
+    inventaire = []
+    for cle, quantite in piles.items():
+        entree = json.loads(cle)
+        if quantite > 1:
+            entree["quantite"] = quantite
+        inventaire.append(entree)
+    return inventaire
+
+
+def _aplatir(etat):
+    """Clés de premier niveau, et celles du personnage préfixées par "personnage."."""
+    plat = {cle: valeur for cle, valeur in etat.items() if cle != "personnage"}
+    for cle, valeur in (etat.get("personnage") or {}).items():
+        if cle != "inventaire":
+            plat["personnage." + cle] = valeur
+    return plat
+
+
+def calculer_delta(ancien, nouveau):
+    """Ce qui a changé entre deux états : {"maj": {...}, "suppr": [...], "inventaire": {...}}."""
+    delta = {}
+    if bool(ancien.get("personnage")) != bool(nouveau.get("personnage")):
+        delta["maj"] = {"personnage": nouveau.get("personnage")}
+        return delta
+
+    plat_ancien, plat_nouveau = _aplatir(ancien), _aplatir(nouveau)
+    maj = {cle: valeur for cle, valeur in plat_nouveau.items()
+           if cle not in plat_ancien or plat_ancien[cle] != valeur}
+    suppr = [cle for cle in plat_ancien if cle not in plat_nouveau]
+    if maj:
+        delta["maj"] = maj
+    if suppr:
+        delta["suppr"] = suppr
+
+    if nouveau.get("personnage"):
+        piles_ancien = _piles(ancien["personnage"].get("inventaire", []))
+        piles_nouveau = _piles(nouveau["personnage"].get("inventaire", []))
+        inventaire = {cle: quantite for cle, quantite in piles_nouveau.items()
+                      if piles_ancien.get(cle) != quantite}
+        inventaire.update({cle: 0 for cle in piles_ancien if cle not in piles_nouveau})
+        if inventaire:
+            delta["inventaire"] = inventaire
+    return delta
+
+
+def appliquer_delta(etat, delta):
+    for chemin, valeur in delta.get("maj", {}).items():
+        cible, _, cle = chemin.rpartition(".")
+        (etat[cible] if cible else etat)[cle] = valeur
+    for chemin in delta.get("suppr", ()):
+        cible, _, cle = chemin.rpartition(".")
+        (etat[cible] if cible else etat).pop(cle, None)
+    if "inventaire" in delta:
+        piles = _piles(etat["personnage"].get("inventaire", []))
+        for cle, quantite in delta["inventaire"].items():
+            if quantite:
+                piles[cle] = quantite
+            else:
+                piles.pop(cle, None)
+        etat["personnage"]["inventaire"] = _inventaire(piles)
+    return etat
+
+
+# =========================
+# Journal
+# =========================
+
+class JournalSauvegarde:
+    """Instantané + journal de deltas pour un emplacement de sauvegarde."""
+    SEUIL_COMPACTION = 200  # entrées de journal avant réécriture de l'instantané
+
+    def __init__(self, chemin="sauvegarde.json", synchrone=True):
+        self.chemin = chemin
+        self.chemin_journal = os.path.splitext(chemin)[0] + ".journal"
+        self.synchrone = synchrone  # fsync après chaque delta
+        self._verrou = threading.Lock()
+        self._etat = None  # dernier état écrit
+        self._seq = 0
+        self._nb_entrees = 0
+        self._compaction = None
+
+    # ----- lecture -----
+
+    def _lire_instantane(self):
+        if not os.path.exists(self.chemin):
+            return None, 0
+        with open(self.chemin, "r", encoding="utf-8") as f:
+            donnees = json.load(f)
+        if not isinstance(donnees, dict):
+            raise ValueError(f"sauvegarde attendue (objet JSON), trouvé {type(donnees).__name__}")
+        if "etat" not in donnees:  # ancien format : l'état complet directement
+            return migrer_etat(donnees), 0
+        return migrer_etat(donnees["etat"]), donnees["seq"]
+
+    def _lire_journal(self, seq_min):
+        """Entrées valides de seq > seq_min. S'arrête à une ligne tronquée (crash pendant l'ajout)."""
+        entrees, tronque = [], False
+        if not os.path.exists(self.chemin_journal):
+            return entrees, tronque
+        with open(self.chemin_journal, "r", encoding="utf-8") as f:
+            for ligne in f:
+                try:
+                    entree = json.loads(ligne)
+                except ValueError:
+                    tronque = True
+                    break
+                if not ligne.endswith("\n"):
+                    tronque = True
+                    break
+                if entree["seq"] > seq_min:
+                    entrees.append(entree)
+        return entrees, tronque
+
+    def _recharger(self):
+        etat, seq = self._lire_instantane()
+        entrees, tronque = self._lire_journal(seq)
+        if etat is not None:
+            for entree in entrees:
+                appliquer_delta(etat, entree)
+                seq = entree["seq"]
+        if tronque:
+            # On repart d'un journal propre pour que les ajouts suivants restent lisibles
+            ecrire_atomique(self.chemin_journal, "".join(json.dumps(e, ensure_ascii=False) + "\n"
+                                                         for e in entrees))
+        self._etat, self._seq, self._nb_entrees = etat, seq, len(entrees)
+
+    def charger(self):
+        """État complet (instantané + fin du journal), ou None s'il n'y a pas de sauvegarde."""
+        with self._verrou:
+            self._recharger()
+            if self._etat is None:
+                return None
+            return json.loads(json.dumps(self._etat))  # copie indépendante
+
+    # ----- écriture -----
+
+    def enregistrer(self, etat):
+        """Ajoute le delta depuis la dernière sauvegarde ; le premier appel écrit un instantané."""
+        with self._verrou:
+            if self._etat is None:
+                self._recharger()
+            if self._etat is None:
+                self._etat, self._seq = etat, 0
+                ecrire_atomique(self.chemin, json.dumps({"seq": 0, "etat": etat}, ensure_ascii=False))
+                if os.path.exists(self.chemin_journal):
+                    os.remove(self.chemin_journal)
+                return
+
+            delta = calculer_delta(self._etat, etat)
+            if not delta:
+                return
+            self._seq += 1
+            delta["seq"] = self._seq
+            with open(self.chemin_journal, "a", encoding="utf-8") as f:
+                f.write(json.dumps(delta, ensure_ascii=False) + "\n")
+                if self.synchrone:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._etat = etat
+            self._nb_entrees += 1
+            compacter = self._nb_entrees >= self.SEUIL_COMPACTION and not self.compaction_en_cours()
+
+        if compacter:
+            self._compaction = threading.Thread(target=self.compacter, daemon=True)
+            self._compaction.start()
+
+    def compaction_en_cours(self):
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def attendre_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def compacter(self):
+        """Réécrit l'instantané au dernier seq puis retire du journal ce qu'il contient."""
+        with self._verrou:
+            if self._etat is None:
+                return
+            seq = self._seq
+            texte = json.dumps({"seq": seq, "etat": self._etat}, ensure_ascii=False)
+        ecrire_atomique(self.chemin, texte)
+
+        with self._verrou:
+            # Garde les deltas ajoutés pendant l'écriture de l'instantané
+            entrees, _ = self._lire_journal(seq)
+            ecrire_atomique(self.chemin_journal, "".join(json.dumps(e, ensure_ascii=False) + "\n"
+                                                         for e in entrees))
+            self._nb_entrees = len(entrees)
+
+
+# =========================
+# Codec binaire
+# =========================
+#
+# En-tête : b"MRPG" + version (u16). Puis, pour la version 1 :
+#   jeu        : position (chaîne), quete_etat (u8), or_ (i32), nb_explorations_foret (u32)
+#   personnage : drapeau (u8) ; nom, type (chaînes), 7 entiers i32 (pv, pv_max,
+#                intelligence, agilite, force1, force2, defense_base),
+#                compétences (u8 + chaînes), arme et armure (drapeau + objet),
+#                inventaire (u16 + objets avec quantité u16)
+#   chaîne     : longueur u16 + UTF-8
+#   objet      : code de type (u8), nom, puis bonus i32 ou effet selon le type
+# Version 2 : même disposition, plus le code d'objet 4 (prototype partagé de
+# objets.catalogue : identifiant seul, au lieu du nom et des bonus).
+# Version 3 : suivie des quêtes entamées (MoteurQuetes.etat) : u16 + pour
+#   chacune son identifiant, les objectifs atteints (u8 + chaînes) et les
+#   compteurs (u8 + chaîne et u32).
+# Version 4 : monde procédural (Monde.parametres) : drapeau (u8), puis graine
+#   (chaîne décimale) et largeur, hauteur (u32).
+# Version 5 : nombres d'objectifs atteints et de compteurs d'une quête en u16.
+# Version 6 : difficulté de la partie (chaîne, clé de NiveauDifficulte.NIVEAUX).
+# Une longueur ou un entier qui déborde de son champ lève ValueError à
+# l'encodage (jamais de valeur tronquée en silence).
+
+MAGIQUE = b"MRPG"
+VERSION_CODEC = 6
+
+_ENTETE = struct.Struct("<4sH")
+_JEU = struct.Struct("<BiI")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_BONUS = struct.Struct("<ii")
+_DIMENSIONS = struct.Struct("<II")
+_STATS = ("pv", "pv_max", "intelligence", "agilite", "force1", "force2", "defense_base")
+_TYPES_OBJET = ("Item", "Weapon", "Armor", "Consumable", "Prototype")
+_CODES_OBJET = {nom: code for code, nom in enumerate(_TYPES_OBJET)}
+
+# version -> fonction(etat) qui met à niveau un état décodé vers version + 1
+MIGRATIONS = {}
+
+
+def migration(version):
+    """Décorateur : enregistre la mise à niveau des états décodés depuis `version`."""
+    def enregistrer(fonction):
+        MIGRATIONS[version] = fonction
+        return fonction
+    return enregistrer
+
+
+def _entier(format_, valeur, quoi):
+    """Entier non signé dans format_ (_U8, _U16, _U32) ; ValueError nommant la limite s'il déborde."""
+    limite = (1 << 8 * format_.size) - 1
+    if not 0 <= valeur <= limite:
+        raise ValueError(f"{quoi} : {valeur} hors des limites du codec binaire (0 à {limite})")
+    return format_.pack(valeur)
+
+
+def _chaine(morceaux, texte):
+    brut = texte.encode("utf-8")
+    morceaux.append(_entier(_U16, len(brut), "longueur de chaîne (octets)"))
+    morceaux.append(brut)
+
+
+def _objet(morceaux, objet, quantite=None):
+    type_objet = "Prototype" if "id" in objet else objet.get("item_type", "Item")
+    morceaux.append(_U8.pack(_CODES_OBJET.get(type_objet, 0)))
+    _chaine(morceaux, objet["id"] if type_objet == "Prototype" else objet["name"])
+    if type_objet == "Weapon":
+        morceaux.append(_BONUS.pack(objet["attack_bonus"], objet.get("int_bonus", 0)))
+    elif type_objet == "Armor":
+        morceaux.append(_BONUS.pack(objet["defense_bonus"], objet.get("int_bonus", 0)))
+    elif type_objet == "Consumable":
+        _chaine(morceaux, str(objet["effect"]))
+    if quantite is not None:
+        morceaux.append(_entier(_U16, quantite, "quantité d'objet"))
+
+
+def encoder_etat(etat):
+    """État de sauvegarde (dict de Jeu.etat_sauvegarde) -> octets."""
+    morceaux = [_ENTETE.pack(MAGIQUE, VERSION_CODEC)]
+    _chaine(morceaux, etat["position"])
+    morceaux.append(_JEU.pack(etat["quete_etat"], etat["or_"], etat["nb_explorations_foret"]))
+
+    perso = etat.get("personnage")
+    morceaux.append(_U8.pack(1 if perso else 0))
+    if perso:
+        _chaine(morceaux, perso["nom"])
+        _chaine(morceaux, perso["type"])
+        morceaux.append(array("i", [perso[cle] for cle in _STATS]).tobytes())
+        morceaux.append(_entier(_U8, len(perso["competences"]), "nombre de compétences"))
+        for competence in perso["competences"]:
+            _chaine(morceaux, competence)
+        for cle in ("weapon_equipee", "armor_equipee"):
+            morceaux.append(_U8.pack(1 if perso.get(cle) else 0))
+            if perso.get(cle):
+                _objet(morceaux, perso[cle])
+        morceaux.append(_entier(_U16, len(perso["inventaire"]), "nombre de piles d'inventaire"))
+        for objet in perso["inventaire"]:
+            _objet(morceaux, objet, objet.get("quantite", 1))
+
+    quetes = etat.get("quetes") or {}
+    morceaux.append(_entier(_U16, len(quetes), "nombre de quêtes"))
+    for identifiant, progression in quetes.items():
+        _chaine(morceaux, identifiant)
+        morceaux.append(_entier(_U16, len(progression["atteints"]), "objectifs atteints d'une quête"))
+        for objectif in progression["atteints"]:
+            _chaine(morceaux, objectif)
+        morceaux.append(_entier(_U16, len(progression["compteurs"]), "compteurs d'une quête"))
+        for objectif, compte in progression["compteurs"].items():
+            _chaine(morceaux, objectif)
+            morceaux.append(_entier(_U32, compte, "valeur de compteur"))
+
+    monde = etat.get("monde")
+    morceaux.append(_U8.pack(1 if monde else 0))
+    if monde:
+        _chaine(morceaux, str(monde["graine"]))
+        morceaux.append(_DIMENSIONS.pack(monde["largeur"], monde["hauteur"]))
+    _chaine(morceaux, etat.get("difficulte", "normal"))
+    return b"".join(morceaux)
+
+
+class _Lecteur:
+    __slots__ = ("donnees", "position")
+
+    def __init__(self, donnees, position=0):
+        self.donnees = bytes(donnees)
+        self.position = position
+
+    def lire(self, format_):
+        valeurs = format_.unpack_from(self.donnees, self.position)
+        self.position += format_.size
+        return valeurs
+
+    def chaine(self):
+        debut = self.position + 2
+        (longueur,) = _U16.unpack_from(self.donnees, self.position)
+        self.position = debut + longueur
+        return self.donnees[debut:self.position].decode("utf-8")
+
+    def entiers(self, nb):
+        debut = self.position
+        entiers = array("i")
+        self.position += nb * entiers.itemsize
+        entiers.frombytes(self.donnees[debut:self.position])
+        return entiers.tolist()
+
+    def objet(self, avec_quantite=False):
+        (code,) = self.lire(_U8)
+        type_objet = _TYPES_OBJET[code]
+        if type_objet == "Prototype":
+            objet = {"id": self.chaine()}
+        else:
+            objet = {"name": self.chaine(), "item_type": type_objet}
+        if type_objet == "Weapon":
+            objet["attack_bonus"], objet["int_bonus"] = self.lire(_BONUS)
+        elif type_objet == "Armor":
+            objet["defense_bonus"], objet["int_bonus"] = self.lire(_BONUS)
+        elif type_objet == "Consumable":
+            objet["effect"] = self.chaine()
+        if avec_quantite:
+            (quantite,) = self.lire(_U16)
+            if quantite > 1:
+                objet["quantite"] = quantite
+        return objet
+
+
+def _decoder_v1(lecteur):
+    etat = {"position": lecteur.chaine()}
+    etat["quete_etat"], etat["or_"], etat["nb_explorations_foret"] = lecteur.lire(_JEU)
+    (a_personnage,) = lecteur.lire(_U8)
+    etat["personnage"] = None
+    if not a_personnage:
+        return etat
+
+    perso = {"nom": lecteur.chaine(), "type": lecteur.chaine()}
+    perso.update(zip(_STATS, lecteur.entiers(len(_STATS))))
+    (nb,) = lecteur.lire(_U8)
+    perso["competences"] = [lecteur.chaine() for _ in range(nb)]
+    for cle in ("weapon_equipee", "armor_equipee"):
+        (present,) = lecteur.lire(_U8)
+        perso[cle] = lecteur.objet() if present else None
+    (nb,) = lecteur.lire(_U16)
+    perso["inventaire"] = [lecteur.objet(avec_quantite=True) for _ in range(nb)]
+    etat["personnage"] = perso
+    return etat
+
+
+def _decoder_v3(lecteur, nombre=_U8):
+    etat = _decoder_v1(lecteur)
+    quetes = {}
+    (nb,) = lecteur.lire(_U16)
+    for _ in range(nb):
+        identifiant = lecteur.chaine()
+        (nb_atteints,) = lecteur.lire(nombre)
+        atteints = [lecteur.chaine() for _ in range(nb_atteints)]
+        (nb_compteurs,) = lecteur.lire(nombre)
+        compteurs = {}
+        for _ in range(nb_compteurs):
+            objectif = lecteur.chaine()
+            (compteurs[objectif],) = lecteur.lire(_U32)
+        quetes[identifiant] = {"atteints": atteints, "compteurs": compteurs}
+    etat["quetes"] = quetes
+    return etat
+
+
+def _decoder_v4(lecteur, nombre=_U8):
+    etat = _decoder_v3(lecteur, nombre)
+    (a_monde,) = lecteur.lire(_U8)
+    etat["monde"] = None
+    if a_monde:
+        graine = int(lecteur.chaine())
+        largeur, hauteur = lecteur.lire(_DIMENSIONS)
+        etat["monde"] = {"graine": graine, "largeur": largeur, "hauteur": hauteur}
+    return etat
+
+
+def _decoder_v5(lecteur):
+    return _decoder_v4(lecteur, nombre=_U16)
+
+
+def _decoder_v6(lecteur):
+    etat = _decoder_v5(lecteur)
+    etat["difficulte"] = lecteur.chaine()
+    return etat
+
+
+_DECODEURS = {1: _decoder_v1, 2: _decoder_v1, 3: _decoder_v3, 4: _decoder_v4,
+              5: _decoder_v5, 6: _decoder_v6}  # la v2 n'ajoute qu'un code d'objet
+
+
+@migration(1)
+def _v1_vers_v2(etat):
+    return etat  # objets complets : creer_item_from_dict les ramène aux prototypes
+
+
+@migration(2)
+def _v2_vers_v3(etat):
+    etat["quetes"] = {}  # quête principale : quete_etat suffit
+    return etat
+
+
+@migration(3)
+def _v3_vers_v4(etat):
+    etat["monde"] = None  # zones fixes
+    return etat
+
+
+@migration(4)
+def _v4_vers_v5(etat):
+    return etat  # seule la largeur des nombres d'objectifs change
+
+
+@migration(5)
+def _v5_vers_v6(etat):
+    etat["difficulte"] = "normal"  # difficulté non sauvegardée : celle par défaut
+    return etat
+
+
+def decoder_etat(donnees):
+    """Octets -> état de sauvegarde, mis à niveau vers VERSION_CODEC via MIGRATIONS."""
+    lecteur = _Lecteur(donnees)
+    magique, version = lecteur.lire(_ENTETE)
+    if magique != MAGIQUE:
+        raise ValueError("Pas une sauvegarde binaire MiniRPG.")
+    if version not in _DECODEURS:
+        raise ValueError(f"Version de sauvegarde binaire inconnue : {version}")
+    etat = _DECODEURS[version](lecteur)
+    while version < VERSION_CODEC:
+        etat = MIGRATIONS[version](etat)
+        version += 1
+    return etat
+
+
+# =========================
+# Emplacements SQLite
+# =========================
+
+@dataclass
+class ResumeSauvegarde:
+    """Métadonnées d'un emplacement, lues sans décoder l'état."""
+    emplacement: str
+    nom_heros: str
+    classe: str
+    quete_etat: int
+    or_: int
+    zone: str
+    horodatage: float
+
+
+class MagasinSauvegardes:
+    """
+    Milliers d'emplacements de sauvegarde dans une base SQLite.
+
+    Les métadonnées (héros, classe, quête, or, zone, date) sont des colonnes
+    indexées d'une table à part : lister / trier ne lit jamais les états, qui
+    ne sont décodés (codec binaire) qu'à l'ouverture d'un emplacement.
+    """
+    COLONNES_TRI = ("emplacement", "nom_heros", "classe", "quete_etat", "or_", "zone", "horodatage")
+
+    def __init__(self, chemin="sauvegardes.db"):
+        self.connexion = sqlite3.connect(chemin)
+        self.connexion.execute("PRAGMA journal_mode=WAL")
+        self.connexion.executescript("""
+            CREATE TABLE IF NOT EXISTS emplacements (
+                emplacement TEXT PRIMARY KEY,
+                nom_heros TEXT, classe TEXT, quete_etat INTEGER,
+                or_ INTEGER, zone TEXT, horodatage REAL
+            );
+            CREATE TABLE IF NOT EXISTS etats (
+                emplacement TEXT PRIMARY KEY REFERENCES emplacements(emplacement) ON DELETE CASCADE,
+                donnees BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_nom_heros ON emplacements(nom_heros);
+            CREATE INDEX IF NOT EXISTS idx_classe ON emplacements(classe);
+            CREATE INDEX IF NOT EXISTS idx_quete_etat ON emplacements(quete_etat);
+            CREATE INDEX IF NOT EXISTS idx_or ON emplacements(or_);
+            CREATE INDEX IF NOT EXISTS idx_zone ON emplacements(zone);
+            CREATE INDEX IF NOT EXISTS idx_horodatage ON emplacements(horodatage);
+        """)
+
+    def __len__(self):
+        return self.connexion.execute("SELECT COUNT(*) FROM emplacements").fetchone()[0]
+
+    def fermer(self):
+        self.connexion.close()
+
+    @staticmethod
+    def _ligne(emplacement, etat, horodatage):
+        perso = etat.get("personnage") or {}
+        meta = (emplacement, perso.get("nom"), perso.get("type"), etat["quete_etat"],
+                etat["or_"], etat["position"], horodatage)
+        return meta, (emplacement, encoder_etat(etat))
+
+    def enregistrer(self, emplacement, etat):
+        self.enregistrer_plusieurs([(emplacement, etat)])
+
+    def enregistrer_plusieurs(self, paires):
+        """[(emplacement, etat), ...] en une seule transaction."""
+        horodatage = time.time()
+        lignes = [self._ligne(emplacement, etat, horodatage) for emplacement, etat in paires]
+        with self.connexion:
+            self.connexion.executemany(
+                "INSERT OR REPLACE INTO emplacements VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [meta for meta, _ in lignes])
+            self.connexion.executemany(
+                "INSERT OR REPLACE INTO etats VALUES (?, ?)", [blob for _, blob in lignes])
+
+    def lister(self, tri="horodatage", decroissant=True, limite=50, decalage=0, **filtres):
+        """
+        Résumés des emplacements, triés sur une colonne indexée.
+        filtres : égalités sur les colonnes, ex. lister(classe="Mage", quete_etat=1).
+        """
+        if tri not in self.COLONNES_TRI:
+            raise ValueError(f"Tri impossible sur {tri!r}")
+        inconnues = set(filtres) - set(self.COLONNES_TRI)
+        if inconnues:
+            raise ValueError(f"Filtres inconnus : {', '.join(sorted(inconnues))}")
+        requete = "SELECT * FROM emplacements"
+        if filtres:
+            requete += " WHERE " + " AND ".join(f"{colonne} = ?" for colonne in filtres)
+        requete += f" ORDER BY {tri} {'DESC' if decroissant else 'ASC'} LIMIT ? OFFSET ?"
+        curseur = self.connexion.execute(requete, (*filtres.values(), limite, decalage))
+        return [ResumeSauvegarde(*ligne) for ligne in curseur]
+
+    def charger(self, emplacement):
+        """État complet de l'emplacement (None s'il n'existe pas)."""
+        ligne = self.connexion.execute(
+            "SELECT donnees FROM etats WHERE emplacement = ?", (emplacement,)).fetchone()
+        return decoder_etat(ligne[0]) if ligne else None
+
+    def supprimer(self, emplacement):
+        with self.connexion:
+            self.connexion.execute("DELETE FROM etats WHERE emplacement = ?", (emplacement,))
+            self.connexion.execute("DELETE FROM emplacements WHERE emplacement = ?", (emplacement,))
+
+
+def _benchmark_codec(nb=5_000):
+    from main import Jeu, Guerrier, Consumable, Weapon, Armor
+    from messages import bus, SortieNulle
+
+    with bus.rediriger(SortieNulle()):
+        jeu, joueur = Jeu(), Guerrier("Bot")
+        for _ in range(4):
+            joueur.inventory.add_item(Consumable("Potion de soin", "soin"))
+        joueur.inventory.add_item(Weapon("Dague affûtée", 8))
+        armure = Armor("Manteau renforcé", 5)
+        joueur.inventory.add_item(armure)
+        joueur.equip_armor(armure)
+    etat = jeu.etat_sauvegarde(joueur)
+    assert decoder_etat(encoder_etat(etat)) == etat
+
+    chemins = {
+        "JSON (indent=2)": (lambda e: json.dumps(e, indent=2, ensure_ascii=False).encode("utf-8"),
+                            lambda b: json.loads(b.decode("utf-8"))),
+        "JSON compact": (lambda e: json.dumps(e, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                         lambda b: json.loads(b.decode("utf-8"))),
+        "binaire": (encoder_etat, decoder_etat),
+    }
+    for nom, (encoder, decoder) in chemins.items():
+        debut = time.perf_counter()
+        blobs = [encoder(etat) for _ in range(nb)]
+        duree_encodage = time.perf_counter() - debut
+        debut = time.perf_counter()
+        for blob in blobs:
+            decoder(blob)
+        duree_decodage = time.perf_counter() - debut
+        print(f"{nom:<16} {len(blobs[0]):5d} octets | encodage {duree_encodage / nb * 1e6:6.1f} µs"
+              f" | décodage {duree_decodage / nb * 1e6:6.1f} µs")
+
+
+if __name__ == "__main__":
+    _benchmark_codec()
@@ -0,0 +1,361 @@
+"""
+Serveur de parties multi-joueurs (asyncio, TCP ou socket Unix local).
+
+Protocole : une ligne JSON par message, dans les deux sens.
+
+    client → {"classe": "Mage", "nom": "Aria"}      ouverture (ou {"session": "<id>"} pour reprendre ;
+                                                    "difficulte" et "graine" facultatifs)
+    serveur → {"session": "<id>", "decision": ..., "actions": [...], ...}
+    client → {"action": "foret"}  ou  {"actions": ["attaquer", "attaquer"]}
+    serveur → observation de GameFacade, ou {"erreur": "..."}
+
+Chaque session possède sa partie (GameFacade : Jeu + Personnage) et une file
+d'entrées bornée lue par une coroutine : quand la file est pleine le serveur
+cesse de lire la socket, et chaque réponse attend que la précédente soit
+partie (drain). Une session inactive plus de `delai_inactivite` secondes est
+écrite dans un MagasinSauvegardes puis retirée de la mémoire ; elle reprend
+au début d'un tour lorsque son client revient avec son identifiant (un
+combat en cours au moment de l'éviction est perdu, comme en quittant le jeu).
+
+    python serveur.py --unix /tmp/minirpg.sock
+    python serveur.py --tcp 127.0.0.1:7777
+    python serveur.py --charge 5000               # test de charge : p50 / p99 par action
+"""
+import asyncio
+import json
+import secrets
+import signal
+import traceback
+
+from facade import ActionInvalide, CLASSES, DIFFICULTES, GameFacade
+from sauvegarde import MagasinSauvegardes
+
+TAILLE_FILE = 16
+DELAI_INACTIVITE = 300.0
+
+
+class Session:
+    __slots__ = ("id", "partie", "entrees", "activite", "connexion")
+
+    def __init__(self, ident, partie):
+        self.id = ident
+        self.partie = partie
+        self.entrees = None  # file bornée, recréée à chaque connexion
+        self.activite = asyncio.get_running_loop().time()
+        self.connexion = None  # StreamWriter du client connecté
+
+    async def saisir(self):
+        """Prochaine requête du client (None : connexion terminée)."""
+        return await self.entrees.get()
+
+
+class ServeurJeu:
+    def __init__(self, magasin="sessions.db", delai_inactivite=DELAI_INACTIVITE, taille_file=TAILLE_FILE):
+        self.magasin = MagasinSauvegardes(magasin)
+        self.delai_inactivite = delai_inactivite
+        self.taille_file = taille_file
+        self.sessions = {}
+        self._serveur = None
+        self._evictions = None
+        self._connexions = set()  # tâches des connexions ouvertes
+
+    # ==========================
+    # Démarrage / arrêt
+    # ==========================
+
+    async def demarrer_tcp(self, hote="127.0.0.1", port=7777):
+        self._serveur = await asyncio.start_server(self._connexion, hote, port, backlog=4096)
+        self._evictions = asyncio.create_task(self._boucle_evictions())
+
+    async def demarrer_unix(self, chemin):
+        self._serveur = await asyncio.start_unix_server(self._connexion, chemin, backlog=4096)
+        self._evictions = asyncio.create_task(self._boucle_evictions())
+
+    async def arreter(self):
+        """Ferme le serveur, termine les connexions et écrit toutes les sessions sur disque."""
+        self._serveur.close()
+        self._evictions.cancel()
+        connexions = list(self._connexions)
+        for tache in connexions:
+            tache.cancel()
+        await asyncio.gather(*connexions, return_exceptions=True)
+        self.evincer(list(self.sessions.values()))
+        self.magasin.fermer()
+
+    # ==========================
+    # Sessions
+    # ==========================
+
+    def _ouvrir(self, ouverture):
+        """Session demandée par le message d'ouverture ; lève ValueError si impossible."""
+        if not isinstance(ouverture, dict):
+            raise ValueError("Ouverture invalide : objet JSON attendu")
+        ident = ouverture.get("session")
+        if ident is not None and not isinstance(ident, str):
+            raise ValueError(f"Session invalide : {ident!r}")
+        if ident is None:
+            classe = ouverture.get("classe", "Guerrier")
+            if not isinstance(classe, str) or classe not in CLASSES:
+                raise ValueError(f"Classe inconnue : {classe!r}")
+            difficulte = ouverture.get("difficulte", "normal")
+            if not isinstance(difficulte, str) or difficulte not in DIFFICULTES:
+                raise ValueError(f"Difficulté inconnue : {difficulte!r}")
+            partie = GameFacade(classe, str(ouverture.get("nom", "Héros")), ouverture.get("graine"),
+                                messages=bool(ouverture.get("messages")), difficulte=difficulte, fichiers=False)
+            ident = secrets.token_hex(8)
+        elif ident in self.sessions:
+            session = self.sessions[ident]
+            if session.connexion is not None:
+                raise ValueError("Session déjà connectée")
+            return session
+        else:
+            etat = self.magasin.charger(ident)
+            if etat is None:
+                raise ValueError(f"Session inconnue : {ident}")
+            partie = GameFacade(etat=etat, messages=bool(ouverture.get("messages")),
+                                difficulte=etat["difficulte"], fichiers=False)
+        session = self.sessions[ident] = Session(ident, partie)
+        return session
+
+    def evincer(self, sessions):
+        """Écrit les sessions dans le magasin (une transaction) et les retire de la mémoire."""
+        if not sessions:
+            return
+        self.magasin.enregistrer_plusieurs([(session.id, session.partie.sauvegarde()) for session in sessions])
+        for session in sessions:
+            del self.sessions[session.id]
+
+    async def _boucle_evictions(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(max(self.delai_inactivite / 4, 0.5))
+            limite = loop.time() - self.delai_inactivite
+            inactives = [session for session in self.sessions.values() if session.activite < limite]
+            for session in inactives:
+                if session.connexion is not None:
+                    session.connexion.close()
+                    session.connexion = None
+            self.evincer(inactives)
+
+    # ==========================
+    # Connexions
+    # ==========================
+
+    @staticmethod
+    async def _envoyer(writer, message):
+        writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()  # contre-pression : on attend que le client lise
+
+    async def _connexion(self, reader, writer):
+        tache = asyncio.current_task()
+        self._connexions.add(tache)
+        try:
+            await self._dialoguer(reader, writer)
+        except asyncio.CancelledError:
+            # Annulée par arreter(), qui écrit la session ensuite : la tâche finit normalement
+            # (asyncio 3.11 journalise une tâche de connexion terminée par une annulation)
+            pass
+        finally:
+            self._connexions.discard(tache)
+
+    async def _dialoguer(self, reader, writer):
+        try:
+            session = self._ouvrir(json.loads(await reader.readline() or b"{}"))
+        except ConnectionError:
+            writer.close()
+            return
+        except (ValueError, TypeError) as erreur:  # JSON invalide compris
+            await self._refuser(writer, str(erreur))
+            return
+        except Exception as erreur:  # ex. sauvegarde de session illisible
+            traceback.print_exc()
+            await self._refuser(writer, f"Erreur interne à l'ouverture : {erreur!r}")
+            return
+        session.connexion = writer
+        session.entrees = asyncio.Queue(self.taille_file)
+        session.activite = asyncio.get_running_loop().time()
+        service = asyncio.create_task(self._servir(session, writer))
+        try:
+            await self._envoyer(writer, {"session": session.id, **session.partie.observe()})
+            async for ligne in reader:
+                # File pleine : put() attend et la socket n'est plus lue
+                await session.entrees.put(ligne)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            service.cancel()  # ne pas attendre un client qui ne lit plus
+            raise
+        finally:
+            try:
+                session.entrees.put_nowait(None)
+            except asyncio.QueueFull:  # client parti sans lire ses réponses
+                service.cancel()
+            await asyncio.gather(service, return_exceptions=True)
+            if session.connexion is writer:
+                session.connexion = None
+            writer.close()
+
+    async def _refuser(self, writer, message):
+        """Ouverture impossible : pas de session, le client reçoit l'erreur et la connexion est fermée."""
+        try:
+            await self._envoyer(writer, {"erreur": message})
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _servir(self, session, writer):
+        loop = asyncio.get_running_loop()
+        while True:
+            ligne = await session.saisir()
+            if ligne is None:
+                return
+            session.activite = loop.time()
+            try:
+                reponse = self._traiter(session.partie, ligne)
+            except Exception as erreur:
+                traceback.print_exc()
+                await self._abandonner(session, writer, erreur)
+                return
+            try:
+                await self._envoyer(writer, reponse)
+            except ConnectionError:
+                return
+
+    async def _abandonner(self, session, writer, erreur):
+        """
+        Erreur du jeu pendant une action : la partie n'est plus fiable. Elle est
+        oubliée sans être écrite (une reprise repart de sa dernière éviction),
+        le client reçoit l'erreur et la connexion est fermée.
+        """
+        self.sessions.pop(session.id, None)
+        session.connexion = None
+        try:
+            await self._envoyer(writer, {"erreur": f"Erreur interne, session fermée : {erreur!r}"})
+        except ConnectionError:
+            pass
+        writer.close()
+        # Vide la file jusqu'à la fin de la lecture, pour qu'elle ne bloque pas sur une file pleine
+        while await session.saisir() is not None:
+            pass
+
+    @staticmethod
+    def _traiter(partie, ligne):
+        try:
+            requete = json.loads(ligne)
+            actions = requete["actions"] if "actions" in requete else requete["action"]
+            return partie.step(actions)
+        except ActionInvalide as erreur:
+            return {"erreur": str(erreur), "appliquees": erreur.nb_appliquees, **partie.observe()}
+        except (ValueError, KeyError, TypeError) as erreur:
+            return {"erreur": f"Requête invalide : {erreur!r}"}
+
+
+async def servir(adresse, magasin="sessions.db", delai_inactivite=DELAI_INACTIVITE):
+    """adresse : chemin de socket Unix, ou (hôte, port). Tourne jusqu'à SIGINT / SIGTERM."""
+    serveur = ServeurJeu(magasin, delai_inactivite)
+    if isinstance(adresse, tuple):
+        await serveur.demarrer_tcp(*adresse)
+    else:
+        await serveur.demarrer_unix(adresse)
+    arret = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_arret in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_arret, arret.set)
+    print(f"Serveur prêt : {adresse}", flush=True)
+    await arret.wait()
+    await serveur.arreter()
+
+
+# ==========================
+# Test de charge
+# ==========================
+
+async def _client(adresse, numero, nb_actions, latences, ouvertures):
+    import random
+
+    choix = random.Random(numero)
+    async with ouvertures:  # échelonne les ouvertures de connexion
+        if isinstance(adresse, tuple):
+            reader, writer = await asyncio.open_connection(*adresse)
+        else:
+            reader, writer = await asyncio.open_unix_connection(adresse)
+        ouverture = {"classe": choix.choice(tuple(CLASSES)), "nom": f"bot{numero}", "graine": numero}
+        writer.write(json.dumps(ouverture).encode() + b"\n")
+        observation = json.loads(await reader.readline())
+    for _ in range(nb_actions):
+        if observation["decision"] == "fin":
+            break
+        actions = [a for a in observation["actions"] if a != "quitter"]
+        debut = asyncio.get_running_loop().time()
+        writer.write(json.dumps({"action": choix.choice(actions)}).encode() + b"\n")
+        observation = json.loads(await reader.readline())
+        latences.append(asyncio.get_running_loop().time() - debut)
+    writer.close()
+
+
+async def test_de_charge(adresse, nb_connexions, nb_actions=20, ouvertures_simultanees=500):
+    """nb_connexions clients simultanés ; renvoie les latences par action (secondes)."""
+    latences = []
+    ouvertures = asyncio.Semaphore(ouvertures_simultanees)
+    await asyncio.gather(*(_client(adresse, numero, nb_actions, latences, ouvertures)
+                           for numero in range(nb_connexions)))
+    return latences
+
+
+def _quantile(valeurs, q):
+    return valeurs[min(len(valeurs) - 1, int(q * len(valeurs)))]
+
+
+def _lancer_test_de_charge(nb_connexions, nb_actions):
+    import os
+    import resource
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    # Deux descripteurs par connexion côté client
+    souple, dure = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(dure, max(souple, 2 * nb_connexions + 256)), dure))
+    with tempfile.TemporaryDirectory() as dossier:
+        adresse = os.path.join(dossier, "serveur.sock")
+        processus = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--unix", adresse,
+                                      "--magasin", os.path.join(dossier, "sessions.db")],
+                                     stdout=subprocess.PIPE, text=True)
+        try:
+            processus.stdout.readline()  # "Serveur prêt"
+            debut = time.perf_counter()
+            latences = asyncio.run(test_de_charge(adresse, nb_connexions, nb_actions))
+            duree = time.perf_counter() - debut
+        finally:
+            processus.send_signal(signal.SIGTERM)
+            processus.wait()
+    latences.sort()
+    print(f"{nb_connexions} connexions, {len(latences)} actions en {duree:.1f} s "
+          f"({len(latences) / duree:.0f} actions/s)")
+    print(f"latence par action : p50 {_quantile(latences, 0.50) * 1000:.2f} ms | "
+          f"p99 {_quantile(latences, 0.99) * 1000:.2f} ms | max {latences[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur de parties MiniRPG")
+    groupe = parser.add_mutually_exclusive_group()
+    groupe.add_argument("--unix", help="chemin de la socket Unix")
+    groupe.add_argument("--tcp", help="hôte:port")
+    groupe.add_argument("--charge", type=int, metavar="N", help="test de charge avec N connexions")
+    parser.add_argument("--actions", type=int, default=20, help="actions par connexion (test de charge)")
+    parser.add_argument("--magasin", default="sessions.db", help="base des sessions évincées")
+    parser.add_argument("--inactivite", type=float, default=DELAI_INACTIVITE, help="délai d'éviction (s)")
+    arguments = parser.parse_args()
+
+    if arguments.charge:
+        _lancer_test_de_charge(arguments.charge, arguments.actions)
+    else:
+        if arguments.tcp:
+            hote, _, port = arguments.tcp.rpartition(":")
+            adresse = (hote or "127.0.0.1", int(port))
+        else:
+            adresse = arguments.unix or "minirpg.sock"
+        asyncio.run(servir(adresse, arguments.magasin, arguments.inactivite))
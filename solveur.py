@@ -0,0 +1,193 @@
+"""
+Issue exacte d'un combat, sans tirage.
+
+Un coup de calcul_degats ne prend qu'une poignée de valeurs (variance dans
+[-2, 2], 10% de critique x2, plancher à 1) : la probabilité de victoire et
+le nombre de tours moyen d'un duel se calculent donc exactement au lieu
+d'être estimés par simulation.
+
+Politique résolue : celle de strategy.politique_attaque (attaque à chaque
+tour), avec le tour de combat_interactif / combat.simuler_combat : attaque
+du joueur, riposte si l'ennemi est debout (30% de Brûlure pour les ennemis
+à compétence spéciale), puis brûlures de fin de tour. Les combattants
+partent sans statut.
+
+Avec cette politique, les états (PV joueur, PV ennemi, brûlures, phase) se
+factorisent : les PV et la phase de l'ennemi ne dépendent que des coups du
+joueur, les PV et brûlures du joueur que des ripostes, tant que le combat
+dure. On propage donc deux chaînes séparées, mémoïsées chacune sur ses
+propres stats (un même ennemi sert pour toutes les classes), et on les
+recombine tour par tour.
+
+    python solveur.py       # temps de réponse et comparaison avec combat.simuler_lot
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+from main import Brulure
+
+CHANCE_CRITIQUE = 0.10
+VARIANCES = range(-2, 3)
+CHANCE_COMPETENCE_IA = 0.3  # tour_ennemi
+FORCE_ENNEMI_PAR_DEFAUT = 25
+
+
+@dataclass(frozen=True)
+class IssueCombat:
+    victoire: float
+    tours: float  # espérance du nombre de tours joués
+    tours_victoire: float  # tours moyens des combats gagnés
+    pv_restants: float  # PV moyens du joueur quand il gagne
+    phase_2: float  # probabilité de voir le boss passer en phase 2
+
+    @property
+    def defaite(self):
+        return 1.0 - self.victoire
+
+
+def distribution_degats(force, defense):
+    """((dégâts, probabilité), ...) d'un coup de calcul_degats, sans bouclier."""
+    distribution = {}
+    for variance in VARIANCES:
+        degats = force - defense + variance
+        for valeur, proba in ((degats * 2, CHANCE_CRITIQUE), (degats, 1 - CHANCE_CRITIQUE)):
+            valeur = max(valeur, 1)
+            distribution[valeur] = distribution.get(valeur, 0.0) + proba / len(VARIANCES)
+    return tuple(distribution.items())
+
+
+@lru_cache(maxsize=1024)
+def chaine_ennemi(pv_ennemi, pv_max_ennemi, defense_ennemi, force_joueur, boss, phase):
+    """
+    États (PV, phase) de l'ennemi sous les coups du joueur, tour après tour.
+    Renvoie (mort, passage_phase_2) : probabilités que ce soit au tour n (index n-1).
+    """
+    coups = distribution_degats(force_joueur, defense_ennemi)
+    seuil_phase = pv_max_ennemi // 2
+    etats = {(pv_ennemi, phase): 1.0}
+    mort, passage_phase_2 = [], []
+    while etats:
+        suivants = {}
+        p_mort = p_phase = 0.0
+        for (pv, phase_courante), proba in etats.items():
+            for degats, p in coups:
+                reste, q = pv - degats, proba * p
+                nouvelle_phase = phase_courante
+                if boss and phase_courante == 1 and reste <= seuil_phase:
+                    nouvelle_phase = 2
+                    p_phase += q
+                if reste <= 0:
+                    p_mort += q
+                else:
+                    cle = (reste, nouvelle_phase)
+                    suivants[cle] = suivants.get(cle, 0.0) + q
+        mort.append(p_mort)
+        passage_phase_2.append(p_phase)
+        etats = suivants
+    return tuple(mort), tuple(passage_phase_2)
+
+
+@lru_cache(maxsize=1024)
+def chaine_joueur(pv_joueur, defense_joueur, force_ennemi, competence_speciale, nb_tours):
+    """
+    États (PV, brûlures) du joueur face aux ripostes, sur nb_tours tours.
+    Renvoie par tour n (index n-1) : (vivant, gagne, pv_gagne) où vivant = P(debout au
+    début du tour), gagne = P(debout et survit aux brûlures si l'ennemi tombe à ce
+    tour), pv_gagne = E[PV restants * 1{gagne}].
+    """
+    coups = distribution_degats(force_ennemi, defense_joueur)
+    if competence_speciale:
+        riposte = ((0, True, CHANCE_COMPETENCE_IA),) + tuple(
+            (degats, False, proba * (1 - CHANCE_COMPETENCE_IA)) for degats, proba in coups)
+    else:
+        riposte = tuple((degats, False, proba) for degats, proba in coups)
+    brulure = Brulure()
+    degats_brulure, ticks_brulure = brulure.damage_per_turn, max(brulure.duration, 1)
+
+    # brulures : tuple trié des ticks restants (celui du tour courant compris)
+    etats = {(pv_joueur, ()): 1.0}
+    vivant, gagne, pv_gagne = [], [], []
+    for _ in range(nb_tours):
+        p_vivant = p_gagne = pv_total = 0.0
+        suivants = {}
+        for (pv, brulures), proba in etats.items():
+            p_vivant += proba
+            reste = pv - degats_brulure * len(brulures)  # ennemi tombé : seules les brûlures frappent
+            if reste > 0:
+                p_gagne += proba
+                pv_total += proba * reste
+            for degats, brule, p in riposte:
+                actives = brulures + (ticks_brulure,) if brule else brulures
+                reste = pv - degats - degats_brulure * len(actives)
+                if reste > 0:
+                    cle = (reste, tuple(sorted(ticks - 1 for ticks in actives if ticks > 1)))
+                    suivants[cle] = suivants.get(cle, 0.0) + proba * p
+        vivant.append(p_vivant)
+        gagne.append(p_gagne)
+        pv_gagne.append(pv_total)
+        etats = suivants
+    return tuple(zip(vivant, gagne, pv_gagne))
+
+
+def stats_combat(personnage, ennemi):
+    """Tuple de stats qui détermine entièrement le duel (clé du cache de resoudre_stats)."""
+    if len(personnage.statuts) or len(ennemi.statuts):
+        raise ValueError("Le solveur suppose des combattants sans statut actif")
+    return (personnage.pv, personnage.force1, personnage.defense,
+            ennemi.pv, ennemi.pv_max, getattr(ennemi, "force1", FORCE_ENNEMI_PAR_DEFAUT), ennemi.defense,
+            "competence_speciale" in ennemi.particularites, ennemi.type == "boss", ennemi.phase)
+
+
+def resoudre(personnage, ennemi):
+    return resoudre_stats(*stats_combat(personnage, ennemi))
+
+
+@lru_cache(maxsize=4096)
+def resoudre_stats(pv_joueur, force_joueur, defense_joueur, pv_ennemi, pv_max_ennemi, force_ennemi,
+                   defense_ennemi, competence_speciale, boss, phase):
+    mort, passage_phase_2 = chaine_ennemi(pv_ennemi, pv_max_ennemi, defense_ennemi, force_joueur, boss, phase)
+    joueur = chaine_joueur(pv_joueur, defense_joueur, force_ennemi, competence_speciale, len(mort))
+
+    victoire = tours_victoire = pv_final = tours = phase_2 = 0.0
+    ennemi_debout = 1.0  # P(l'ennemi n'est pas encore tombé au début du tour n)
+    for n, (p_mort, p_phase, (vivant, gagne, pv_gagne)) in enumerate(zip(mort, passage_phase_2, joueur), 1):
+        tours += ennemi_debout * vivant  # E[T] = somme des P(T >= n)
+        phase_2 += p_phase * vivant
+        victoire += p_mort * gagne
+        tours_victoire += n * p_mort * gagne
+        pv_final += p_mort * pv_gagne
+        ennemi_debout -= p_mort
+    if not victoire:
+        return IssueCombat(0.0, tours, 0.0, 0.0, phase_2)
+    return IssueCombat(victoire, tours, tours_victoire / victoire, pv_final / victoire, phase_2)
+
+
+if __name__ == "__main__":
+    import time
+    from functools import partial
+
+    import main
+    from combat import simuler_lot
+    from strategy import politique_attaque
+
+    nb = 20_000
+    print(f"{'duel':<34} {'victoire':>8} {'simulé':>8} {'écart':>7} "
+          f"{'tours':>6} {'simulés':>7} {'PV':>6} {'simulés':>7} {'ms':>7}")
+    for classe in (main.Guerrier, main.Mage, main.Voleur):
+        for ennemi in (main.LoupSauvage, main.Bandit, main.Squelette, main.ChampionCorrompu, main.GardienDonjon):
+            debut = time.perf_counter()
+            issue = resoudre(classe("Bot"), ennemi())
+            duree = time.perf_counter() - debut
+            stats = simuler_lot(partial(classe, "Bot"), ennemi, nb, politique_attaque, processus=1, graine=1)
+            resume = stats.resume()
+            ecart_type = max(issue.victoire * issue.defaite / nb, 0.0) ** 0.5
+            ecart = (resume["taux_victoire"] - issue.victoire) / ecart_type if ecart_type else 0.0
+            # simuler_combat compte le tour suivant la fin du combat
+            print(f"{classe.__name__ + ' vs ' + ennemi.__name__:<34} {issue.victoire:8.4f} "
+                  f"{resume['taux_victoire']:8.4f} {ecart:+6.1f}σ {issue.tours_victoire:6.2f} "
+                  f"{max(resume['tours_moyens'] - 1, 0):7.2f} {issue.pv_restants:6.1f} "
+                  f"{resume['pv_moyens']:7.1f} {duree * 1000:7.2f}")
+
+    debut = time.perf_counter()
+    resoudre(main.Guerrier("Bot"), main.GardienDonjon())
+    print(f"Requête déjà en cache : {(time.perf_counter() - debut) * 1e6:.1f} µs")
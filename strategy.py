@@ -0,0 +1,77 @@
+"""
+Politiques d'action pour les combats et les parties sans interface.
+
+Une politique de combat reçoit (personnage, ennemi, tour) et renvoie un couple
+(action, competence) où action est une valeur de main.ACTIONS_COMBAT.
+Une politique de partie reçoit une GameFacade et renvoie l'une de ses actions.
+Les politiques sont des fonctions de module pour rester picklables
+(elles voyagent vers les processus de simulation).
+"""
+from aleatoire import flux
+
+
+def politique_attaque(personnage, ennemi, tour):
+    """Attaque de base à chaque tour."""
+    return "attaquer", None
+
+
+def politique_competence(personnage, ennemi, tour):
+    """Utilise toujours la première compétence de la classe."""
+    return "competence", personnage.competences[0]
+
+
+def politique_prudente(personnage, ennemi, tour):
+    """Boit une potion sous 30% de PV, attaque sinon."""
+    if personnage.pv < personnage.pv_max * 0.3 and personnage.inventory.has_item("Potion de soin"):
+        return "objet", None
+    return "attaquer", None
+
+
+def politique_aleatoire(personnage, ennemi, tour):
+    """Action au hasard parmi attaque, compétence et défense (jamais de fuite)."""
+    action = flux.politique.choice(("attaquer", "competence", "defendre"))
+    if action == "competence":
+        return action, flux.politique.choice(personnage.competences)
+    return action, None
+
+
+# =========================
+# Politiques de partie complète
+# =========================
+# Reçoivent une facade.GameFacade et renvoient une action de partie.actions.
+
+ACTIONS_HORS_JEU = ("quitter", "sauvegarder", "charger")
+
+
+def _objectif(partie):
+    return "donjon" if partie.jeu.quete.peut_entrer_donjon() else "foret"
+
+
+def partie_gourmande(partie):
+    """Va droit à la clé puis au donjon, frappe avec sa première compétence, garde son or."""
+    if partie.decision == "combat":
+        return "competence:" + partie.joueur.competences[0]
+    if partie.decision == "marchand":
+        return "partir"
+    return _objectif(partie)
+
+
+def partie_prudente(partie):
+    """Se soigne, fuit à bout de forces, se repose au village et achète des potions."""
+    joueur = partie.joueur
+    if partie.decision == "combat":
+        if joueur.pv < joueur.pv_max * 0.35 and joueur.inventory.has_item("Potion de soin"):
+            return "objet"
+        if joueur.pv < joueur.pv_max * 0.2:
+            return "fuir"
+        return "attaquer"
+    if partie.decision == "marchand":
+        return "potion" if partie.jeu.or_ >= 20 else "partir"
+    if joueur.pv < joueur.pv_max * 0.5:
+        return "village"
+    return _objectif(partie)
+
+
+def partie_aleatoire(partie):
+    """Action légale au hasard (hors quitter / sauvegarder / charger)."""
+    return flux.politique.choice([action for action in partie.actions if action not in ACTIONS_HORS_JEU])
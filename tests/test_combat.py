@@ -0,0 +1,13 @@
+"""Chemin scalaire (calcul_degats) et chemin vectorisé (calcul_degats_lot) : même loi de dégâts."""
+import pytest
+
+from combat import comparer_calcul_degats
+
+# Bruit d'échantillonnage sur 100 000 tirages : ~0.005 ; un écart d'un point de dégâts donne ~0.2
+SEUIL_VARIATION_TOTALE = 0.02
+
+
+@pytest.mark.parametrize("force1, defense, bouclier", [(50, 20, 0), (20, 25, 0), (50, 5, 40)])
+def test_lois_de_degats_identiques(force1, defense, bouclier):
+    distance = comparer_calcul_degats(force1, defense, bouclier, nb=100_000)
+    assert distance < SEUIL_VARIATION_TOTALE
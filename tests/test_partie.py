@@ -0,0 +1,76 @@
+"""Parties lancées comme un joueur : python main.py avec des saisies scriptées."""
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import main
+from facade import GameFacade
+from messages import SortieNulle, bus
+from monde import Monde
+from sauvegarde import decoder_etat, encoder_etat
+
+RACINE = Path(__file__).resolve().parent.parent
+
+
+def test_main_jusqu_au_combat(tmp_path):
+    # main.py tourne en __main__ : rien ne doit recharger main (prototypes, classes de statuts en double)
+    saisies = ["1", "Test", "1", "d"] + ["2", "Charge"] * 300 + ["0"]
+    resultat = subprocess.run([sys.executable, str(RACINE / "main.py")], input="\n".join(saisies) + "\n",
+                              capture_output=True, text=True, cwd=tmp_path, timeout=120)
+    assert resultat.returncode == 0, resultat.stderr + resultat.stdout[-2000:]
+    assert "Traceback" not in resultat.stdout + resultat.stderr
+    assert "apparaît" in resultat.stdout
+    assert "Difficulté (f/n/d)" in resultat.stdout
+
+
+def test_monde_procedural_menu_et_reprise(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # les choix au hasard peuvent sauvegarder
+    choix = random.Random(2)
+    partie = GameFacade("Voleur", "Bot", graine=5, monde=Monde(11))
+    positions = {partie.jeu.position}
+    for _ in range(200):
+        if partie.terminee:
+            break
+        if partie.decision == "menu":
+            assert not {"village", "foret", "donjon"} & set(partie.actions)
+        partie.step(choix.choice([action for action in partie.actions if action != "quitter"]))
+        positions.add(partie.jeu.position)
+    assert len(positions) > 1
+
+    etat = decoder_etat(encoder_etat(partie.sauvegarde()))
+    reprise = GameFacade(etat=etat)
+    assert reprise.jeu.monde.parametres() == partie.jeu.monde.parametres()
+    assert reprise.jeu.position == partie.jeu.position
+
+
+def test_monde_procedural_depart_jamais_bloque():
+    # Le village de départ garde une sortie libre quelle que soit la graine
+    for graine in range(300):
+        monde = Monde(graine)
+        assert monde.sorties_ouvertes(main.Jeu(monde=monde)), graine
+
+
+def test_sauvegarde_partielle_illisible(tmp_path, monkeypatch):
+    # Ancienne sauvegarde sans personnage : message « illisible », jeu intact
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "sauvegarde.json").write_text(json.dumps(
+        {"position": "donjon", "quete_etat": 1, "or_": 999, "nb_explorations_foret": 0}))
+    jeu = main.Jeu()
+    with bus.rediriger(SortieNulle()):
+        assert jeu.charger() is None
+    assert (jeu.position, jeu.or_) == ("village", 50)
+
+
+def test_difficulte_gardee_par_les_sauvegardes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    partie = GameFacade("Mage", "Bot", graine=1, difficulte="difficile")
+    etat = decoder_etat(encoder_etat(partie.sauvegarde()))
+    assert GameFacade(etat=etat).jeu.difficulte == "difficile"
+
+    with bus.rediriger(SortieNulle()):
+        main.Jeu("difficile").sauvegarder(partie.joueur)
+        jeu = main.Jeu()
+        assert jeu.charger() is not None
+    assert jeu.difficulte == "difficile"
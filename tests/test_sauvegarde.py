@@ -0,0 +1,28 @@
+"""Codec binaire : aller-retour aux limites des champs, erreur claire au-delà."""
+import pytest
+
+from sauvegarde import decoder_etat, encoder_etat
+
+LIMITE_U16 = 65535
+LIMITE_U32 = 2**32 - 1
+
+
+def _etat(nb_objectifs, compte=1):
+    objectifs = [f"objectif_{i}" for i in range(nb_objectifs)]
+    return {
+        "position": "village", "quete_etat": 0, "or_": 50, "nb_explorations_foret": 0,
+        "personnage": None, "monde": None, "difficulte": "difficile",
+        "quetes": {"grande_quete": {"atteints": objectifs,
+                                    "compteurs": {objectif: compte for objectif in objectifs}}},
+    }
+
+
+def test_quete_a_la_limite_aller_retour():
+    etat = _etat(LIMITE_U16, compte=LIMITE_U32)
+    assert decoder_etat(encoder_etat(etat)) == etat
+
+
+@pytest.mark.parametrize("etat", [_etat(LIMITE_U16 + 1), _etat(1, compte=LIMITE_U32 + 1)])
+def test_au_dela_de_la_limite_valueerror(etat):
+    with pytest.raises(ValueError, match="limites du codec binaire"):
+        encoder_etat(etat)
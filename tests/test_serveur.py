@@ -0,0 +1,49 @@
+"""Serveur : ouvertures invalides refusées proprement, reprise avec la difficulté d'origine."""
+import asyncio
+import json
+
+import pytest
+
+from serveur import ServeurJeu
+
+
+async def _echange(chemin, *messages):
+    reader, writer = await asyncio.open_unix_connection(str(chemin))
+    reponses = []
+    for message in messages:
+        writer.write(json.dumps(message).encode() + b"\n")
+        reponses.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+    writer.close()
+    return reponses
+
+
+def _avec_serveur(tmp_path, scenario):
+    async def principal():
+        serveur = ServeurJeu(str(tmp_path / "sessions.db"))
+        await serveur.demarrer_unix(str(tmp_path / "jeu.sock"))
+        try:
+            return await scenario(serveur, tmp_path / "jeu.sock")
+        finally:
+            await serveur.arreter()
+    return asyncio.run(principal())
+
+
+@pytest.mark.parametrize("ouverture", [{"classe": ["Mage"]}, {"session": ["x"]}, {"session": {}},
+                                       {"difficulte": "extreme"}, [1, 2], "Mage"])
+def test_ouverture_invalide_refusee(tmp_path, ouverture):
+    async def scenario(serveur, chemin):
+        (reponse,) = await _echange(chemin, ouverture)
+        assert "erreur" in reponse
+        assert not serveur.sessions
+    _avec_serveur(tmp_path, scenario)
+
+
+def test_reprise_garde_la_difficulte(tmp_path):
+    async def scenario(serveur, chemin):
+        (ouverture,) = await _echange(chemin, {"classe": "Mage", "difficulte": "difficile", "graine": 1})
+        await asyncio.sleep(0.05)  # fin de la connexion côté serveur
+        serveur.evincer(list(serveur.sessions.values()))
+        (reprise,) = await _echange(chemin, {"session": ouverture["session"]})
+        assert reprise["session"] == ouverture["session"]
+        assert serveur.sessions[reprise["session"]].partie.jeu.difficulte == "difficile"
+    _avec_serveur(tmp_path, scenario)
@@ -0,0 +1,62 @@
+"""
+Tirages pondérés pour les zones : événements, ennemis, butin.
+"""
+import random
+
+
+class TableAlias:
+    """
+    Tirage pondéré en O(1) par la méthode des alias (Walker, construction de Vose).
+
+    Compilée une seule fois à partir d'une liste de (valeur, poids) ; les poids
+    sont des flottants quelconques (pas besoin qu'ils somment à 1).
+    """
+    __slots__ = ("valeurs", "_prob", "_alias")
+
+    def __init__(self, ponderations):
+        paires = [(valeur, float(poids)) for valeur, poids in ponderations if poids > 0]
+        self.valeurs = [valeur for valeur, _ in paires]
+        n = len(paires)
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+        if not n:
+            return
+
+        total = sum(poids for _, poids in paires)
+        echelle = [poids * n / total for _, poids in paires]
+        petits = [i for i, p in enumerate(echelle) if p < 1.0]
+        grands = [i for i, p in enumerate(echelle) if p >= 1.0]
+        while petits and grands:
+            petit, grand = petits.pop(), grands.pop()
+            self._prob[petit] = echelle[petit]
+            self._alias[petit] = grand
+            echelle[grand] -= 1.0 - echelle[petit]
+            (petits if echelle[grand] < 1.0 else grands).append(grand)
+        # Les restes valent 1 aux erreurs d'arrondi près
+        for i in petits + grands:
+            self._prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.valeurs)
+
+    def tirer(self, rng=random):
+        """Une valeur tirée selon les poids (None si la table est vide)."""
+        n = len(self.valeurs)
+        if not n:
+            return None
+        u = rng.random() * n
+        i = int(u)
+        return self.valeurs[i] if u - i < self._prob[i] else self.valeurs[self._alias[i]]
+
+    def tirer_lot(self, k, rng=random):
+        """k tirages indépendants (simulations)."""
+        valeurs, prob, alias = self.valeurs, self._prob, self._alias
+        n = len(valeurs)
+        if not n:
+            return [None] * k
+        tirages = []
+        for _ in range(k):
+            u = rng.random() * n
+            i = int(u)
+            tirages.append(valeurs[i] if u - i < prob[i] else valeurs[alias[i]])
+        return tirages